@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scan throughput (MB/s and networks/sec) per capture format at
+several file sizes, using generated WiGLE CSV, Kismet .netxml/.kismet, KML
+and NetStumbler .ns1 files.
+
+    python benchmarks/bench_formats.py [networks ...]
+"""
+
+import json
+import os
+import random
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flock_engine
+from flock_engine import FLOCK_OUIS
+
+
+def make_networks(count):
+    rng = random.Random(2600)
+    flock = list(FLOCK_OUIS)
+    networks = []
+    for i in range(count):
+        if i % 1000 == 0:
+            prefix = rng.choice(flock)
+        else:
+            prefix = ':'.join(f'{rng.randrange(256):02X}' for _ in range(3))
+        networks.append({
+            'mac': prefix + ''.join(f':{rng.randrange(256):02X}' for _ in range(3)),
+            'ssid': f'net{i}',
+            'rssi': -rng.randrange(30, 95),
+            'channel': rng.choice((1, 6, 11, 36)),
+            'lat': 37 + rng.random(),
+            'lon': -122 + rng.random(),
+            'time': 1700000000 + i,
+        })
+    return networks
+
+
+def write_csv(networks, path):
+    with open(path, 'w') as f:
+        f.write('WigleWifi-1.4,appRelease=1\nMAC,SSID,AuthMode,FirstSeen,Channel,RSSI,CurrentLatitude,'
+                'CurrentLongitude\n')
+        for n in networks:
+            f.write(f"{n['mac']},{n['ssid']},[WPA2],{flock_engine._epoch_text(n['time'])},{n['channel']},"
+                    f"{n['rssi']},{n['lat']:.6f},{n['lon']:.6f}\n")
+
+
+def write_netxml(networks, path):
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n<detection-run kismet-version="2016.07.R1">\n')
+        for i, n in enumerate(networks):
+            when = time.strftime('%a %b %d %H:%M:%S %Y', time.gmtime(n['time']))
+            f.write(f'<wireless-network number="{i + 1}" type="infrastructure" first-time="{when}" '
+                    f'last-time="{when}">\n<SSID><encryption>WPA+PSK</encryption>'
+                    f'<essid cloaked="false">{n["ssid"]}</essid></SSID>\n<BSSID>{n["mac"]}</BSSID>\n'
+                    f'<channel>{n["channel"]}</channel>\n<snr-info><max_signal_dbm>{n["rssi"]}</max_signal_dbm>'
+                    f'</snr-info>\n<gps-info><avg-lat>{n["lat"]:.6f}</avg-lat><avg-lon>{n["lon"]:.6f}</avg-lon>'
+                    f'</gps-info>\n</wireless-network>\n')
+        f.write('</detection-run>\n')
+
+
+def write_kml(networks, path):
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2">'
+                '<Document><Folder>\n')
+        for n in networks:
+            f.write(f'<Placemark><name>{n["ssid"]}</name><description>Network ID: {n["mac"]}\n'
+                    f'Time: {flock_engine._epoch_text(n["time"])}\nSignal: {n["rssi"]}.0\n</description>'
+                    f'<Point><coordinates>{n["lon"]:.6f},{n["lat"]:.6f}</coordinates></Point></Placemark>\n')
+        f.write('</Folder></Document></kml>\n')
+
+
+def write_kismet(networks, path):
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE devices (first_time INT, last_time INT, devkey TEXT, phyname TEXT, devmac TEXT, '
+               'strongest_signal INT, min_lat REAL, min_lon REAL, max_lat REAL, max_lon REAL, avg_lat REAL, '
+               'avg_lon REAL, bytes_data INT, type TEXT, device BLOB)')
+    db.executemany('INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, 0, ?, ?, 0, ?, ?)', (
+        (n['time'], n['time'], f'key{i}', 'IEEE802.11', n['mac'], n['rssi'], n['lat'], n['lon'], 'Wi-Fi AP',
+         json.dumps({'kismet.device.base.name': n['ssid'], 'kismet.device.base.channel': str(n['channel']),
+                     'dot11.device': {'dot11.device.last_beaconed_ssid': n['ssid']}}).encode())
+        for i, n in enumerate(networks)))
+    db.commit()
+    db.close()
+
+
+def write_ns1(networks, path):
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sII', b'NetS', 12, len(networks)))
+        for n in networks:
+            ssid = n['ssid'].encode()
+            filetime = (n['time'] + 11644473600) * 10 ** 7
+            f.write(bytes([len(ssid)]) + ssid)
+            f.write(struct.pack('<6siiiIIqqddI', bytes.fromhex(n['mac'].replace(':', '')), n['rssi'], -95, 0, 0,
+                                100, filetime, filetime, n['lat'], n['lon'], 2))
+            f.write(struct.pack('<qiii', filetime, n['rssi'], -95, 1))
+            f.write(struct.pack('<dddIdddd', n['lat'], n['lon'], 0, 7, 0, 0, 0, 1))
+            f.write(struct.pack('<qiii', filetime, n['rssi'], -95, 0))
+            f.write(b'\x00')
+            f.write(struct.pack('<QIIiiIIIII', 1 << n['channel'], n['channel'], 0, n['rssi'], -95, 540, 0, 0, 0, 4))
+            f.write(b'\x00\x00\x00\x00')
+
+
+WRITERS = {
+    '.csv': write_csv,
+    '.netxml': write_netxml,
+    '.kml': write_kml,
+    '.kismet': write_kismet,
+    '.ns1': write_ns1,
+}
+
+
+def bench(path, count, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matches = sum(1 for _ in flock_engine.scan_file(path))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    size = os.path.getsize(path) / (1 << 20)
+    print(f"{os.path.splitext(path)[1]:<8} {count:>9,} networks {size:>8.1f} MB {size / best:>8.1f} MB/s "
+          f"{count / best:>12,.0f} networks/sec  ({matches} matches)")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 500_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            networks = make_networks(count)
+            for ext, writer in WRITERS.items():
+                path = os.path.join(tmp, f'capture{count}{ext}')
+                writer(networks, path)
+                bench(path, count)
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env node
+/*
+ * Micro-benchmark: the scan worker's OUI matcher, string prefix lookup vs
+ * compiled 24-bit integer keys. Both sides are taken from index.html so the
+ * numbers follow the page as it changes.
+ *
+ *     node benchmarks/bench_oui.js [rows]
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const page = fs.readFileSync(path.join(__dirname, '..', 'index.html'), 'utf8');
+
+function slice(start, end) {
+    const from = page.indexOf(start);
+    const to = page.indexOf(end, from);
+    if (from === -1 || to === -1) throw new Error('index.html no longer contains ' + start);
+    return page.slice(from, to);
+}
+
+const DEFAULT_FLOCK_OUIS = new Function(slice('const DEFAULT_FLOCK_OUIS', 'let FLOCK_OUIS') +
+    'return DEFAULT_FLOCK_OUIS;')();
+
+// Old path: normalize to "AA:BB:CC" and look the string up in the OUI object
+const stringPrefix = new Function('FLOCK_OUIS', slice('function normalizeMAC', 'function parseWiGLECSV') +
+    'return { isFlockDevice, getDeviceType };')(DEFAULT_FLOCK_OUIS);
+
+// Worker path: 24-bit key into a Map rebuilt by setOUIs
+const compiledKeys = new Function(slice('// Read the first six hex nibbles', 'const NEWLINE') +
+    'return { setOUIs, ouiKey, OUI_TYPES };')();
+compiledKeys.setOUIs(DEFAULT_FLOCK_OUIS, 'bench');
+
+function makeMACs(rows) {
+    // Small LCG so runs are repeatable
+    let seed = 2600;
+    const next = () => (seed = (seed * 1103515245 + 12345) % 2147483648) >> 8 & 255;
+    const hex = n => n.toString(16).padStart(2, '0');
+    const flock = Object.keys(DEFAULT_FLOCK_OUIS);
+    const macs = new Array(rows);
+    for (let i = 0; i < rows; i++) {
+        const prefix = i % 1000 === 0
+            ? flock[next() % flock.length].toLowerCase()
+            : [next(), next(), next()].map(hex).join(':');
+        macs[i] = prefix + ':' + [next(), next(), next()].map(hex).join(':');
+    }
+    return macs;
+}
+
+function runStringPrefix(macs) {
+    let hits = 0;
+    for (const mac of macs) {
+        if (stringPrefix.isFlockDevice(mac)) {
+            stringPrefix.getDeviceType(mac);
+            hits++;
+        }
+    }
+    return hits;
+}
+
+function runCompiledKeys(macs) {
+    const { ouiKey, OUI_TYPES } = compiledKeys;
+    let hits = 0;
+    for (const mac of macs) {
+        if (OUI_TYPES.get(ouiKey(mac)) !== undefined) hits++;
+    }
+    return hits;
+}
+
+function bench(name, func, macs, repeat = 3) {
+    let best = Infinity;
+    let hits = 0;
+    for (let i = 0; i < repeat; i++) {
+        const start = process.hrtime.bigint();
+        hits = func(macs);
+        best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e9);
+    }
+    const rate = Math.round(macs.length / best).toLocaleString('en-US');
+    console.log(`${name.padEnd(16)} ${rate.padStart(14)} rows/sec  (${hits} matches)`);
+    return best;
+}
+
+const rows = parseInt(process.argv[2], 10) || 500000;
+const macs = makeMACs(rows);
+const before = bench('string prefix', runStringPrefix, macs);
+const after = bench('compiled keys', runCompiledKeys, macs);
+console.log(`speedup          ${(before / after).toFixed(2)}x`);
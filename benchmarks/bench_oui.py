@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: OUI matching rows/sec, string prefix lookup vs compiled
+24-bit integer keys.
+
+    python benchmarks/bench_oui.py [rows]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flock_engine
+from flock_engine import FLOCK_OUIS
+
+
+def make_macs(rows):
+    rng = random.Random(2600)
+    flock = list(FLOCK_OUIS)
+    macs = []
+    for i in range(rows):
+        if i % 1000 == 0:
+            prefix = rng.choice(flock).lower()
+        else:
+            prefix = ':'.join(f'{rng.randrange(256):02x}' for _ in range(3))
+        macs.append(prefix + ''.join(f':{rng.randrange(256):02x}' for _ in range(3)))
+    return macs
+
+
+def string_prefix(macs):
+    hits = 0
+    for mac in macs:
+        if flock_engine.is_flock_device(mac):
+            flock_engine.get_device_type(mac)
+            hits += 1
+    return hits
+
+
+def compiled_keys(macs):
+    matcher = flock_engine.compile_ouis(FLOCK_OUIS)
+    oui_key = flock_engine.oui_key
+    hits = 0
+    for mac in macs:
+        if matcher.get(oui_key(mac)) is not None:
+            hits += 1
+    return hits
+
+
+def bench(name, func, macs, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = func(macs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<16} {len(macs) / best:>14,.0f} rows/sec  ({hits} matches)")
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    macs = make_macs(rows)
+    before = bench('string prefix', string_prefix, macs)
+    after = bench('compiled keys', compiled_keys, macs)
+    print(f"speedup          {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
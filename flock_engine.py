@@ -0,0 +1,1129 @@
+#!/usr/bin/env python3
+"""
+Ringmast4r FLOCK CSV Examiner - scan engine
+Headless Python port of the browser worker's parseCSV, shared by the HTTP
+server and the command line, plus readers for Kismet (.netxml, .kismet), KML
+and NetStumbler .ns1 logs. Files are streamed record by record, so memory use
+does not grow with capture size.
+"""
+
+import calendar
+import codecs
+import contextlib
+import csv
+import datetime
+import gzip
+import hashlib
+import html
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import struct
+import urllib.request
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+try:
+    import zstandard
+except ImportError:  # optional: .zst captures are only scanned when it is installed
+    zstandard = None
+
+# Flock Safety OUI Database (IEEE-verified)
+FLOCK_OUIS = {
+    # Extended Battery Devices (Silicon Laboratories)
+    "04:0D:84": "Extended Battery (Silicon Labs)",
+    "1C:34:F1": "Extended Battery (Silicon Labs)",
+    "38:5B:44": "Extended Battery (Silicon Labs)",
+    "58:8E:81": "Extended Battery (Silicon Labs)",
+    "90:35:EA": "Extended Battery (Silicon Labs)",
+    "94:34:69": "Extended Battery (Silicon Labs)",
+    "B4:E3:F9": "Extended Battery (Silicon Labs)",
+    "CC:CC:CC": "Extended Battery (Silicon Labs)",
+    "EC:1B:BD": "Extended Battery (Silicon Labs)",
+    "F0:82:C0": "Extended Battery (Silicon Labs)",
+    # WiFi Camera Devices (Liteon Technology)
+    "70:C9:4E": "WiFi Camera (Liteon)",
+    "3C:91:80": "WiFi Camera (Liteon)",
+    "D8:F3:BC": "WiFi Camera (Liteon)",
+    "80:30:49": "WiFi Camera (Liteon)",
+    "14:5A:FC": "WiFi Camera (Liteon)",
+    "74:4C:A1": "WiFi Camera (Liteon)",
+    "08:3A:88": "WiFi Camera (Liteon)",
+    "9C:2F:9D": "WiFi Camera (Liteon)",
+    "94:08:53": "WiFi Camera (Liteon)",
+    "E4:AA:EA": "WiFi Camera (Liteon)",
+    "00:F4:8D": "WiFi Camera (Liteon)",
+}
+
+# Default radius (meters) for grouping devices into installations
+CLUSTER_RADIUS = 50
+
+# Bytes read per chunk by iter_lines
+CHUNK_SIZE = 1 << 20
+
+# parse_lines publishes its row count to stats every STATS_BATCH rows
+STATS_BATCH = 1 << 16
+STATS_BATCH_MASK = STATS_BATCH - 1
+
+# Same extension set the drop zone accepts in isScanFile
+SCAN_EXTENSIONS = ('.csv', '.netxml', '.kismet', '.kml', '.ns1', '.txt', '.tsv', '.log', '.xml')
+
+# Compressed captures (name.csv.gz, ...) are decompressed while they are read
+COMPRESSED_EXTENSIONS = ('.gz', '.zst') if zstandard is not None else ('.gz',)
+
+# Raised by corrupt, truncated, encrypted or unsupported archives and compressed
+# files; scan_file stops reading such a file and records it in stats['failed']
+ARCHIVE_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile, zipfile.BadZipFile, NotImplementedError, RuntimeError)
+if zstandard is not None:
+    ARCHIVE_ERRORS += (zstandard.ZstdError,)
+
+# Normalized header aliases, in the same order the worker checks them
+COLUMN_ALIASES = {
+    'mac': ('mac', 'bssid', 'netid', 'macaddress', 'ap', 'apmac', 'address'),
+    'ssid': ('ssid', 'name', 'essid', 'networkname', 'apname'),
+    'rssi': ('rssi', 'signal', 'bestlevel', 'level', 'signalstrength', 'dbm', 'maxsignal', 'minsignal'),
+    'channel': ('channel', 'chan', 'ch'),
+    'lat': ('trilat', 'bestlat', 'lat', 'latitude', 'currentlatitude', 'gpslat', 'gpslatitude', 'n', 'y'),
+    'lon': ('trilong', 'bestlon', 'lon', 'longitude', 'currentlongitude', 'gpslon', 'gpslongitude', 'long', 'lng', 'e', 'x'),
+    'firstSeen': ('firsttime', 'firstseen', 'time', 'lastseen', 'lasttime', 'date', 'datetime', 'timestamp'),
+}
+
+_HEX_DIGITS = frozenset('0123456789ABCDEF')
+_HEX_VALUES = {c: int(c, 16) for c in '0123456789abcdefABCDEF'}
+
+
+def get_oui_prefix(mac):
+    normalized = ''.join(c for c in mac.upper() if c in _HEX_DIGITS)[:6]
+    if len(normalized) >= 6:
+        return normalized[0:2] + ':' + normalized[2:4] + ':' + normalized[4:6]
+    return mac.upper()[:8]
+
+
+def is_flock_device(mac, ouis=FLOCK_OUIS):
+    return get_oui_prefix(mac) in ouis
+
+
+def get_device_type(mac, ouis=FLOCK_OUIS):
+    return ouis.get(get_oui_prefix(mac), "Unknown")
+
+
+def oui_key(mac):
+    """First six hex digits of a MAC as a 24-bit integer, or -1 if it has fewer."""
+    key = 0
+    digits = 0
+    for c in mac:
+        value = _HEX_VALUES.get(c)
+        if value is None:
+            continue
+        key = key << 4 | value
+        digits += 1
+        if digits == 6:
+            return key
+    return -1
+
+
+def compile_ouis(ouis=FLOCK_OUIS):
+    """Compile an OUI table once into {24-bit prefix: device type} for oui_key lookups."""
+    return {key: device_type for oui, device_type in ouis.items() if (key := oui_key(oui)) != -1}
+
+
+def normalize_header(name):
+    return name.strip().lower().replace(' ', '').replace('_', '').replace('-', '')
+
+
+def find_columns(header_line):
+    """Map result field -> column index (-1 if absent) for a header line."""
+    headers = [normalize_header(h) for h in header_line.split(',')]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        columns[field] = next((i for i, h in enumerate(headers) if h in aliases), -1)
+    return columns
+
+
+def split_csv_line(line):
+    """Quote-aware comma split, matching the worker's character loop."""
+    cols = []
+    current = []
+    in_quotes = False
+    for c in line:
+        if c == '"':
+            in_quotes = not in_quotes
+        elif c == ',' and not in_quotes:
+            cols.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(c)
+    cols.append(''.join(current).strip())
+    return cols
+
+
+def _column(cols, idx):
+    if 0 <= idx < len(cols):
+        return cols[idx] or 'N/A'
+    return 'N/A'
+
+
+def _is_header(line):
+    lower = line.lower()
+    if 'mac' in lower or 'bssid' in lower:
+        return True
+    # Headers such as NetStumbler's "NetID,..." carry a MAC column without the word
+    return find_columns(line)['mac'] != -1
+
+
+def parse_lines(lines, ouis=None, stats=None):
+    """
+    Yield Flock matches from an iterable of CSV text lines.
+
+    Header detection, column aliases and the 'N/A' defaults mirror the browser
+    worker. If a stats dict is given, stats['networks'] is incremented for
+    every data row seen, in batches of STATS_BATCH rows so progress readers
+    see large files advance.
+    """
+    matcher = compile_ouis(FLOCK_OUIS if ouis is None else ouis)
+    columns = None
+    mac_idx = -1
+    networks = 0
+    reported = 0
+
+    try:
+        for raw in lines:
+            line = raw.strip()
+            if columns is None:
+                if line == '' or line.startswith('#') or line.lower().startswith('wiglewifi'):
+                    continue
+                if _is_header(line):
+                    columns = find_columns(line)
+                    mac_idx = columns['mac']
+                    if mac_idx == -1:
+                        return
+                continue
+
+            if line == '' or line.startswith('#'):
+                continue
+            networks += 1
+            if networks & STATS_BATCH_MASK == 0 and stats is not None:
+                stats['networks'] = stats.get('networks', 0) + networks - reported
+                reported = networks
+
+            # Fast reject: cut out just the MAC column and only tokenize rows whose
+            # OUI matches. Quotes ahead of the column end fall back to the tokenizer.
+            parts = line.split(',', mac_idx + 1)
+            if len(parts) <= mac_idx:
+                continue
+            head = line if len(parts) == mac_idx + 1 else line[:-len(parts[-1]) - 1]
+            if '"' not in head and oui_key(parts[mac_idx]) not in matcher:
+                continue
+
+            cols = split_csv_line(line)
+            if len(cols) <= mac_idx:
+                continue
+            mac = cols[mac_idx]
+            device_type = matcher.get(oui_key(mac))
+            if device_type is not None:
+                yield {
+                    'mac': mac,
+                    'ssid': _column(cols, columns['ssid']),
+                    'deviceType': device_type,
+                    'rssi': _column(cols, columns['rssi']),
+                    'channel': _column(cols, columns['channel']),
+                    'lat': _column(cols, columns['lat']),
+                    'lon': _column(cols, columns['lon']),
+                    'firstSeen': _column(cols, columns['firstSeen']),
+                }
+    finally:
+        if stats is not None:
+            stats['networks'] = stats.get('networks', 0) + networks - reported
+
+
+def iter_lines(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield text lines from a binary stream, reading bounded chunks.
+
+    Partial lines are carried across chunk boundaries and bytes are decoded
+    incrementally, so a multi-byte character split between chunks survives.
+    Lines are split on '\\n' only, like the worker's streaming reader, and a
+    leading UTF-8 BOM is dropped as the browser's TextDecoder does.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    carry = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (carry + decoder.decode(chunk)).split('\n')
+        carry = lines.pop()
+        yield from lines
+    carry += decoder.decode(b'', final=True)
+    if carry:
+        yield carry
+
+
+def read_csv(stream, ouis=None, stats=None):
+    """Yield Flock matches from a delimited text capture (WiGLE, inSSIDer, Vistumbler, ...)."""
+    yield from parse_lines(iter_lines(stream), ouis, stats)
+
+
+def _match(matcher, mac, ssid=None, rssi=None, channel=None, lat=None, lon=None, first_seen=None):
+    """A result row in parse_lines' shape, or None when mac is not a Flock OUI. Missing values become 'N/A'."""
+    device_type = matcher.get(oui_key(mac))
+    if device_type is None:
+        return None
+
+    def text(value):
+        return 'N/A' if value is None or value == '' else str(value)
+
+    return {
+        'mac': mac,
+        'ssid': text(ssid),
+        'deviceType': device_type,
+        'rssi': text(rssi),
+        'channel': text(channel),
+        'lat': text(lat),
+        'lon': text(lon),
+        'firstSeen': text(first_seen),
+    }
+
+
+def _located(lat, lon):
+    """Drop the 0,0 fix capture tools write for networks seen without GPS."""
+    if _parse_float(lat or '') in (None, 0.0) and _parse_float(lon or '') in (None, 0.0):
+        return None, None
+    return lat, lon
+
+
+def _epoch_text(seconds):
+    if not seconds:
+        return None
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _ctime_text(text):
+    """Kismet's ctime-style "Mon Jun 10 12:00:00 2019" as "2019-06-10 12:00:00"."""
+    try:
+        return datetime.datetime.strptime(' '.join(text.split()), '%a %b %d %H:%M:%S %Y').strftime('%Y-%m-%d %H:%M:%S')
+    except (AttributeError, ValueError):
+        return text
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+_KML_FIELD = re.compile(r'([A-Za-z][A-Za-z ]*?)\s*:\s*([^<\n]*)')
+_MAC_PATTERN = re.compile(r'[0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5}')
+
+
+def _netxml_rows(network, matcher):
+    """(MACs seen, matching rows) for a Kismet <wireless-network> and the <wireless-client>s
+    seen talking to it. Only matching MACs have their other fields read."""
+    entries = [(network.findtext('BSSID'), network)]
+    entries.extend((client.findtext('client-mac'), client) for client in network.iterfind('wireless-client'))
+    rows = []
+    for mac, elem in entries:
+        mac = (mac or '').strip()
+        if oui_key(mac) not in matcher:
+            continue
+        lat, lon = _located(elem.findtext('gps-info/avg-lat'), elem.findtext('gps-info/avg-lon'))
+        rows.append(_match(matcher, mac, network.findtext('SSID/essid'), elem.findtext('snr-info/max_signal_dbm'),
+                           elem.findtext('channel'), lat, lon, _ctime_text(elem.get('first-time'))))
+    return len(entries), rows
+
+
+def _placemark_row(placemark, matcher):
+    """Row for a KML <Placemark>. WiGLE and this tool's own export put the MAC in the name or
+    as "Network ID:"/"BSSID:" in the description, with "Key: value" lines for the rest."""
+    name = description = coordinates = None
+    for elem in placemark.iter():
+        tag = _local_name(elem.tag)
+        if tag == 'name' and name is None:
+            name = (elem.text or '').strip()
+        elif tag == 'description' and description is None:
+            description = elem.text or ''
+        elif tag == 'coordinates' and coordinates is None:
+            coordinates = (elem.text or '').strip()
+
+    # Reject on the first MAC-shaped text before parsing the description fields
+    found = _MAC_PATTERN.search(description or '') or _MAC_PATTERN.search(name or '')
+    if found is not None and oui_key(found.group()) not in matcher:
+        return None
+    fields = {normalize_header(key): html.unescape(value.strip())
+              for key, value in _KML_FIELD.findall(description or '')}
+    mac = fields.get('networkid') or fields.get('bssid') or fields.get('mac')
+    if not mac:
+        if found is None:
+            return None
+        mac = found.group()
+    ssid = fields.get('ssid', name if name and name != mac else None)
+    rssi = fields.get('signal', '').split(' ')[0] or fields.get('rssi')
+    # WiGLE writes "Signal: -86.0"; whole dBm values are kept as integers like the CSV columns
+    level = _parse_float(rssi or '')
+    if level is not None and level.is_integer():
+        rssi = str(int(level))
+    lat = lon = None
+    if coordinates:
+        point = coordinates.split()[0].split(',')
+        if len(point) >= 2:
+            lon, lat = point[0], point[1]
+    return _match(matcher, mac, ssid, rssi, fields.get('channel'), lat, lon,
+                  fields.get('time') or fields.get('firstseen'))
+
+
+def read_xml(stream, ouis=None, stats=None):
+    """
+    Yield Flock matches from Kismet .netxml or KML, using iterparse so each
+    <wireless-network> or <Placemark> is released once handled and memory stays
+    flat on large logs. stats['networks'] counts networks, clients and placemarks.
+    """
+    matcher = compile_ouis(FLOCK_OUIS if ouis is None else ouis)
+    networks = 0
+    parents = []
+    try:
+        for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+            parents.pop()
+            tag = _local_name(elem.tag)
+            if tag == 'wireless-network':
+                seen, rows = _netxml_rows(elem, matcher)
+                networks += seen
+            elif tag == 'Placemark':
+                rows = [_placemark_row(elem, matcher)]
+                networks += 1
+            else:
+                continue
+            if parents:
+                parents[-1].remove(elem)
+            for row in rows:
+                if row is not None:
+                    yield row
+    except ElementTree.ParseError:
+        # A log cut off mid-write still yields everything before the break
+        pass
+    finally:
+        if stats is not None:
+            stats['networks'] = stats.get('networks', 0) + networks
+
+
+def read_kismet(path, ouis=None, stats=None):
+    """
+    Yield Flock matches from a Kismet .kismet SQLite log. The database is opened
+    read-only and only device rows whose MAC starts with a Flock OUI are fetched,
+    so the per-device JSON is decoded for matches alone.
+    """
+    matcher = compile_ouis(FLOCK_OUIS if ouis is None else ouis)
+    prefixes = [':'.join(f'{key:06X}'[i:i + 2] for i in (0, 2, 4)) for key in matcher]
+    try:
+        db = sqlite3.connect(f'file:{urllib.request.pathname2url(os.path.abspath(path))}?mode=ro', uri=True)
+    except sqlite3.OperationalError as e:
+        # Missing or unreadable log; scan_file records it like any other file it cannot open
+        raise OSError(str(e)) from e
+    try:
+        networks = db.execute('SELECT COUNT(*) FROM devices').fetchone()[0]
+        if stats is not None:
+            stats['networks'] = stats.get('networks', 0) + networks
+        if not prefixes:
+            return
+        rows = db.execute('SELECT devmac, strongest_signal, avg_lat, avg_lon, first_time, device FROM devices '
+                          f'WHERE upper(substr(devmac, 1, 8)) IN ({",".join("?" * len(prefixes))}) '
+                          'ORDER BY first_time', prefixes).fetchall()
+    except sqlite3.DatabaseError:
+        return
+    finally:
+        db.close()
+
+    for mac, signal, lat, lon, first_time, blob in rows:
+        try:
+            device = json.loads(blob)
+        except (TypeError, ValueError):
+            device = {}
+        dot11 = device.get('dot11.device') or {}
+        ssid = dot11.get('dot11.device.last_beaconed_ssid') or device.get('kismet.device.base.name')
+        lat, lon = _located(lat and _format_coordinate(lat), lon and _format_coordinate(lon))
+        yield _match(matcher, mac, ssid, signal or None, device.get('kismet.device.base.channel'), lat, lon,
+                     _epoch_text(first_time))
+
+
+# NetStumbler .ns1 layout (little-endian): header, then per AP the SSID, fixed fields,
+# DataCount signal samples (each with optional GPS), name and the version 12 trailer
+_NS1_HEADER = struct.Struct('<4sII')
+_NS1_AP = struct.Struct('<6siiiIIqqddI')
+_NS1_SAMPLE = struct.Struct('<qiii')
+_NS1_GPS = struct.Struct('<dddIdddd')
+_NS1_TAIL = struct.Struct('<QIIiiIIIII')
+_FILETIME_EPOCH = 11644473600
+
+
+class _Reader:
+    """Exact-size reads and struct unpacking over a binary stream; short reads raise EOFError."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self, size):
+        data = self.stream.read(size)
+        # Decompressing streams may return less than asked before the end
+        while len(data) < size:
+            more = self.stream.read(size - len(data))
+            if not more:
+                raise EOFError
+            data += more
+        return data
+
+    def unpack(self, layout):
+        return layout.unpack(self.read(layout.size))
+
+
+def read_ns1(stream, ouis=None, stats=None):
+    """
+    Yield Flock matches from a NetStumbler 0.4 (.ns1 version 12) file, reading
+    one access point record at a time. The best GPS fix NetStumbler stores per
+    AP is used for location; per-sample data is skipped over.
+    """
+    matcher = compile_ouis(FLOCK_OUIS if ouis is None else ouis)
+    networks = 0
+    try:
+        reader = _Reader(stream)
+        magic, version, count = reader.unpack(_NS1_HEADER)
+        if magic != b'NetS' or version != 12:
+            return
+        for _ in range(count):
+            ssid = reader.read(reader.read(1)[0])
+            bssid, max_signal, _, _, _, _, first_seen, _, lat, lon, samples = reader.unpack(_NS1_AP)
+            for _ in range(samples):
+                if reader.unpack(_NS1_SAMPLE)[3] == 1:
+                    reader.read(_NS1_GPS.size)
+            reader.read(reader.read(1)[0])
+            tail = reader.unpack(_NS1_TAIL)
+            reader.read(tail[-1])
+            networks += 1
+            if int.from_bytes(bssid[:3], 'big') not in matcher:
+                continue
+
+            lat, lon = _located(_format_coordinate(lat), _format_coordinate(lon))
+            first_seen = _epoch_text(first_seen // 10 ** 7 - _FILETIME_EPOCH) if first_seen > 0 else None
+            yield _match(matcher, ':'.join(f'{b:02X}' for b in bssid), ssid.decode('latin-1'), max_signal,
+                         tail[1] or None, lat, lon, first_seen)
+    except EOFError:
+        # A file cut off mid-record keeps the records before the break
+        pass
+    finally:
+        if stats is not None:
+            stats['networks'] = stats.get('networks', 0) + networks
+
+
+# Readers by extension, each taking a binary stream; anything else is read as CSV
+FILE_READERS = {
+    '.netxml': read_xml,
+    '.kml': read_xml,
+    '.xml': read_xml,
+    '.ns1': read_ns1,
+}
+
+
+def is_scan_file(name):
+    """True for names the scanner reads: SCAN_EXTENSIONS, optionally compressed, and .zip archives."""
+    lower = name.lower()
+    if lower.endswith('.zip'):
+        return True
+    if lower.endswith(COMPRESSED_EXTENSIONS):
+        lower = os.path.splitext(lower)[0]
+    return lower.endswith(SCAN_EXTENSIONS)
+
+
+def scan_stream(stream, name, ouis=None, stats=None):
+    """Yield Flock matches from an open binary stream, choosing the reader by name.
+    .gz and .zst streams are decompressed as they are read."""
+    lower = name.lower()
+    if lower.endswith(COMPRESSED_EXTENSIONS):
+        if lower.endswith('.gz'):
+            stream = gzip.GzipFile(fileobj=stream)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(stream)
+        lower = os.path.splitext(lower)[0]
+    ext = os.path.splitext(lower)[1]
+    if ext == '.kismet':
+        # SQLite needs the database on disk; compressed or zipped .kismet logs are skipped
+        return
+    yield from FILE_READERS.get(ext, read_csv)(stream, ouis, stats)
+
+
+def read_zip(path, ouis=None, stats=None):
+    """Yield Flock matches from each capture in a zip archive, streamed out without extracting it."""
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.lower().endswith('.zip') or not is_scan_file(info.filename):
+                continue
+            with archive.open(info) as member:
+                yield from scan_stream(member, info.filename, ouis, stats)
+
+
+def record_failure(stats, name, error):
+    """Add a file that could not be read to stats['failed'] as {'file', 'error'}."""
+    if stats is not None:
+        stats.setdefault('failed', []).append({'file': name, 'error': str(error) or type(error).__name__})
+
+
+def scan_file(path, ouis=None, stats=None):
+    """
+    Stream a single capture file and yield its Flock matches. The reader is
+    chosen by extension; compressed files are decompressed on the fly and zip
+    members are read straight out of the archive. A corrupt or truncated
+    archive, or a file that cannot be opened or read, keeps the matches read
+    before the break and is counted in stats['failed'] instead of stats['files'].
+    """
+    lower = path.lower()
+    try:
+        if lower.endswith('.kismet'):
+            yield from read_kismet(path, ouis, stats)
+        elif lower.endswith('.zip'):
+            yield from read_zip(path, ouis, stats)
+        else:
+            with open(path, 'rb') as f:
+                yield from scan_stream(f, path, ouis, stats)
+    except ARCHIVE_ERRORS + (OSError,) as e:
+        record_failure(stats, path, e)
+        return
+    if stats is not None:
+        stats['files'] = stats.get('files', 0) + 1
+
+
+def _merge_file_stats(stats, networks, failed):
+    """Fold one pooled file's row count and failure (if any) into stats."""
+    if stats is None:
+        return
+    stats['networks'] = stats.get('networks', 0) + networks
+    if failed:
+        stats.setdefault('failed', []).extend(failed)
+    else:
+        stats['files'] = stats.get('files', 0) + 1
+
+
+def iter_files(paths):
+    """Expand files and directories (recursively) into scannable capture files."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if is_scan_file(name):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+
+
+def scan_paths(paths, ouis=None, stats=None):
+    """Yield Flock matches from every capture file under the given paths."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    for path in iter_files(paths):
+        yield from scan_file(path, ouis, stats)
+
+
+def scan_file_results(path, ouis=None):
+    """Scan one file into a list; the picklable unit of work for process pools."""
+    stats = {}
+    results = list(scan_file(path, ouis, stats))
+    return path, results, stats.get('networks', 0), stats.get('failed')
+
+
+def scan_parallel(paths, ouis=None, jobs=None, stats=None):
+    """
+    Like scan_paths, but fans files out across a process pool.
+
+    Results are yielded in file discovery order so output is reproducible.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    files = list(iter_files(paths))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) <= 1:
+        yield from scan_paths(files, ouis, stats)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+        for path, results, networks, failed in pool.map(scan_file_results, files, itertools.repeat(ouis)):
+            _merge_file_stats(stats, networks, failed)
+            yield from results
+
+
+# Sighting aggregation - one record per device, keyed by normalized MAC, merged
+# the same way as the browser's appendResults
+
+_TIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+_MAC_SEPARATORS = frozenset(':-.')
+
+
+def mac_key(mac):
+    """12 upper-case hex digits for well-formed MACs, otherwise the raw upper-cased text."""
+    digits = []
+    for c in mac:
+        if c in _HEX_VALUES:
+            digits.append(c)
+        elif c not in _MAC_SEPARATORS:
+            return 'raw:' + mac.upper()
+    if len(digits) != 12:
+        return 'raw:' + mac.upper()
+    return ''.join(digits).upper()
+
+
+def _parse_int16(text):
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+    return value if str(value) == text and -32768 < value <= 32767 else None
+
+
+def _parse_float(text):
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _parse_time(text):
+    """Naive epoch seconds for WiGLE "YYYY-MM-DD HH:MM:SS" timestamps, else None."""
+    if not _TIME_PATTERN.fullmatch(text):
+        return None
+    try:
+        when = datetime.datetime.strptime(text, '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+    seconds = calendar.timegm(when.timetuple())
+    return seconds if -2147483648 < seconds <= 2147483647 else None
+
+
+def _rssi_weight(rssi):
+    # Linear received power, so strong sightings dominate the centroid; unknown RSSI counts as -100 dBm.
+    # Out-of-range readings are clamped to -120..0 dBm so the power neither overflows nor underflows to 0.
+    rssi = -100 if rssi is None else min(max(rssi, -120), 0)
+    return 10 ** (rssi / 10)
+
+
+def _format_coordinate(value):
+    text = f'{value:.7f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+class SightingAggregator:
+    """Unique devices merged from individual sightings (count, first/last seen,
+    strongest RSSI, RSSI-weighted centroid, SSID/channel/file sets)."""
+
+    def __init__(self):
+        self.devices = {}
+        self.sightings = 0
+
+    def add(self, result, source=None):
+        rssi = _parse_int16(result['rssi'])
+        lat = _parse_float(result['lat'])
+        lon = _parse_float(result['lon'])
+        located = lat is not None and lon is not None
+        seen = (_parse_time(result['firstSeen']), result['firstSeen'])
+        key = mac_key(result['mac'])
+        self._merge(key, {
+            'mac': result['mac'] if key.startswith('raw:') else ':'.join(key[i:i + 2] for i in range(0, 12, 2)),
+            'deviceType': result['deviceType'],
+            'count': 1,
+            'rssi': (rssi, result['rssi']),
+            'first': seen,
+            'last': seen,
+            'lat': lat if located else None,
+            'lon': lon if located else None,
+            'latText': result['lat'] if located else None,
+            'lonText': result['lon'] if located else None,
+            'weight': _rssi_weight(rssi) if located else 0,
+            'located': 1 if located else 0,
+            'ssids': {result['ssid']: None},
+            'channels': {result['channel']: None},
+            'files': {} if source is None else {source: None},
+        })
+
+    def update(self, other):
+        """Merge another aggregator's devices into this one."""
+        for key, device in other.devices.items():
+            self._merge(key, device)
+
+    def _merge(self, key, other):
+        self.sightings += other['count']
+        device = self.devices.get(key)
+        if device is None:
+            self.devices[key] = dict(other, ssids=dict(other['ssids']), channels=dict(other['channels']),
+                                     files=dict(other['files']))
+            return
+
+        device['count'] += other['count']
+        device['ssids'].update(other['ssids'])
+        device['channels'].update(other['channels'])
+        device['files'].update(other['files'])
+        if other['rssi'][0] is not None and (device['rssi'][0] is None or other['rssi'][0] > device['rssi'][0]):
+            device['rssi'] = other['rssi']
+        if other['first'][0] is not None and (device['first'][0] is None or other['first'][0] < device['first'][0]):
+            device['first'] = other['first']
+        if other['last'][0] is not None and (device['last'][0] is None or other['last'][0] > device['last'][0]):
+            device['last'] = other['last']
+
+        if other['located']:
+            if device['located']:
+                total = device['weight'] + other['weight']
+                device['lat'] = (device['lat'] * device['weight'] + other['lat'] * other['weight']) / total
+                device['lon'] = (device['lon'] * device['weight'] + other['lon'] * other['weight']) / total
+                device['weight'] = total
+                device['latText'] = device['lonText'] = None
+            else:
+                for field in ('lat', 'lon', 'latText', 'lonText', 'weight'):
+                    device[field] = other[field]
+            device['located'] += other['located']
+
+    def results(self):
+        """Display rows, in the same shape as the browser's getResultRow."""
+        return [self._row(device) for device in self.devices.values()]
+
+    @staticmethod
+    def _row(device):
+        def joined(values, separator):
+            known = [v for v in values if v != 'N/A']
+            return separator.join(known) if known else next(iter(values))
+
+        def coordinate(field):
+            if device['located'] == 0:
+                return 'N/A'
+            text = device[field + 'Text']
+            return text if text is not None else _format_coordinate(device[field])
+
+        return {
+            'mac': device['mac'],
+            'ssid': joined(device['ssids'], ' | '),
+            'deviceType': device['deviceType'],
+            'rssi': device['rssi'][1],
+            'channel': joined(device['channels'], ' / '),
+            'lat': coordinate('lat'),
+            'lon': coordinate('lon'),
+            'firstSeen': device['first'][1],
+            'lastSeen': device['last'][1],
+            'count': device['count'],
+            'ssids': list(device['ssids']),
+            'channels': list(device['channels']),
+            'files': list(device['files']),
+        }
+
+
+def scan_file_devices(path, ouis=None):
+    """Scan one file and collapse its sightings; the process-pool unit for scan_devices."""
+    stats = {}
+    devices = SightingAggregator()
+    name = os.path.basename(path)
+    for r in scan_file(path, ouis, stats):
+        devices.add(r, name)
+    return path, devices, stats.get('networks', 0), stats.get('failed')
+
+
+CACHE_SAMPLE = 1 << 16
+
+
+def ouis_version(ouis=None):
+    """Short digest of an OUI table; cached results are only reused for the same table."""
+    table = sorted((FLOCK_OUIS if ouis is None else ouis).items())
+    return hashlib.blake2b(json.dumps(table).encode(), digest_size=8).hexdigest()
+
+
+def file_signature(path, version):
+    """size:mtime:hash:oui-version, where the hash covers the first and last 64 KiB."""
+    st = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(CACHE_SAMPLE))
+        if st.st_size > CACHE_SAMPLE:
+            f.seek(max(CACHE_SAMPLE, st.st_size - CACHE_SAMPLE))
+            digest.update(f.read())
+    return f'{st.st_size}:{st.st_mtime_ns}:{digest.hexdigest()}:{version}'
+
+
+class ScanCache:
+    """
+    SQLite sidecar of per-file device results, so rescanning a growing folder
+    only parses new or changed files. One row per path, replaced when the
+    file's signature changes.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, signature TEXT NOT NULL, '
+                        'networks INTEGER NOT NULL, devices TEXT NOT NULL)')
+
+    def get(self, path, signature):
+        """(SightingAggregator, networks) stored for path under signature, or None."""
+        row = self.db.execute('SELECT networks, devices FROM files WHERE path = ? AND signature = ?',
+                              (path, signature)).fetchone()
+        if row is None:
+            return None
+        devices = SightingAggregator()
+        devices.devices = json.loads(row[1])
+        devices.sightings = sum(d['count'] for d in devices.devices.values())
+        return devices, row[0]
+
+    def put(self, path, signature, devices, networks):
+        self.db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                        (path, signature, networks, json.dumps(devices.devices)))
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _file_size(path):
+    """Size for largest-first ordering; a file that cannot be stat'ed sorts last and fails when scanned."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def scan_devices(paths, ouis=None, jobs=None, stats=None, cache=None):
+    """
+    Scan paths into a SightingAggregator of unique devices. Each file is
+    aggregated in its worker process, largest first, and the per-file results
+    are merged here in file order. With a ScanCache, unchanged files are read
+    from it instead.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    files = list(iter_files(paths))
+    jobs = jobs or os.cpu_count() or 1
+    devices = SightingAggregator()
+
+    hits = {}
+    signatures = {}
+    if cache is not None:
+        version = ouis_version(ouis)
+        for path in files:
+            try:
+                signatures[path] = file_signature(path, version)
+            except OSError:
+                # Left uncached; scan_file records why it cannot be read
+                continue
+            hit = cache.get(os.path.abspath(path), signatures[path])
+            if hit is not None:
+                hits[path] = hit
+    # Largest files are scanned first so one big capture never runs alone at the end
+    pending = sorted((path for path in files if path not in hits), key=_file_size, reverse=True)
+    parsed = {}
+
+    with contextlib.ExitStack() as stack:
+        if jobs > 1 and len(pending) > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=min(jobs, len(pending))))
+            scanned = pool.map(scan_file_devices, pending, itertools.repeat(ouis))
+        else:
+            scanned = map(scan_file_devices, pending, itertools.repeat(ouis))
+        for path in files:
+            failed = None
+            if path in hits:
+                file_devices, networks = hits[path]
+            else:
+                while path not in parsed:
+                    done, file_devices, networks, failed = next(scanned)
+                    parsed[done] = file_devices, networks, failed
+                file_devices, networks, failed = parsed.pop(path)
+                # Failed files aren't cached, so a repaired copy is read again
+                if path in signatures and not failed:
+                    cache.put(os.path.abspath(path), signatures[path], file_devices, networks)
+            devices.update(file_devices)
+            _merge_file_stats(stats, networks, failed)
+            if stats is not None:
+                stats['cached'] = stats.get('cached', 0) + (path in hits)
+    return devices
+
+
+EARTH_RADIUS = 6371000
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+
+def distance_meters(lat1, lon1, lat2, lon2):
+    """Haversine distance in meters."""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2)
+    return EARTH_RADIUS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def type_category(device_type):
+    if 'Battery' in device_type:
+        return 'battery'
+    if 'Camera' in device_type:
+        return 'camera'
+    return 'custom'
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid whose cells are at least cell_meters wide, so every
+    point within cell_meters of another lies in the same or an adjacent cell.
+    """
+
+    def __init__(self, lats, lons, cell_meters):
+        max_abs_lat = min(max((abs(lat) for lat in lats), default=0), 89)
+        # Small slack covers the great-circle vs parallel-arc difference
+        self.cell_lat = cell_meters * 1.01 / METERS_PER_DEGREE
+        self.cell_lon = cell_meters * 1.01 / (METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        self.cells = {}
+        self.keys = []
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            key = (math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon))
+            self.keys.append(key)
+            self.cells.setdefault(key, []).append(i)
+
+    def neighbors(self, i):
+        """Indices in the 3x3 block of cells around point i, in ascending order."""
+        row, col = self.keys[i]
+        found = []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                found.extend(self.cells.get((row + d_row, col + d_col), ()))
+        found.sort()
+        return found
+
+
+def find_installations(results, radius=CLUSTER_RADIUS):
+    """
+    Group devices of different type categories within radius meters into
+    installations, using the same greedy order as the browser's findInstallations.
+    """
+    devices = []
+    lats = []
+    lons = []
+    for r in results:
+        try:
+            lat = float(r['lat'])
+            lon = float(r['lon'])
+        except ValueError:
+            continue
+        if not (math.isfinite(lat) and math.isfinite(lon)) or lat == 0 or lon == 0:
+            continue
+        devices.append(r)
+        lats.append(lat)
+        lons.append(lon)
+
+    categories = [type_category(d['deviceType']) for d in devices]
+    grid = GridIndex(lats, lons, radius)
+    used = bytearray(len(devices))
+    installations = []
+
+    for i, device in enumerate(devices):
+        if used[i]:
+            continue
+        used[i] = 1
+        cluster = [device]
+        cluster_types = [categories[i]]
+
+        for j in grid.neighbors(i):
+            if j <= i or used[j] or categories[j] in cluster_types:
+                continue
+            if distance_meters(lats[i], lons[i], lats[j], lons[j]) <= radius:
+                cluster.append(devices[j])
+                cluster_types.append(categories[j])
+                used[j] = 1
+
+        if len(cluster_types) >= 2:
+            installations.append({
+                'devices': cluster,
+                'types': cluster_types,
+                'centerLat': lats[i],
+                'centerLon': lons[i],
+            })
+    return installations
+
+
+# Export writers - same layouts as the browser's exportCSV / exportGeoJSON / exportKML
+
+EXPORT_FIELDS = ('mac', 'ssid', 'deviceType', 'rssi', 'channel', 'lat', 'lon', 'firstSeen', 'lastSeen', 'count')
+
+
+def _export_values(r):
+    # Raw sightings (scan_paths / scan_parallel) lack the aggregated fields
+    values = dict(r)
+    values.setdefault('lastSeen', r['firstSeen'])
+    values.setdefault('count', 1)
+    return values
+
+
+def _coords(r):
+    try:
+        return float(r['lat']), float(r['lon'])
+    except ValueError:
+        return None
+
+
+def write_csv(results, f):
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(['MAC', 'SSID', 'DeviceType', 'RSSI', 'Channel', 'Latitude', 'Longitude', 'FirstSeen',
+                     'LastSeen', 'Sightings'])
+    for r in results:
+        values = _export_values(r)
+        writer.writerow([values[k] for k in EXPORT_FIELDS])
+
+
+def write_geojson(results, f):
+    f.write('{"type": "FeatureCollection", "features": [')
+    first = True
+    for r in results:
+        coords = _coords(r)
+        if coords is None:
+            continue
+        values = _export_values(r)
+        properties = {k: values[k] for k in EXPORT_FIELDS if k not in ('lat', 'lon', 'count')}
+        properties['sightings'] = values['count']
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [coords[1], coords[0]]},
+            'properties': properties,
+        }
+        f.write(('\n' if first else ',\n') + json.dumps(feature))
+        first = False
+    f.write('\n]}\n')
+
+
+def write_kml(results, f):
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n')
+    f.write('  <name>Flock Safety Devices</name>\n')
+    f.write('  <description>Detected Flock Safety surveillance devices</description>\n')
+    f.write('  <Style id="battery">\n    <IconStyle><color>ff32cd32</color><scale>1.2</scale></IconStyle>\n  </Style>\n')
+    f.write('  <Style id="camera">\n    <IconStyle><color>ffffa658</color><scale>1.2</scale></IconStyle>\n  </Style>\n')
+    for r in results:
+        if r['lat'] == 'N/A' or r['lon'] == 'N/A':
+            continue
+        style_id = 'battery' if 'Battery' in r['deviceType'] else 'camera'
+        f.write('  <Placemark>\n')
+        f.write(f"    <name>{html.escape(r['mac'])}</name>\n")
+        f.write('    <description><![CDATA[')
+        f.write(f"SSID: {html.escape(r['ssid'])}<br>Type: {html.escape(r['deviceType'])}<br>"
+                f"Signal: {html.escape(r['rssi'])} dBm<br>Channel: {html.escape(r['channel'])}<br>"
+                f"First Seen: {html.escape(r['firstSeen'])}<br>"
+                f"Last Seen: {html.escape(r.get('lastSeen', r['firstSeen']))}<br>Sightings: {r.get('count', 1)}")
+        f.write(']]></description>\n')
+        f.write(f'    <styleUrl>#{style_id}</styleUrl>\n')
+        f.write(f"    <Point><coordinates>{r['lon']},{r['lat']},0</coordinates></Point>\n")
+        f.write('  </Placemark>\n')
+    f.write('</Document>\n</kml>\n')
+
+
+EXPORT_WRITERS = {
+    '.csv': write_csv,
+    '.geojson': write_geojson,
+    '.json': write_geojson,
+    '.kml': write_kml,
+}
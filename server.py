@@ -4,43 +4,37 @@ Ringmast4r FLOCK CSV Examiner
 Wardriving CSV analyzer for Flock Safety surveillance device detection
 """
 
+import argparse
+import asyncio
+import contextlib
+import email.parser
+import email.utils
+import gzip
+import hashlib
 import http.server
-import socketserver
+import shutil
+import sys
+import tempfile
+import time
 import json
 import csv
 import io
 import html
-from urllib.parse import parse_qs, urlparse
+import itertools
+import threading
+import zipfile
+from urllib.parse import parse_qs, unquote, urlparse
 import os
 
-PORT = 2600
+try:
+    import brotli
+except ImportError:  # optional: pages are served gzip-compressed without it
+    brotli = None
+
+import flock_engine
+from flock_engine import FLOCK_OUIS
 
-# Flock Safety OUI Database (IEEE-verified)
-FLOCK_OUIS = {
-    # Extended Battery Devices (Silicon Laboratories)
-    "04:0D:84": "Extended Battery (Silicon Labs)",
-    "1C:34:F1": "Extended Battery (Silicon Labs)",
-    "38:5B:44": "Extended Battery (Silicon Labs)",
-    "58:8E:81": "Extended Battery (Silicon Labs)",
-    "90:35:EA": "Extended Battery (Silicon Labs)",
-    "94:34:69": "Extended Battery (Silicon Labs)",
-    "B4:E3:F9": "Extended Battery (Silicon Labs)",
-    "CC:CC:CC": "Extended Battery (Silicon Labs)",
-    "EC:1B:BD": "Extended Battery (Silicon Labs)",
-    "F0:82:C0": "Extended Battery (Silicon Labs)",
-    # WiFi Camera Devices (Liteon Technology)
-    "70:C9:4E": "WiFi Camera (Liteon)",
-    "3C:91:80": "WiFi Camera (Liteon)",
-    "D8:F3:BC": "WiFi Camera (Liteon)",
-    "80:30:49": "WiFi Camera (Liteon)",
-    "14:5A:FC": "WiFi Camera (Liteon)",
-    "74:4C:A1": "WiFi Camera (Liteon)",
-    "08:3A:88": "WiFi Camera (Liteon)",
-    "9C:2F:9D": "WiFi Camera (Liteon)",
-    "94:08:53": "WiFi Camera (Liteon)",
-    "E4:AA:EA": "WiFi Camera (Liteon)",
-    "00:F4:8D": "WiFi Camera (Liteon)",
-}
+PORT = 2600
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
@@ -120,6 +114,30 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             opacity: 0.5;
         }
         tr:hover { background: #1c2128; }
+        .table-scroll {
+            max-height: 70vh;
+            overflow-y: auto;
+            margin: 20px 0;
+            border-radius: 8px;
+            background: #161b22;
+        }
+        .table-scroll table {
+            margin: 0;
+            overflow: visible;
+            table-layout: fixed;
+        }
+        .table-scroll th {
+            position: sticky;
+            top: 0;
+            z-index: 1;
+        }
+        .table-scroll td {
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        tr.spacer td { padding: 0; border: 0; }
+        tr.spacer:hover { background: none; }
         .stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
@@ -267,11 +285,12 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
     <div class="upload-area" id="dropZone">
         <h3>Drop Wardriving Files or Folders Here</h3>
-        <p style="color: #8b949e; margin: 10px 0;">CSV, KML, Kismet, NetStumbler, inSSIDer, WiFiFoFum, and more</p>
-        <input type="file" id="fileInput" accept=".csv,.kml,.netxml,.kismet,.ns1,.txt" multiple webkitdirectory directory style="display:none">
+        <p style="color: #8b949e; margin: 10px 0;">CSV exports from WiGLE, Kismet, NetStumbler, inSSIDer, WiFiFoFum, and more</p>
+        <input type="file" id="fileInput" accept=".csv,.txt,.tsv,.log,.gz,.zip,.zst" multiple webkitdirectory directory style="display:none">
         <input type="file" id="folderInput" webkitdirectory directory multiple style="display:none">
     </div>
     <button class="secondary" onclick="resetDropZone()" style="margin-bottom: 20px;">Reset / New Scan</button>
+    <label style="margin-left: 15px; color: #8b949e;"><input type="checkbox" id="appendScan"> Add files to current scan</label>
 
     <div id="results" class="hidden">
         <h2>Analysis Results</h2>
@@ -323,7 +342,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 <option value="battery">Extended Battery Only</option>
                 <option value="camera">WiFi Camera Only</option>
             </select>
-            <input type="text" id="searchFilter" placeholder="Search MAC/SSID..." oninput="filterResults()">
+            <input type="text" id="searchFilter" placeholder="Search MAC/SSID..." oninput="scheduleFilter()">
             <button class="export-btn" onclick="exportCSV()">Export CSV</button>
             <button class="export-btn" onclick="exportGeoJSON()">Export GeoJSON</button>
             <button class="export-btn" onclick="exportKML()">Export KML</button>
@@ -331,7 +350,12 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             <button class="secondary" onclick="resetDropZone()">New Scan</button>
         </div>
 
+        <div class="table-scroll" id="resultsScroll">
         <table id="resultsTable">
+            <colgroup>
+                <col style="width: 15%"><col style="width: 18%"><col style="width: 12%"><col style="width: 8%"><col style="width: 7%">
+                <col style="width: 9%"><col style="width: 9%"><col style="width: 11%"><col style="width: 5%"><col style="width: 6%">
+            </colgroup>
             <thead>
                 <tr>
                     <th class="sortable" onclick="sortResults('mac')">MAC Address</th>
@@ -342,11 +366,13 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                     <th class="sortable" onclick="sortResults('lat')">Latitude</th>
                     <th class="sortable" onclick="sortResults('lon')">Longitude</th>
                     <th class="sortable" onclick="sortResults('firstSeen')">First Seen</th>
+                    <th class="sortable" onclick="sortResults('count')">Seen</th>
                     <th>Map</th>
                 </tr>
             </thead>
             <tbody id="resultsBody"></tbody>
         </table>
+        </div>
     </div>
 
     <h2>Flock Safety OUI Reference <span id="ouiCount" style="color: #8b949e; font-size: 16px;"></span></h2>
@@ -408,10 +434,12 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         let FLOCK_OUIS = JSON.parse(localStorage.getItem('flock_ouis')) || {...DEFAULT_FLOCK_OUIS};
 
         let allResults = [];
+        let resultStore = null;
         let filteredResults = [];
         let totalNetworksCount = 0;
         let map = null;
         let markersLayer = null;
+        let deviceLayer = null;
         let workers = [];
         let editMode = false;
         let sortColumn = null;
@@ -421,60 +449,466 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         let installations = [];
         let fsFilterMode = false;
 
+        // Columnar result payloads: scan workers encode their matches into typed arrays plus a string
+        // table and transfer them; the main thread merges them into growable column buffers.
+        // Values that don't fit their numeric column keep their original text as a sparse override.
+        //
+        // Rows are unique devices keyed by normalized MAC. appendResults merges sightings into them
+        // (count, first/last seen, strongest RSSI, RSSI-weighted centroid, SSID/channel/file sets);
+        // workers run it over each file's sightings and the main thread runs it again to merge files.
+        const COLUMN_NONE_INT16 = -32768;
+        const COLUMN_NONE_TIME = -2147483648;
+        const RESULT_COLUMNS = {
+            macs: Float64Array, lats: Float64Array, lons: Float64Array, weights: Float64Array,
+            located: Uint32Array, counts: Uint32Array, rssi: Int16Array, channels: Int16Array,
+            times: Int32Array, lastTimes: Int32Array, types: Uint32Array
+        };
+        const RESULT_SETS = ['ssidSets', 'channelSets', 'fileSets'];
+        const RESULT_OVERRIDES = ['mac', 'lat', 'lon', 'rssi', 'firstSeen', 'lastSeen'];
+
+        // 12 hex digits (any of : - . as separators) packed into a 48-bit integer, NaN otherwise
+        function packMAC(mac) {
+            let hi = 0, lo = 0, digits = 0;
+            for (let i = 0; i < mac.length; i++) {
+                const c = mac.charCodeAt(i);
+                let v;
+                if (c >= 48 && c <= 57) v = c - 48;
+                else if (c >= 65 && c <= 70) v = c - 55;
+                else if (c >= 97 && c <= 102) v = c - 87;
+                else if (c === 58 || c === 45 || c === 46) continue;
+                else return NaN;
+                if (digits < 6) hi = hi * 16 + v;
+                else lo = lo * 16 + v;
+                digits++;
+            }
+            return digits === 12 ? hi * 16777216 + lo : NaN;
+        }
+
+        function formatMAC(packed) {
+            return packed.toString(16).toUpperCase().padStart(12, '0').match(/../g).join(':');
+        }
+
+        // WiGLE "YYYY-MM-DD HH:MM:SS" timestamps as naive seconds since the epoch
+        function packTime(text) {
+            const m = /^([0-9]{4})-([0-9]{2})-([0-9]{2}) ([0-9]{2}):([0-9]{2}):([0-9]{2})$/.exec(text);
+            if (!m) return COLUMN_NONE_TIME;
+            const seconds = Date.UTC(+m[1], m[2] - 1, +m[3], +m[4], +m[5], +m[6]) / 1000;
+            if (seconds <= COLUMN_NONE_TIME || seconds > 2147483647 || formatTime(seconds) !== text) return COLUMN_NONE_TIME;
+            return seconds;
+        }
+
+        function formatTime(seconds) {
+            return new Date(seconds * 1000).toISOString().substring(0, 19).replace('T', ' ');
+        }
+
+        // Numeric value (NaN if not a finite number); text that String(value) can't reproduce is kept as an override
+        function encodeFloat(text, field, row, overrides) {
+            const n = text === 'N/A' ? NaN : Number(text);
+            if (text !== 'N/A' && String(n) !== text) overrides[field].push([row, text]);
+            return isFinite(n) ? n : NaN;
+        }
+
+        function encodeInt16(text, field, row, overrides) {
+            if (text === 'N/A') return COLUMN_NONE_INT16;
+            const n = Number(text);
+            if (!Number.isInteger(n) || n <= COLUMN_NONE_INT16 || n > 32767 || String(n) !== text) {
+                if (overrides) overrides[field].push([row, text]);
+                return COLUMN_NONE_INT16;
+            }
+            return n;
+        }
+
+        function encodeTime(text, field, row, overrides) {
+            const seconds = packTime(text);
+            if (seconds === COLUMN_NONE_TIME && text !== 'N/A') overrides[field].push([row, text]);
+            return seconds;
+        }
+
+        // Linear received power, so strong sightings dominate the centroid; unknown RSSI counts as -100 dBm.
+        // Out-of-range readings are clamped to -120..0 dBm so the power neither overflows nor underflows to 0.
+        function rssiWeight(rssi) {
+            const dbm = rssi === COLUMN_NONE_INT16 ? -100 : Math.min(Math.max(rssi, -120), 0);
+            return Math.pow(10, dbm / 10);
+        }
+
+        // Encode raw sightings as a payload with one row per sighting
+        function encodeResults(results) {
+            const n = results.length;
+            const cols = { count: n, strings: [], overrides: {} };
+            for (const name in RESULT_COLUMNS) cols[name] = new RESULT_COLUMNS[name](n);
+            for (const name of RESULT_SETS) cols[name] = new Array(n);
+            for (const field of RESULT_OVERRIDES) cols.overrides[field] = [];
+            const stringIndex = new Map();
+            const intern = (text) => {
+                let idx = stringIndex.get(text);
+                if (idx === undefined) {
+                    idx = cols.strings.length;
+                    cols.strings.push(text);
+                    stringIndex.set(text, idx);
+                }
+                return idx;
+            };
+
+            for (let i = 0; i < n; i++) {
+                const r = results[i];
+                cols.macs[i] = packMAC(r.mac);
+                if (isNaN(cols.macs[i])) cols.overrides.mac.push([i, r.mac]);
+                cols.lats[i] = encodeFloat(r.lat, 'lat', i, cols.overrides);
+                cols.lons[i] = encodeFloat(r.lon, 'lon', i, cols.overrides);
+                cols.rssi[i] = encodeInt16(r.rssi, 'rssi', i, cols.overrides);
+                cols.channels[i] = encodeInt16(r.channel, 'channel', i, null);
+                cols.times[i] = encodeTime(r.firstSeen, 'firstSeen', i, cols.overrides);
+                cols.lastTimes[i] = encodeTime(r.firstSeen, 'lastSeen', i, cols.overrides);
+                cols.counts[i] = 1;
+                cols.located[i] = isNaN(cols.lats[i]) || isNaN(cols.lons[i]) ? 0 : 1;
+                cols.weights[i] = cols.located[i] ? rssiWeight(cols.rssi[i]) : 0;
+                cols.types[i] = intern(r.deviceType);
+                cols.ssidSets[i] = [intern(r.ssid)];
+                cols.channelSets[i] = [intern(r.channel)];
+                cols.fileSets[i] = [];
+            }
+            return cols;
+        }
+
+        function resultTransferList(cols) {
+            return Object.keys(RESULT_COLUMNS).map(name => cols[name].buffer);
+        }
+
+        function createResultStore() {
+            const store = {
+                length: 0,
+                capacity: 0,
+                sightings: 0,
+                strings: [],
+                stringIndex: new Map(),
+                keyIndex: new Map(),
+                overrides: {}
+            };
+            for (const name in RESULT_COLUMNS) store[name] = new RESULT_COLUMNS[name](0);
+            for (const name of RESULT_SETS) store[name] = [];
+            for (const field of RESULT_OVERRIDES) store.overrides[field] = new Map();
+            return store;
+        }
+
+        // Grow every column by doubling so appends stay amortized O(1)
+        function reserveColumns(store, needed) {
+            if (needed <= store.capacity) return;
+            let capacity = Math.max(1024, store.capacity * 2);
+            while (capacity < needed) capacity *= 2;
+            for (const name in RESULT_COLUMNS) {
+                const next = new RESULT_COLUMNS[name](capacity);
+                next.set(store[name].subarray(0, store.length));
+                store[name] = next;
+            }
+            store.capacity = capacity;
+        }
+
+        function internString(store, text) {
+            let idx = store.stringIndex.get(text);
+            if (idx === undefined) {
+                idx = store.strings.length;
+                store.strings.push(text);
+                store.stringIndex.set(text, idx);
+            }
+            return idx;
+        }
+
+        function addToSet(list, items) {
+            for (const item of items) {
+                if (!list.includes(item)) list.push(item);
+            }
+        }
+
+        // Merge a payload (raw sightings or already-aggregated devices) into the store by normalized MAC
+        // changed, when given, collects the store rows this payload created or updated
+        function appendResults(store, cols, fileName, changed) {
+            const remap = cols.strings.map(text => internString(store, text));
+            const fileIdx = fileName === undefined ? -1 : internString(store, fileName);
+            const src = {};
+            for (const field of RESULT_OVERRIDES) src[field] = new Map(cols.overrides[field]);
+            const o = store.overrides;
+            store.sightings += cols.counts.reduce((a, b) => a + b, 0);
+
+            for (let i = 0; i < cols.count; i++) {
+                const rawMac = src.mac.get(i);
+                const key = rawMac === undefined ? cols.macs[i] : 'raw:' + rawMac.toUpperCase();
+                const ssids = cols.ssidSets[i].map(idx => remap[idx]);
+                const channels = cols.channelSets[i].map(idx => remap[idx]);
+                const files = cols.fileSets[i].map(idx => remap[idx]);
+                if (fileIdx !== -1) files.push(fileIdx);
+
+                let row = store.keyIndex.get(key);
+                if (row === undefined) {
+                    row = store.length;
+                    reserveColumns(store, row + 1);
+                    for (const name in RESULT_COLUMNS) store[name][row] = cols[name][i];
+                    store.types[row] = remap[cols.types[i]];
+                    store.ssidSets[row] = ssids;
+                    store.channelSets[row] = channels;
+                    store.fileSets[row] = [];
+                    addToSet(store.fileSets[row], files);
+                    for (const field of RESULT_OVERRIDES) {
+                        if (src[field].has(i)) o[field].set(row, src[field].get(i));
+                    }
+                    store.keyIndex.set(key, row);
+                    store.length++;
+                    if (changed) changed.add(row);
+                    continue;
+                }
+
+                if (changed) changed.add(row);
+
+                store.counts[row] += cols.counts[i];
+                addToSet(store.ssidSets[row], ssids);
+                addToSet(store.channelSets[row], channels);
+                addToSet(store.fileSets[row], files);
+
+                // Strongest signal wins, and brings its channel with it
+                if (cols.rssi[i] !== COLUMN_NONE_INT16 &&
+                    (store.rssi[row] === COLUMN_NONE_INT16 || cols.rssi[i] > store.rssi[row])) {
+                    store.rssi[row] = cols.rssi[i];
+                    store.channels[row] = cols.channels[i];
+                    o.rssi.delete(row);
+                }
+
+                if (cols.times[i] !== COLUMN_NONE_TIME &&
+                    (store.times[row] === COLUMN_NONE_TIME || cols.times[i] < store.times[row])) {
+                    store.times[row] = cols.times[i];
+                    o.firstSeen.delete(row);
+                }
+                if (cols.lastTimes[i] !== COLUMN_NONE_TIME &&
+                    (store.lastTimes[row] === COLUMN_NONE_TIME || cols.lastTimes[i] > store.lastTimes[row])) {
+                    store.lastTimes[row] = cols.lastTimes[i];
+                    o.lastSeen.delete(row);
+                }
+
+                if (cols.located[i]) {
+                    if (store.located[row]) {
+                        const total = store.weights[row] + cols.weights[i];
+                        store.lats[row] = (store.lats[row] * store.weights[row] + cols.lats[i] * cols.weights[i]) / total;
+                        store.lons[row] = (store.lons[row] * store.weights[row] + cols.lons[i] * cols.weights[i]) / total;
+                        store.weights[row] = total;
+                        o.lat.delete(row);
+                        o.lon.delete(row);
+                    } else {
+                        store.lats[row] = cols.lats[i];
+                        store.lons[row] = cols.lons[i];
+                        store.weights[row] = cols.weights[i];
+                        for (const field of ['lat', 'lon']) {
+                            if (src[field].has(i)) o[field].set(row, src[field].get(i));
+                        }
+                    }
+                    store.located[row] += cols.located[i];
+                }
+            }
+        }
+
+        // Trimmed copy of a store's columns in payload form, for posting back from a worker
+        function storeToPayload(store) {
+            const cols = { count: store.length, strings: store.strings, overrides: {} };
+            for (const name in RESULT_COLUMNS) cols[name] = store[name].slice(0, store.length);
+            for (const name of RESULT_SETS) cols[name] = store[name];
+            for (const field of RESULT_OVERRIDES) cols.overrides[field] = Array.from(store.overrides[field]);
+            return cols;
+        }
+
+        // Set members joined for display; 'N/A' only shows when nothing else was seen
+        function joinSet(store, list, separator) {
+            const values = list.map(idx => store.strings[idx]);
+            const known = values.filter(v => v !== 'N/A');
+            return known.length ? known.join(separator) : values[0];
+        }
+
+        function formatCoordinate(value, located) {
+            if (isNaN(value)) return 'N/A';
+            return located > 1 ? String(parseFloat(value.toFixed(7))) : String(value);
+        }
+
+        function getResultRow(store, i) {
+            const o = store.overrides;
+            const int16 = (v) => v === COLUMN_NONE_INT16 ? 'N/A' : String(v);
+            const time = (v) => v === COLUMN_NONE_TIME ? 'N/A' : formatTime(v);
+            return {
+                mac: o.mac.get(i) ?? formatMAC(store.macs[i]),
+                ssid: joinSet(store, store.ssidSets[i], ' | '),
+                deviceType: store.strings[store.types[i]],
+                rssi: o.rssi.get(i) ?? int16(store.rssi[i]),
+                channel: joinSet(store, store.channelSets[i], ' / '),
+                lat: o.lat.get(i) ?? formatCoordinate(store.lats[i], store.located[i]),
+                lon: o.lon.get(i) ?? formatCoordinate(store.lons[i], store.located[i]),
+                firstSeen: o.firstSeen.get(i) ?? time(store.times[i]),
+                lastSeen: o.lastSeen.get(i) ?? time(store.lastTimes[i]),
+                count: store.counts[i],
+                ssids: store.ssidSets[i].map(idx => store.strings[idx]),
+                channels: store.channelSets[i].map(idx => store.strings[idx]),
+                files: store.fileSets[i].map(idx => store.strings[idx])
+            };
+        }
+
+        function getResultRows(store) {
+            const rows = new Array(store.length);
+            for (let i = 0; i < store.length; i++) rows[i] = getResultRow(store, i);
+            return rows;
+        }
+
+        // Capture extensions the drop zone accepts; the worker applies the same check to zip members
+        const SCAN_EXTENSIONS = ['.csv', '.txt', '.tsv', '.log'];
+
+        // Formats only the Python engine parses. The worker reads CSV alone, so these are listed as
+        // skipped rather than run through the CSV parser for no matches.
+        const SERVER_ONLY_EXTENSIONS = ['.netxml', '.kismet', '.kml', '.ns1', '.xml'];
+        const SERVER_ONLY_NOTE = 'not supported in the browser; scan it with server.py scan or POST /api/scan';
+
+        // Compressed captures are decompressed in the worker while they are read, in whichever
+        // formats this browser's DecompressionStream supports (zstd is much newer than gzip)
+        const COMPRESSION_FORMATS = {};
+        for (const [ext, format] of [['.gz', 'gzip'], ['.zst', 'zstd']]) {
+            try {
+                new DecompressionStream(format);
+                COMPRESSION_FORMATS[ext] = format;
+            } catch (err) {
+                // Unsupported format, or no DecompressionStream at all
+            }
+        }
+
+        // DecompressionStream format for a .gz/.zst name, or null
+        function compressionOf(name) {
+            const lower = name.toLowerCase();
+            const ext = lower.substring(lower.lastIndexOf('.'));
+            return COMPRESSION_FORMATS[ext] || null;
+        }
+
+        function isArchive(name) {
+            return name.toLowerCase().endsWith('.zip') || compressionOf(name) !== null;
+        }
+
+        function isScanFile(name) {
+            let lower = name.toLowerCase();
+            if (lower.endsWith('.zip')) return true;
+            if (compressionOf(lower)) lower = lower.substring(0, lower.lastIndexOf('.'));
+            return SCAN_EXTENSIONS.some(ext => lower.endsWith(ext));
+        }
+
+        function isServerOnlyFile(name) {
+            let lower = name.toLowerCase();
+            if (compressionOf(lower)) lower = lower.substring(0, lower.lastIndexOf('.'));
+            return SERVER_ONLY_EXTENSIONS.some(ext => lower.endsWith(ext));
+        }
+
         // Create worker code as blob for parallel processing
         function createWorkerCode() {
             return `
-            const FLOCK_OUIS = ${JSON.stringify(FLOCK_OUIS)};
+            const COLUMN_NONE_INT16 = ${COLUMN_NONE_INT16};
+            const COLUMN_NONE_TIME = ${COLUMN_NONE_TIME};
+            const RESULT_COLUMNS = {${Object.entries(RESULT_COLUMNS).map(([name, type]) => name + ': ' + type.name).join(', ')}};
+            const RESULT_SETS = ${JSON.stringify(RESULT_SETS)};
+            const RESULT_OVERRIDES = ${JSON.stringify(RESULT_OVERRIDES)};
+            const SCAN_EXTENSIONS = ${JSON.stringify(SCAN_EXTENSIONS)};
+            const COMPRESSION_FORMATS = ${JSON.stringify(COMPRESSION_FORMATS)};
+
+            ${[packMAC, formatTime, packTime, encodeFloat, encodeInt16, encodeTime, rssiWeight, encodeResults,
+               resultTransferList, createResultStore, reserveColumns, internString, addToSet, appendResults,
+               storeToPayload, compressionOf, isScanFile].join('\\n\\n')}
+
+            // Read the first six hex nibbles straight from the string as a 24-bit key (-1 if fewer)
+            function ouiKey(mac) {
+                let key = 0;
+                let digits = 0;
+                for (let i = 0; i < mac.length; i++) {
+                    const c = mac.charCodeAt(i);
+                    let v;
+                    if (c >= 48 && c <= 57) v = c - 48;
+                    else if (c >= 65 && c <= 70) v = c - 55;
+                    else if (c >= 97 && c <= 102) v = c - 87;
+                    else continue;
+                    key = (key << 4) | v;
+                    if (++digits === 6) return key;
+                }
+                return -1;
+            }
 
-            function getOUIPrefix(mac) {
-                const normalized = mac.toUpperCase().replace(/[^A-F0-9]/g, '').substring(0, 6);
-                if (normalized.length >= 6) {
-                    return normalized.substring(0,2) + ':' + normalized.substring(2,4) + ':' + normalized.substring(4,6);
+            // OUI table compiled into integer prefix keys. The page sends the table as an
+            // { type: 'ouis', version, ouis } message before the first scan and after every edit,
+            // and the matcher is rebuilt in place rather than the worker being recreated.
+            const OUI_TYPES = new Map();
+            let OUI_VERSION = null;
+
+            function setOUIs(ouis, version) {
+                OUI_TYPES.clear();
+                for (const oui in ouis) {
+                    const key = ouiKey(oui);
+                    if (key !== -1) OUI_TYPES.set(key, ouis[oui]);
                 }
-                return mac.toUpperCase().substring(0, 8);
+                OUI_VERSION = version;
             }
 
             function isFlockDevice(mac) {
-                return FLOCK_OUIS.hasOwnProperty(getOUIPrefix(mac));
+                return OUI_TYPES.has(ouiKey(mac));
             }
 
             function getDeviceType(mac) {
-                return FLOCK_OUIS[getOUIPrefix(mac)] || "Unknown";
+                return OUI_TYPES.get(ouiKey(mac)) || "Unknown";
             }
 
-            function parseCSV(text) {
-                const lines = text.split(String.fromCharCode(10));
-                const results = [];
-                let networkCount = 0;
-
-                let dataStartIndex = 0;
-                for (let i = 0; i < lines.length; i++) {
-                    const line = lines[i].trim();
-                    if (line === '' || line.startsWith('#') || line.toLowerCase().startsWith('wiglewifi')) continue;
-                    if (line.toLowerCase().includes('mac') || line.toLowerCase().includes('bssid')) {
-                        dataStartIndex = i;
-                        break;
-                    }
-                }
+            const NEWLINE = String.fromCharCode(10);
+            const MAC_ALIASES = ['mac', 'bssid', 'netid', 'macaddress', 'ap', 'apmac', 'address'];
 
-                if (dataStartIndex >= lines.length) return { results: [], networkCount: 0 };
+            function normalizeHeaders(line) {
+                return line.split(',').map(h => h.trim().toLowerCase().replace(/ /g, '').replace(/_/g, '').replace(/-/g, ''));
+            }
 
-                const headers = lines[dataStartIndex].split(',').map(h => h.trim().toLowerCase().replace(/ /g, '').replace(/_/g, '').replace(/-/g, ''));
-                const macIdx = headers.findIndex(h => h === 'mac' || h === 'bssid' || h === 'netid' || h === 'macaddress' || h === 'ap' || h === 'apmac' || h === 'address');
-                const ssidIdx = headers.findIndex(h => h === 'ssid' || h === 'name' || h === 'essid' || h === 'networkname' || h === 'apname');
-                const rssiIdx = headers.findIndex(h => h === 'rssi' || h === 'signal' || h === 'bestlevel' || h === 'level' || h === 'signalstrength' || h === 'dbm' || h === 'maxsignal' || h === 'minsignal');
-                const channelIdx = headers.findIndex(h => h === 'channel' || h === 'chan' || h === 'ch');
-                const latIdx = headers.findIndex(h => h === 'trilat' || h === 'bestlat' || h === 'lat' || h === 'latitude' || h === 'currentlatitude' || h === 'gpslat' || h === 'gpslatitude' || h === 'n' || h === 'y');
-                const lonIdx = headers.findIndex(h => h === 'trilong' || h === 'bestlon' || h === 'lon' || h === 'longitude' || h === 'currentlongitude' || h === 'gpslon' || h === 'gpslongitude' || h === 'long' || h === 'lng' || h === 'e' || h === 'x');
-                const timeIdx = headers.findIndex(h => h === 'firsttime' || h === 'firstseen' || h === 'time' || h === 'lastseen' || h === 'lasttime' || h === 'date' || h === 'datetime' || h === 'timestamp');
+            function isHeaderLine(line) {
+                const lower = line.toLowerCase();
+                if (lower.includes('mac') || lower.includes('bssid')) return true;
+                // Headers such as NetStumbler's "NetID,..." carry a MAC column without the word
+                return normalizeHeaders(line).some(h => MAC_ALIASES.includes(h));
+            }
 
-                if (macIdx === -1) return { results: [], networkCount: 0 };
+            // Incremental parser: lines are pushed one at a time so files never have to be held in memory whole
+            function createCSVParser() {
+                const results = [];
+                let networkCount = 0;
+                let headerFound = false;
+                let done = false;
+                let macIdx = -1, ssidIdx = -1, rssiIdx = -1, channelIdx = -1, latIdx = -1, lonIdx = -1, timeIdx = -1;
+
+                function readHeader(line) {
+                    const headers = normalizeHeaders(line);
+                    macIdx = headers.findIndex(h => MAC_ALIASES.includes(h));
+                    ssidIdx = headers.findIndex(h => h === 'ssid' || h === 'name' || h === 'essid' || h === 'networkname' || h === 'apname');
+                    rssiIdx = headers.findIndex(h => h === 'rssi' || h === 'signal' || h === 'bestlevel' || h === 'level' || h === 'signalstrength' || h === 'dbm' || h === 'maxsignal' || h === 'minsignal');
+                    channelIdx = headers.findIndex(h => h === 'channel' || h === 'chan' || h === 'ch');
+                    latIdx = headers.findIndex(h => h === 'trilat' || h === 'bestlat' || h === 'lat' || h === 'latitude' || h === 'currentlatitude' || h === 'gpslat' || h === 'gpslatitude' || h === 'n' || h === 'y');
+                    lonIdx = headers.findIndex(h => h === 'trilong' || h === 'bestlon' || h === 'lon' || h === 'longitude' || h === 'currentlongitude' || h === 'gpslon' || h === 'gpslongitude' || h === 'long' || h === 'lng' || h === 'e' || h === 'x');
+                    timeIdx = headers.findIndex(h => h === 'firsttime' || h === 'firstseen' || h === 'time' || h === 'lastseen' || h === 'lasttime' || h === 'date' || h === 'datetime' || h === 'timestamp');
+                    headerFound = true;
+                    if (macIdx === -1) done = true;
+                }
 
-                for (let i = dataStartIndex + 1; i < lines.length; i++) {
-                    const line = lines[i].trim();
-                    if (line === '' || line.startsWith('#')) continue;
+                function pushLine(rawLine) {
+                    if (done) return;
+                    const line = rawLine.trim();
+                    if (!headerFound) {
+                        if (line === '' || line.startsWith('#') || line.toLowerCase().startsWith('wiglewifi')) return;
+                        if (isHeaderLine(line)) readHeader(line);
+                        return;
+                    }
+                    if (line === '' || line.startsWith('#')) return;
                     networkCount++;
 
+                    // Fast reject: cut out just the MAC column and only tokenize rows whose OUI matches.
+                    // Quotes ahead of the column end fall back to the tokenizer.
+                    let start = 0;
+                    for (let n = 0; n < macIdx; n++) {
+                        const comma = line.indexOf(',', start);
+                        if (comma === -1) return;
+                        start = comma + 1;
+                    }
+                    let end = line.indexOf(',', start);
+                    if (end === -1) end = line.length;
+                    const quote = line.indexOf('"');
+                    if ((quote === -1 || quote > end) && !OUI_TYPES.has(ouiKey(line.substring(start, end)))) return;
+
                     const cols = [];
                     let current = '';
                     let inQuotes = false;
@@ -485,13 +919,14 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                     }
                     cols.push(current.trim());
 
-                    if (cols.length <= macIdx) continue;
+                    if (cols.length <= macIdx) return;
                     const mac = cols[macIdx] || '';
-                    if (mac && isFlockDevice(mac)) {
+                    const deviceType = OUI_TYPES.get(ouiKey(mac));
+                    if (deviceType !== undefined) {
                         results.push({
                             mac: mac,
                             ssid: ssidIdx >= 0 ? (cols[ssidIdx] || 'N/A') : 'N/A',
-                            deviceType: getDeviceType(mac),
+                            deviceType: deviceType,
                             rssi: rssiIdx >= 0 ? (cols[rssiIdx] || 'N/A') : 'N/A',
                             channel: channelIdx >= 0 ? (cols[channelIdx] || 'N/A') : 'N/A',
                             lat: latIdx >= 0 ? (cols[latIdx] || 'N/A') : 'N/A',
@@ -500,33 +935,399 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                         });
                     }
                 }
+
+                return {
+                    pushLine,
+                    isDone: () => done,
+                    hasHeader: () => headerFound,
+                    counts: () => ({ rows: networkCount, matches: results.length }),
+                    finish: () => ({ results, networkCount })
+                };
+            }
+
+            function parseCSV(text, parser = createCSVParser()) {
+                for (const line of text.split(NEWLINE)) {
+                    parser.pushLine(line);
+                    if (parser.isDone()) break;
+                }
+                return parser.finish();
+            }
+
+            // Byte-range shards of large files: a line belongs to the shard holding its first byte, so
+            // the shard end is moved past the next newline and a partial first line is skipped.
+            // Shards other than the first take the header from the head of the file.
+            const HEADER_PROBE = 1 << 20;
+
+            // Offset just past the first newline at or after pos
+            async function lineBoundary(file, pos) {
+                while (pos < file.size) {
+                    const bytes = new Uint8Array(await file.slice(pos, pos + 65536).arrayBuffer());
+                    const nl = bytes.indexOf(10);
+                    if (nl !== -1) return pos + nl + 1;
+                    pos += bytes.length;
+                }
+                return file.size;
+            }
+
+            // Feed the file's leading lines to the parser up to its header; returns the byte offset
+            // just past the header line, or -1 when none is found in the probe
+            async function readShardHeader(file, parser) {
+                const head = new Uint8Array(await file.slice(0, HEADER_PROBE).arrayBuffer());
+                const decoder = new TextDecoder();
+                let pos = 0;
+                while (!parser.hasHeader()) {
+                    const nl = head.indexOf(10, pos);
+                    if (nl === -1) return -1;
+                    parser.pushLine(decoder.decode(head.subarray(pos, nl)));
+                    pos = nl + 1;
+                }
+                return pos;
+            }
+
+            // Progress of the current task, posted at most every PROGRESS_INTERVAL ms while it runs.
+            // Bytes are counted as read from the File, before decompression, so they add up to its size.
+            const PROGRESS_INTERVAL = 250;
+            let progress = null;
+
+            function countBytes(stream) {
+                if (typeof TransformStream === 'undefined') return stream;
+                return stream.pipeThrough(new TransformStream({
+                    transform(chunk, controller) {
+                        progress.bytes += chunk.byteLength;
+                        controller.enqueue(chunk);
+                    }
+                }));
+            }
+
+            function reportProgress(parser) {
+                const now = performance.now();
+                if (now - progress.reported < PROGRESS_INTERVAL) return;
+                progress.reported = now;
+                const counts = parser.counts();
+                self.postMessage({ type: 'progress', id: progress.id, bytes: progress.bytes,
+                    rows: progress.rows + counts.rows, matches: progress.matches + counts.matches });
+            }
+
+            async function parseFileStream(file, range) {
+                const name = file.name ? file.name.toLowerCase() : '';
+                if (name.endsWith('.zip')) return parseZip(file);
+                const format = compressionOf(name);
+                if (format) return parseStream(decompress(countBytes(file.stream()), format), createCSVParser());
+
+                const parser = createCSVParser();
+                let source = file;
+                let skipFirst = false;
+                if (range) {
+                    let start = 0;
+                    if (range.start > 0) {
+                        // Lines before the header end are not data, whichever shard they fall in
+                        const headerEnd = await readShardHeader(file, parser);
+                        if (headerEnd === -1 || parser.isDone() || range.end <= headerEnd) return parser.finish();
+                        start = Math.max(range.start, headerEnd);
+                        skipFirst = true;
+                    }
+                    const end = range.end < file.size ? await lineBoundary(file, range.end - 1) : file.size;
+                    source = file.slice(skipFirst ? start - 1 : 0, end);
+                }
+
+                if (!source.stream || typeof TextDecoderStream === 'undefined') {
+                    let text = await source.text();
+                    progress.bytes += source.size;
+                    if (skipFirst) text = text.substring(text.indexOf(NEWLINE) + 1 || text.length);
+                    return parseCSV(text, parser);
+                }
+                return parseStream(countBytes(source.stream()), parser, skipFirst);
+            }
+
+            // Read a byte stream in the decoder's bounded chunks, carrying the partial last line across chunk boundaries
+            async function parseStream(stream, parser, skipFirst = false) {
+                const reader = stream.pipeThrough(new TextDecoderStream()).getReader();
+                let carry = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    const chunk = carry + value;
+                    let start = 0;
+                    if (skipFirst) {
+                        // The partial first line belongs to the previous shard
+                        const first = chunk.indexOf(NEWLINE);
+                        if (first === -1) {
+                            carry = '';
+                            continue;
+                        }
+                        start = first + 1;
+                        skipFirst = false;
+                    }
+                    let nl;
+                    while ((nl = chunk.indexOf(NEWLINE, start)) !== -1) {
+                        parser.pushLine(chunk.substring(start, nl));
+                        start = nl + 1;
+                    }
+                    carry = chunk.substring(start);
+                    reportProgress(parser);
+                    if (parser.isDone()) {
+                        reader.cancel();
+                        carry = '';
+                        break;
+                    }
+                }
+                if (carry && !skipFirst) parser.pushLine(carry);
+                return parser.finish();
+            }
+
+            function decompress(stream, format) {
+                if (typeof DecompressionStream === 'undefined') throw new Error('DecompressionStream is not supported');
+                return stream.pipeThrough(new DecompressionStream(format));
+            }
+
+            // Zip member list from the central directory (with zip64 sizes and offsets)
+            async function zipEntries(file) {
+                const tailSize = Math.min(file.size, 65536 + 22);
+                const tail = new DataView(await file.slice(file.size - tailSize).arrayBuffer());
+                let eocd = -1;
+                for (let i = tail.byteLength - 22; i >= 0; i--) {
+                    if (tail.getUint32(i, true) === 0x06054b50) {
+                        eocd = i;
+                        break;
+                    }
+                }
+                if (eocd === -1) throw new Error('Not a zip archive');
+                let count = tail.getUint16(eocd + 10, true);
+                let dirSize = tail.getUint32(eocd + 12, true);
+                let dirOffset = tail.getUint32(eocd + 16, true);
+                // The zip64 locator sits just before the end record and points at the 64-bit one
+                if (eocd >= 20 && tail.getUint32(eocd - 20, true) === 0x07064b50) {
+                    const recordOffset = Number(tail.getBigUint64(eocd - 12, true));
+                    const record = new DataView(await file.slice(recordOffset, recordOffset + 56).arrayBuffer());
+                    count = Number(record.getBigUint64(32, true));
+                    dirSize = Number(record.getBigUint64(40, true));
+                    dirOffset = Number(record.getBigUint64(48, true));
+                }
+
+                const dir = new DataView(await file.slice(dirOffset, dirOffset + dirSize).arrayBuffer());
+                const decoder = new TextDecoder();
+                const entries = [];
+                let pos = 0;
+                for (let n = 0; n < count && pos + 46 <= dir.byteLength; n++) {
+                    if (dir.getUint32(pos, true) !== 0x02014b50) break;
+                    const method = dir.getUint16(pos + 10, true);
+                    let compressedSize = dir.getUint32(pos + 20, true);
+                    let size = dir.getUint32(pos + 24, true);
+                    const nameLength = dir.getUint16(pos + 28, true);
+                    const extraLength = dir.getUint16(pos + 30, true);
+                    const commentLength = dir.getUint16(pos + 32, true);
+                    let offset = dir.getUint32(pos + 42, true);
+                    const name = decoder.decode(new Uint8Array(dir.buffer, pos + 46, nameLength));
+                    // Zip64 extra field: 64-bit values for whichever of the three fields are saturated
+                    let extra = pos + 46 + nameLength;
+                    const extraEnd = extra + extraLength;
+                    while (extra + 4 <= extraEnd) {
+                        const length = dir.getUint16(extra + 2, true);
+                        if (dir.getUint16(extra, true) === 1) {
+                            let field = extra + 4;
+                            if (size === 0xffffffff) {
+                                size = Number(dir.getBigUint64(field, true));
+                                field += 8;
+                            }
+                            if (compressedSize === 0xffffffff) {
+                                compressedSize = Number(dir.getBigUint64(field, true));
+                                field += 8;
+                            }
+                            if (offset === 0xffffffff) offset = Number(dir.getBigUint64(field, true));
+                        }
+                        extra += 4 + length;
+                    }
+                    entries.push({ name, method, offset, compressedSize });
+                    pos = extraEnd + commentLength;
+                }
+                return entries;
+            }
+
+            // Each capture in the archive is sliced out of the File and inflated as a stream,
+            // so nothing is extracted to memory or disk whole
+            async function parseZip(file) {
+                const results = [];
+                let networkCount = 0;
+                for (const entry of await zipEntries(file)) {
+                    const name = entry.name.toLowerCase();
+                    if (name.endsWith('/') || name.endsWith('.zip') || !isScanFile(name)) continue;
+                    if (entry.method !== 0 && entry.method !== 8) continue;
+                    const local = new DataView(await file.slice(entry.offset, entry.offset + 30).arrayBuffer());
+                    const start = entry.offset + 30 + local.getUint16(26, true) + local.getUint16(28, true);
+                    let stream = countBytes(file.slice(start, start + entry.compressedSize).stream());
+                    if (entry.method === 8) stream = decompress(stream, 'deflate-raw');
+                    const format = compressionOf(name);
+                    if (format) stream = decompress(stream, format);
+                    const member = await parseStream(stream, createCSVParser());
+                    for (const r of member.results) results.push(r);
+                    networkCount += member.networkCount;
+                    progress.rows += member.networkCount;
+                    progress.matches += member.results.length;
+                }
                 return { results, networkCount };
             }
 
-            self.onmessage = function(e) {
-                const result = parseCSV(e.data.text);
-                self.postMessage({ id: e.data.id, ...result });
+            // Per-file results cached in IndexedDB under the page's scanCacheKey (the file's path), one entry
+            // per path, reused while the file's size, mtime, sampled content hash and OUI table version match
+            const CACHE_SAMPLE = 65536;
+            let cacheDb = null;
+
+            function openCache() {
+                if (!cacheDb) {
+                    cacheDb = new Promise(resolve => {
+                        if (typeof indexedDB === 'undefined') return resolve(null);
+                        try {
+                            const request = indexedDB.open('flock-scan-cache', 1);
+                            request.onupgradeneeded = () => request.result.createObjectStore('files');
+                            request.onsuccess = () => resolve(request.result);
+                            request.onerror = () => resolve(null);
+                        } catch (err) {
+                            resolve(null);
+                        }
+                    });
+                }
+                return cacheDb;
+            }
+
+            function cacheRequest(db, mode, run) {
+                return new Promise(resolve => {
+                    try {
+                        const request = run(db.transaction('files', mode).objectStore('files'));
+                        request.onsuccess = () => resolve(request.result);
+                        request.onerror = () => resolve(undefined);
+                    } catch (err) {
+                        resolve(undefined);
+                    }
+                });
+            }
+
+            // FNV-1a over the first and last 64 KiB
+            async function fileSignature(file) {
+                const head = new Uint8Array(await file.slice(0, CACHE_SAMPLE).arrayBuffer());
+                const tail = file.size > CACHE_SAMPLE ?
+                    new Uint8Array(await file.slice(Math.max(CACHE_SAMPLE, file.size - CACHE_SAMPLE)).arrayBuffer()) :
+                    new Uint8Array(0);
+                let hash = 0x811c9dc5;
+                for (const bytes of [head, tail]) {
+                    for (let i = 0; i < bytes.length; i++) hash = Math.imul(hash ^ bytes[i], 16777619);
+                }
+                return [file.size, file.lastModified, (hash >>> 0).toString(16), OUI_VERSION].join(':');
+            }
+
+            self.onmessage = async function(e) {
+                if (e.data.type === 'ouis') {
+                    setOUIs(e.data.ouis, e.data.version);
+                    return;
+                }
+                const file = e.data.file;
+                const range = e.data.range;
+                progress = { id: e.data.id, bytes: 0, rows: 0, matches: 0, reported: performance.now() };
+                // Shards are cached individually under the file's signature
+                const cacheId = range ? e.data.cacheKey + '#' + range.start : e.data.cacheKey;
+                const db = file ? await openCache() : null;
+                let signature = null;
+                if (db) {
+                    try {
+                        signature = await fileSignature(file);
+                    } catch (err) {
+                        signature = null;
+                    }
+                }
+                if (signature) {
+                    const cached = await cacheRequest(db, 'readonly', store => store.get(cacheId));
+                    if (cached && cached.signature === signature) {
+                        self.postMessage({ id: e.data.id, networkCount: cached.networkCount, matches: cached.matches || 0,
+                            cached: true, columns: cached.columns }, resultTransferList(cached.columns));
+                        return;
+                    }
+                }
+
+                let result;
+                try {
+                    result = file ? await parseFileStream(file, range) : parseCSV(e.data.text);
+                } catch (err) {
+                    result = { results: [], networkCount: 0, error: String(err) };
+                }
+                // Collapse this file's repeated sightings before posting; the main thread merges across files
+                const devices = createResultStore();
+                appendResults(devices, encodeResults(result.results), e.data.id);
+                const columns = storeToPayload(devices);
+                // put() clones the payload synchronously, before its buffers are transferred below
+                if (signature && !result.error) {
+                    cacheRequest(db, 'readwrite', store => store.put({ signature, networkCount: result.networkCount,
+                        matches: result.results.length, columns }, cacheId));
+                }
+                self.postMessage({ id: e.data.id, networkCount: result.networkCount, matches: result.results.length,
+                    error: result.error, columns }, resultTransferList(columns));
             };
         `;
         }
 
+        // Short hash of the OUI table; cached scan results are only reused for the same table
+        function ouiTableVersion() {
+            const text = JSON.stringify(FLOCK_OUIS);
+            let hash = 0x811c9dc5;
+            for (let i = 0; i < text.length; i++) hash = Math.imul(hash ^ text.charCodeAt(i), 16777619);
+            return (hash >>> 0).toString(16);
+        }
+
+        // Scan workers are started by the first scan and kept for later ones, then released once
+        // no scan has used them for WORKER_IDLE_MS. The worker script doesn't depend on the OUI
+        // table, so its blob URL is built once; OUI edits reach the workers as versioned messages.
+        // Each scan session holds the whole pool, so a scan started while another runs waits its turn.
         const numWorkers = navigator.hardwareConcurrency || 4;
+        const WORKER_IDLE_MS = 60000;
         let workerUrl = null;
+        let workersLeased = false;
+        const workerWaiters = [];
+        let workerIdleTimer = null;
+        let ouiVersion = ouiTableVersion();
+        // OUI table version each worker was last sent
+        const workerOUIs = new Map();
+
+        // Calls onReady(workers) once the pool is free; the caller owns it until releaseWorkers()
+        function acquireWorkers(onReady) {
+            workerWaiters.push(onReady);
+            grantWorkers();
+        }
 
-        function initWorkers() {
-            // Terminate existing workers
-            workers.forEach(w => w.terminate());
-            workers = [];
-            if (workerUrl) URL.revokeObjectURL(workerUrl);
+        function grantWorkers() {
+            if (workersLeased || workerWaiters.length === 0) return;
+            workersLeased = true;
+            clearTimeout(workerIdleTimer);
+            workerIdleTimer = null;
+            if (workers.length === 0) {
+                if (!workerUrl) {
+                    const workerBlob = new Blob([createWorkerCode()], { type: 'application/javascript' });
+                    workerUrl = URL.createObjectURL(workerBlob);
+                }
+                for (let i = 0; i < numWorkers; i++) {
+                    workers.push(new Worker(workerUrl));
+                }
+            }
+            workerWaiters.shift()(workers);
+        }
 
-            const workerBlob = new Blob([createWorkerCode()], { type: 'application/javascript' });
-            workerUrl = URL.createObjectURL(workerBlob);
-            for (let i = 0; i < numWorkers; i++) {
-                workers.push(new Worker(workerUrl));
+        function releaseWorkers() {
+            workersLeased = false;
+            if (workerWaiters.length > 0) {
+                grantWorkers();
+                return;
             }
+            workerIdleTimer = setTimeout(() => {
+                workers.forEach(w => w.terminate());
+                workers = [];
+                workerOUIs.clear();
+                workerIdleTimer = null;
+            }, WORKER_IDLE_MS);
         }
 
-        initWorkers();
+        // Bring a worker's matcher up to the current OUI table before handing it a task
+        function syncOUIs(worker) {
+            if (workerOUIs.get(worker) === ouiVersion) return;
+            worker.postMessage({ type: 'ouis', version: ouiVersion, ouis: FLOCK_OUIS });
+            workerOUIs.set(worker, ouiVersion);
+        }
 
         // GIF rotation (excludes Welcome_Ringmaster and jason bourne which plays first)
         const gifList = [
@@ -609,115 +1410,342 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             handleDrop(e.dataTransfer.items);
         });
 
+        // Folder picks include every file, so they get the same filter as drops
+        if (!COMPRESSION_FORMATS['.zst']) fileInput.accept = fileInput.accept.replace(',.zst', '');
         fileInput.addEventListener('change', (e) => {
             processFiles(Array.from(e.target.files));
         });
 
+        // Directory reads and file-handle requests kept in flight while walking dropped folders
+        const DIRECTORY_CONCURRENCY = 16;
+
+        // Path of each dropped file within the drop; Files from directory entries carry no webkitRelativePath
+        const filePaths = new WeakMap();
+
+        // Scan cache key: the file's path, so same-named files in different folders keep separate
+        // entries and an edited file replaces its old entry. fileSignature checks size and mtime.
+        function scanCacheKey(file) {
+            return filePaths.get(file) || file.webkitRelativePath || file.name;
+        }
+
         async function handleDrop(items) {
-            const files = [];
             const entries = [];
 
             for (let item of items) {
                 if (item.webkitGetAsEntry) {
-                    entries.push(item.webkitGetAsEntry());
+                    const entry = item.webkitGetAsEntry();
+                    if (entry) entries.push(entry);
                 }
             }
 
-            await getAllFiles(entries, files);
-            processFiles(files);
+            // Files are scanned as the walk finds them rather than after it completes
+            const scan = startScan();
+            await walkEntries(entries, (file, path) => {
+                filePaths.set(file, path);
+                scan.add([file]);
+            }, path => scan.skip(path));
+            scan.close();
         }
 
-        async function getAllFiles(entries, files) {
-            for (let entry of entries) {
-                if (entry.isFile) {
-                    const name = entry.name.toLowerCase();
-                    if (name.endsWith('.csv') || name.endsWith('.netxml') || name.endsWith('.kismet') ||
-                        name.endsWith('.kml') || name.endsWith('.ns1') || name.endsWith('.txt') ||
-                        name.endsWith('.tsv') || name.endsWith('.log') || name.endsWith('.xml')) {
-                        const file = await new Promise(resolve => entry.file(resolve));
-                        files.push(file);
+        // Walk dropped entries with up to DIRECTORY_CONCURRENCY reads in flight, passing each
+        // matching file and its path in the drop to onFile as soon as its handle is available,
+        // and the path of each server-only capture to onSkip
+        function walkEntries(entries, onFile, onSkip) {
+            return new Promise(resolve => {
+                const pending = [...entries];
+                let active = 0;
+
+                async function visit(entry) {
+                    if (entry.isFile) {
+                        if (isScanFile(entry.name)) onFile(await new Promise((res, rej) => entry.file(res, rej)), entry.fullPath);
+                        else if (isServerOnlyFile(entry.name)) onSkip(entry.fullPath);
+                        return;
                     }
-                } else if (entry.isDirectory) {
+                    if (!entry.isDirectory) return;
+                    // readEntries returns the directory in batches until an empty one
                     const reader = entry.createReader();
-                    let allEntries = [];
-                    // readEntries may not return all entries at once, need to loop
-                    const readAll = async () => {
-                        const batch = await new Promise(resolve => reader.readEntries(resolve));
-                        if (batch.length > 0) {
-                            allEntries = allEntries.concat(batch);
-                            await readAll();
-                        }
-                    };
-                    await readAll();
-                    await getAllFiles(allEntries, files);
+                    while (true) {
+                        const batch = await new Promise((res, rej) => reader.readEntries(res, rej));
+                        if (batch.length === 0) break;
+                        for (const child of batch) pending.push(child);
+                        pump();
+                    }
+                }
+
+                function pump() {
+                    while (active < DIRECTORY_CONCURRENCY && pending.length > 0) {
+                        const entry = pending.pop();
+                        active++;
+                        visit(entry)
+                            .catch(err => console.warn('Skipping ' + entry.fullPath + ': ' + err))
+                            .finally(() => {
+                                active--;
+                                pump();
+                            });
+                    }
+                    if (active === 0 && pending.length === 0) resolve();
                 }
+
+                pump();
+            });
+        }
+
+        // Files above this size are split into byte-range shards that several workers parse at once
+        const SHARD_SIZE = 64 * 1024 * 1024;
+
+        function scanTasks(file) {
+            // Compressed bytes can't be split at line boundaries, so archives are always one task
+            if (file.size <= SHARD_SIZE || isArchive(file.name)) return [{ file, range: null, size: file.size }];
+            const tasks = [];
+            for (let start = 0; start < file.size; start += SHARD_SIZE) {
+                const end = Math.min(start + SHARD_SIZE, file.size);
+                tasks.push({ file, range: { start, end }, size: end - start });
             }
+            return tasks;
         }
 
-        function processFiles(files) {
-            if (files.length === 0) {
-                alert('No wardriving files found (CSV, KML, Kismet, etc.)');
-                return;
+        // Max-heap of scan tasks by size, so the largest known task is always handed out next
+        function pushTask(heap, task) {
+            let i = heap.length;
+            heap.push(task);
+            while (i > 0) {
+                const parent = (i - 1) >> 1;
+                if (heap[parent].size >= task.size) break;
+                heap[i] = heap[parent];
+                i = parent;
             }
+            heap[i] = task;
+        }
 
-            allResults = [];
-            totalNetworksCount = 0;
+        function popTask(heap) {
+            const top = heap[0];
+            const last = heap.pop();
+            if (heap.length > 0) {
+                let i = 0;
+                while (true) {
+                    let child = 2 * i + 1;
+                    if (child >= heap.length) break;
+                    if (child + 1 < heap.length && heap[child + 1].size > heap[child].size) child++;
+                    if (heap[child].size <= last.size) break;
+                    heap[i] = heap[child];
+                    i = child;
+                }
+                heap[i] = last;
+            }
+            return top;
+        }
+
+        // Scan progress is redrawn on this cadence from the workers' progress messages rather than per file,
+        // and a busy worker that has reported nothing for STALL_MS is flagged as stalled
+        const PROGRESS_REFRESH = 500;
+        const STALL_MS = 5000;
+
+        function formatMB(bytes) {
+            return (bytes / (1024 * 1024)).toFixed(1) + ' MB';
+        }
+
+        function processFiles(files) {
+            const scan = startScan();
+            scan.add(files.filter(file => isScanFile(file.name)));
+            files.filter(file => isServerOnlyFile(file.name)).forEach(file => scan.skip(file.webkitRelativePath || file.name));
+            scan.close();
+        }
+
+        // A scan session. Files may be added while folders are still being walked: their tasks go
+        // to idle workers right away, and the scan completes once it is closed and all workers idle.
+        // Files added before the session gets the worker pool are queued until it does.
+        function startScan() {
+            let started = false;
+            let ready = false;
+            let closed = false;
+            let finished = false;
+            let append = false;
+            let changedRows = null;
+            let filesFound = 0;
             let filesProcessed = 0;
-            let workerIndex = 0;
-            let fileQueue = [...files];
-            let activeWorkers = 0;
-            const startTime = performance.now();
-
-            shuffledGifs = shuffleArray(gifList);
-            gifIndex = 0;
-            currentGifElement = 0;
-            const firstGif = 'gifs/jason%20bourne%20GIF.gif';
-            const secondGif = getNextGif();
-            dropZone.innerHTML = '<h3>Processing ' + files.length + ' CSV file(s) with ' + numWorkers + ' parallel workers...</h3><div class="gif-container"><img src="' + firstGif + '" class="hacker-gif visible" id="hackerGif1"><img src="' + secondGif + '" class="hacker-gif" id="hackerGif2"></div><p style="color: #8b949e;" id="progressText">0 / ' + files.length + ' files</p>';
-
-            // Rotate GIFs every 3 seconds with crossfade
-            gifInterval = setInterval(crossfadeGif, 3000);
-
-            function updateProgress() {
-                const elapsed = ((performance.now() - startTime) / 1000).toFixed(1);
+            let filesCached = 0;
+            // "name: error" for each file a worker couldn't read or the browser can't parse
+            const failures = [];
+            // Server-only captures left out of this scan
+            const skipped = [];
+            // Idle workers pull the next task from one shared queue, so none waits on another's backlog
+            const taskQueue = [];
+            const fileState = new Map();
+            const workerTasks = new Map();
+            const workerBusy = new Map();
+            const idleWorkers = [];
+            let startTime = 0;
+            // Byte and row totals of finished tasks, plus each busy worker's latest progress message
+            let totalBytes = 0;
+            let bytesDone = 0;
+            let rowsDone = 0;
+            let matchesDone = 0;
+            const workerLive = new Map();
+            let progressInterval = null;
+
+            function begin(pool) {
+                ready = true;
+                // Append mode merges into the current store and only refreshes the rows it touches
+                append = document.getElementById('appendScan').checked && resultStore !== null;
+                changedRows = append ? new Set() : null;
+                if (!append) {
+                    resultStore = createResultStore();
+                    totalNetworksCount = 0;
+                }
+                startTime = performance.now();
+
+                shuffledGifs = shuffleArray(gifList);
+                gifIndex = 0;
+                currentGifElement = 0;
+                const firstGif = 'gifs/jason%20bourne%20GIF.gif';
+                const secondGif = getNextGif();
+                dropZone.innerHTML = '<h3>Processing files with ' + numWorkers + ' parallel workers...</h3><div class="gif-container"><img src="' + firstGif + '" class="hacker-gif visible" id="hackerGif1"><img src="' + secondGif + '" class="hacker-gif" id="hackerGif2"></div><p style="color: #8b949e;" id="progressText">0 / 0 files</p><p style="color: #8b949e; font-size: 12px;" id="workerStats"></p>';
+
+                // Rotate GIFs every 3 seconds with crossfade
+                gifInterval = setInterval(crossfadeGif, 3000);
+                progressInterval = setInterval(renderProgress, PROGRESS_REFRESH);
+
+                pool.forEach(worker => {
+                    worker.onmessage = (e) => onResult(worker, e);
+                    workerBusy.set(worker, 0);
+                    idleWorkers.push(worker);
+                });
+                while (idleWorkers.length > 0 && taskQueue.length > 0) dispatch(idleWorkers.pop());
+                renderProgress();
+                maybeFinish();
+            }
+
+            function renderProgress() {
+                const now = performance.now();
+                const seconds = Math.max((now - startTime) / 1000, 0.001);
+                let bytes = bytesDone;
+                let rows = rowsDone;
+                let matches = matchesDone;
+                const stats = workers.map((worker, i) => {
+                    const current = workerTasks.get(worker);
+                    if (!current) return 'W' + (i + 1) + ' idle';
+                    const live = workerLive.get(worker) || { bytes: 0, rows: 0, matches: 0, at: current.started };
+                    bytes += live.bytes;
+                    rows += live.rows;
+                    matches += live.matches;
+                    const rate = live.bytes / Math.max((now - current.started) / 1000, 0.001);
+                    return 'W' + (i + 1) + ' ' + formatMB(rate) + '/s' + (now - live.at > STALL_MS ? ' (stalled)' : '');
+                });
                 const progressText = document.getElementById('progressText');
                 if (progressText) {
-                    progressText.textContent = filesProcessed + ' / ' + files.length + ' files (' + elapsed + 's)';
+                    const percent = totalBytes > 0 ? ' (' + Math.floor(100 * bytes / totalBytes) + '%)' : '';
+                    const failed = failures.length > 0 ? ' (' + failures.length + ' failed)' : '';
+                    progressText.textContent = filesProcessed + ' / ' + filesFound + (closed ? '' : '+') + ' files' + failed + ' · ' +
+                        formatMB(bytes) + ' / ' + formatMB(totalBytes) + percent + ' · ' +
+                        Math.round(rows / seconds).toLocaleString() + ' rows/s · ' + matches.toLocaleString() +
+                        ' matches (' + seconds.toFixed(1) + 's)';
                 }
+                const workerStats = document.getElementById('workerStats');
+                if (workerStats) workerStats.textContent = stats.join(' · ');
             }
 
-            function processNext(worker) {
-                if (fileQueue.length === 0) {
-                    activeWorkers--;
-                    if (activeWorkers === 0) {
-                        if (gifInterval) clearInterval(gifInterval);
-                        const totalTime = ((performance.now() - startTime) / 1000).toFixed(2);
-                        displayResults(totalNetworksCount);
-                        dropZone.innerHTML = '<h3>Drop Wardriving CSV Files or Folders Here</h3><p style="color: #8b949e; margin: 10px 0;">Processed ' + files.length + ' files in ' + totalTime + 's</p>';
-                    }
+            function dispatch(worker) {
+                // The worker streams the File itself, so no full-text copy is made on the main thread
+                const task = popTask(taskQueue);
+                workerTasks.set(worker, { task, started: performance.now() });
+                syncOUIs(worker);
+                worker.postMessage({ id: task.file.name, cacheKey: scanCacheKey(task.file), file: task.file, range: task.range });
+            }
+
+            function onResult(worker, e) {
+                if (e.data.type === 'progress') {
+                    workerLive.set(worker, { bytes: e.data.bytes, rows: e.data.rows, matches: e.data.matches, at: performance.now() });
                     return;
                 }
+                const { task, started } = workerTasks.get(worker);
+                workerTasks.delete(worker);
+                workerLive.delete(worker);
+                workerBusy.set(worker, workerBusy.get(worker) + performance.now() - started);
+                bytesDone += task.size;
+                rowsDone += e.data.networkCount;
+                matchesDone += e.data.matches || 0;
+                appendResults(resultStore, e.data.columns, undefined, changedRows);
+                totalNetworksCount += e.data.networkCount;
+                const state = fileState.get(task.file);
+                state.cached = state.cached && e.data.cached === true;
+                if (e.data.error && !state.error) {
+                    state.error = e.data.error;
+                    console.warn('Could not read ' + task.file.name + ': ' + e.data.error);
+                }
+                if (--state.shardsLeft === 0) {
+                    if (state.cached) filesCached++;
+                    if (state.error) failures.push(task.file.name + ': ' + state.error);
+                    filesProcessed++;
+                }
 
-                const file = fileQueue.shift();
-                const reader = new FileReader();
-                reader.onload = function(e) {
-                    worker.postMessage({ id: file.name, text: e.target.result });
-                };
-                reader.readAsText(file);
+                if (taskQueue.length > 0) {
+                    dispatch(worker);
+                } else {
+                    idleWorkers.push(worker);
+                    maybeFinish();
+                }
             }
 
-            // Setup worker handlers
-            workers.forEach(worker => {
-                worker.onmessage = function(e) {
-                    allResults = allResults.concat(e.data.results);
-                    totalNetworksCount += e.data.networkCount;
-                    filesProcessed++;
-                    updateProgress();
-                    processNext(worker);
-                };
-                activeWorkers++;
-                processNext(worker);
-            });
+            function maybeFinish() {
+                if (finished || !ready || !closed || taskQueue.length > 0 || idleWorkers.length < workers.length) return;
+                finished = true;
+                if (gifInterval) clearInterval(gifInterval);
+                clearInterval(progressInterval);
+                const wallTime = performance.now() - startTime;
+                const totalTime = (wallTime / 1000).toFixed(2);
+                if (append) {
+                    mergeAppendedRows(changedRows);
+                } else {
+                    allResults = getResultRows(resultStore);
+                    searchIndex = null;
+                    sortIndex = null;
+                    displayResults(totalNetworksCount);
+                }
+                const cachedNote = filesCached > 0 ? ' (' + filesCached + ' unchanged, from cache)' : '';
+                const failedNote = failures.length > 0 ? '<br><span style="color: #f85149;">' + failures.length +
+                    ' could not be read: ' + failures.slice(0, 5).map(escapeHtml).join('; ') +
+                    (failures.length > 5 ? '; and ' + (failures.length - 5) + ' more' : '') + '</span>' : '';
+                const utilization = workers.map(w => Math.round(100 * workerBusy.get(w) / Math.max(wallTime, 1)) + '%').join(' ');
+                dropZone.innerHTML = '<h3>Drop Wardriving CSV Files or Folders Here</h3><p style="color: #8b949e; margin: 10px 0;">' + (append ? 'Added ' : 'Processed ') + filesFound + ' files in ' + totalTime + 's' + cachedNote + failedNote + '<br>Worker utilization: ' + utilization + '</p>';
+                // Last, since a scan waiting for the pool starts from here
+                releaseWorkers();
+            }
+
+            return {
+                add(files) {
+                    if (files.length === 0) return;
+                    if (!started) {
+                        started = true;
+                        acquireWorkers(begin);
+                    }
+                    for (const file of files) {
+                        const tasks = scanTasks(file);
+                        fileState.set(file, { shardsLeft: tasks.length, cached: true });
+                        tasks.forEach(task => {
+                            pushTask(taskQueue, task);
+                            totalBytes += task.size;
+                        });
+                        filesFound++;
+                    }
+                    while (idleWorkers.length > 0 && taskQueue.length > 0) dispatch(idleWorkers.pop());
+                },
+
+                // A capture in a format only the Python engine reads, reported with the scan's failures
+                skip(name) {
+                    skipped.push(name);
+                    failures.push(name + ': ' + SERVER_ONLY_NOTE);
+                },
+
+                close() {
+                    closed = true;
+                    if (!started) {
+                        alert(skipped.length > 0 ? skipped.join(', ') + ': ' + SERVER_ONLY_NOTE : 'No wardriving CSV files found');
+                        return;
+                    }
+                    if (ready) renderProgress();
+                    maybeFinish();
+                }
+            };
         }
 
         function normalizeMAC(mac) {
@@ -834,68 +1862,188 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             return R * c;
         }
 
-        // Find complete installations (clusters of different device types)
-        function findInstallations() {
-            installations = [];
-            const used = new Set();
+        const METERS_PER_DEGREE = 6371000 * Math.PI / 180;
+
+        // Uniform grid over lat/lon with cells at least cellMeters wide, so every point
+        // within cellMeters of a device lies in its own or one of the 8 neighbouring cells
+        function buildGridIndex(lats, lons, cellMeters) {
+            let maxAbsLat = 0;
+            for (let i = 0; i < lats.length; i++) maxAbsLat = Math.max(maxAbsLat, Math.abs(lats[i]));
+            // Small slack covers the great-circle vs parallel-arc difference
+            const cellLat = cellMeters * 1.01 / METERS_PER_DEGREE;
+            const cellLon = cellMeters * 1.01 / (METERS_PER_DEGREE * Math.cos(Math.min(maxAbsLat, 89) * Math.PI / 180));
+            const cells = new Map();
+            const rows = new Int32Array(lats.length);
+            const cols = new Int32Array(lats.length);
+            for (let i = 0; i < lats.length; i++) {
+                rows[i] = Math.floor(lats[i] / cellLat);
+                cols[i] = Math.floor(lons[i] / cellLon);
+                const key = gridKey(rows[i], cols[i]);
+                const cell = cells.get(key);
+                if (cell) cell.push(i);
+                else cells.set(key, [i]);
+            }
+            return { cells, rows, cols };
+        }
 
-            // Get devices with valid coordinates
-            const devicesWithCoords = allResults.filter(r => {
-                const lat = parseFloat(r.lat);
-                const lon = parseFloat(r.lon);
-                return !isNaN(lat) && !isNaN(lon) && lat !== 0 && lon !== 0;
-            });
+        function gridKey(row, col) {
+            return (row + 4194304) * 8388608 + (col + 4194304);
+        }
 
-            // Group by device type category
-            const getTypeCategory = (type) => {
-                if (type.includes('Battery')) return 'battery';
-                if (type.includes('Camera')) return 'camera';
-                return 'custom';
-            };
-
-            // For each device, find nearby devices of different types
-            for (let i = 0; i < devicesWithCoords.length; i++) {
-                if (used.has(i)) continue;
+        // Device type categories, indexed by the values stored in clusterData.categories
+        const TYPE_CATEGORIES = ['battery', 'camera', 'custom'];
 
-                const device = devicesWithCoords[i];
-                const lat1 = parseFloat(device.lat);
-                const lon1 = parseFloat(device.lon);
-                const type1 = getTypeCategory(device.deviceType);
+        function getTypeCategory(type) {
+            if (type.includes('Battery')) return 0;
+            if (type.includes('Camera')) return 1;
+            return 2;
+        }
 
-                const cluster = [device];
-                const clusterTypes = new Set([type1]);
-                used.add(i);
+        // Greedy grouping of nearby devices of different type categories into installations.
+        // Runs inside the cluster worker; returns installation member indices as flat typed arrays
+        // (installation k is members[offsets[k]] .. members[offsets[k + 1] - 1]).
+        function clusterDevices(lats, lons, categories, radius) {
+            const grid = buildGridIndex(lats, lons, radius);
+            const used = new Uint8Array(lats.length);
+            const members = [];
+            const offsets = [0];
+
+            for (let i = 0; i < lats.length; i++) {
+                if (used[i]) continue;
+                used[i] = 1;
+                const cluster = [i];
+                let typeMask = 1 << categories[i];
+
+                // Candidates from the neighbouring cells, visited in original order so the
+                // greedy grouping matches a full pairwise scan
+                const candidates = [];
+                for (let dr = -1; dr <= 1; dr++) {
+                    for (let dc = -1; dc <= 1; dc++) {
+                        const cell = grid.cells.get(gridKey(grid.rows[i] + dr, grid.cols[i] + dc));
+                        if (!cell) continue;
+                        for (const j of cell) {
+                            if (j > i && !used[j]) candidates.push(j);
+                        }
+                    }
+                }
+                candidates.sort((a, b) => a - b);
+
+                for (const j of candidates) {
+                    const bit = 1 << categories[j];
+                    if (typeMask & bit) continue;
+                    if (getDistanceMeters(lats[i], lons[i], lats[j], lons[j]) <= radius) {
+                        cluster.push(j);
+                        typeMask |= bit;
+                        used[j] = 1;
+                    }
+                }
 
-                // Find nearby devices of different types
-                for (let j = i + 1; j < devicesWithCoords.length; j++) {
-                    if (used.has(j)) continue;
+                // Only count as installation if multiple device types found
+                if (cluster.length >= 2) {
+                    for (const j of cluster) members.push(j);
+                    offsets.push(members.length);
+                }
+            }
 
-                    const other = devicesWithCoords[j];
-                    const lat2 = parseFloat(other.lat);
-                    const lon2 = parseFloat(other.lon);
-                    const type2 = getTypeCategory(other.deviceType);
+            return { offsets: Uint32Array.from(offsets), members: Uint32Array.from(members) };
+        }
 
-                    const distance = getDistanceMeters(lat1, lon1, lat2, lon2);
+        // Installation clustering runs in its own worker so dragging the radius slider never blocks the page
+        let clusterData = null;
+        let clusterWorker = null;
+        let clusterWorkerUrl = null;
+        let clusterWorkerStale = true;
+        let clusterJobId = 0;
+        let clusterJobBusy = false;
+        let clusterCallback = null;
+        let clusterDebounce = null;
+
+        function createClusterWorkerCode() {
+            return [
+                'const METERS_PER_DEGREE = ' + METERS_PER_DEGREE + ';',
+                getDistanceMeters.toString(),
+                gridKey.toString(),
+                buildGridIndex.toString(),
+                clusterDevices.toString(),
+                'let data = null;',
+                'self.onmessage = function(e) {',
+                '    if (e.data.type === "data") { data = e.data; return; }',
+                '    const result = clusterDevices(data.lats, data.lons, data.categories, e.data.radius);',
+                '    self.postMessage({ jobId: e.data.jobId, ...result }, [result.offsets.buffer, result.members.buffer]);',
+                '};'
+            ].join(String.fromCharCode(10));
+        }
 
-                    if (distance <= clusterRadius && !clusterTypes.has(type2)) {
-                        cluster.push(other);
-                        clusterTypes.add(type2);
-                        used.add(j);
-                    }
+        // Parse coordinates of allResults once into typed arrays for the cluster worker
+        function prepareClusterData() {
+            const devices = [];
+            const latList = [];
+            const lonList = [];
+            for (const r of allResults) {
+                const lat = parseFloat(r.lat);
+                const lon = parseFloat(r.lon);
+                if (Number.isFinite(lat) && Number.isFinite(lon) && lat !== 0 && lon !== 0) {
+                    devices.push(r);
+                    latList.push(lat);
+                    lonList.push(lon);
                 }
+            }
+            clusterData = {
+                devices,
+                lats: Float64Array.from(latList),
+                lons: Float64Array.from(lonList),
+                categories: Uint8Array.from(devices, d => getTypeCategory(d.deviceType))
+            };
+            clusterWorkerStale = true;
+        }
 
-                // Only count as installation if multiple device types found
-                if (clusterTypes.size >= 2) {
-                    installations.push({
-                        devices: cluster,
-                        types: Array.from(clusterTypes),
-                        centerLat: lat1,
-                        centerLon: lon1
-                    });
+        function startClusterWorker() {
+            if (clusterWorker) clusterWorker.terminate();
+            if (!clusterWorkerUrl) {
+                clusterWorkerUrl = URL.createObjectURL(new Blob([createClusterWorkerCode()], { type: 'application/javascript' }));
+            }
+            clusterWorker = new Worker(clusterWorkerUrl);
+            clusterWorker.onmessage = onClusterResult;
+            clusterWorker.postMessage({ type: 'data', lats: clusterData.lats, lons: clusterData.lons, categories: clusterData.categories });
+            clusterWorkerStale = false;
+        }
+
+        // Find complete installations (clusters of different device types) in the cluster worker.
+        // A newer request supersedes one still running: the busy worker is terminated and restarted.
+        function requestInstallations(onDone) {
+            if (!clusterData) prepareClusterData();
+            const jobId = ++clusterJobId;
+            clusterCallback = onDone;
+            if (!clusterWorker || clusterJobBusy || clusterWorkerStale) startClusterWorker();
+            clusterJobBusy = true;
+            clusterWorker.postMessage({ type: 'cluster', jobId, radius: clusterRadius });
+        }
+
+        function onClusterResult(e) {
+            if (e.data.jobId !== clusterJobId) return;
+            clusterJobBusy = false;
+
+            const { offsets, members } = e.data;
+            installations = [];
+            for (let k = 0; k + 1 < offsets.length; k++) {
+                const devices = [];
+                const types = [];
+                for (let m = offsets[k]; m < offsets[k + 1]; m++) {
+                    devices.push(clusterData.devices[members[m]]);
+                    types.push(TYPE_CATEGORIES[clusterData.categories[members[m]]]);
                 }
+                const first = members[offsets[k]];
+                installations.push({
+                    devices,
+                    types,
+                    centerLat: clusterData.lats[first],
+                    centerLon: clusterData.lons[first]
+                });
             }
 
-            return installations;
+            const callback = clusterCallback;
+            clusterCallback = null;
+            if (callback) callback();
         }
 
         function toggleInstallationView() {
@@ -957,7 +2105,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         function updateAlertBox() {
             const alertBox = document.getElementById('alertBox');
             if (allResults.length > 0) {
-                let alertMsg = 'FLOCK SAFETY DEVICES DETECTED: ' + allResults.length + ' surveillance device(s) found in your scan data.';
+                let alertMsg = 'FLOCK SAFETY DEVICES DETECTED: ' + allResults.length + ' surveillance device(s) found in your scan data (' + resultStore.sightings.toLocaleString() + ' sightings).';
                 if (installations.length > 0) {
                     alertMsg += ' <strong>' + installations.length + ' complete installation(s)</strong> identified (multiple device types within ' + clusterRadius + 'm).';
                     if (fsFilterMode) {
@@ -997,17 +2145,34 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         function updateClusterRadius() {
             clusterRadius = parseInt(document.getElementById('clusterRadius').value);
             document.getElementById('radiusValue').textContent = clusterRadius + 'm';
-            findInstallations();
-            document.getElementById('completeInstalls').textContent = installations.length;
-            if (clusterMode) {
-                filterToInstallations();
-                updateMapMarkers();
-                updateAlertBox();
-            }
+            clearTimeout(clusterDebounce);
+            clusterDebounce = setTimeout(() => requestInstallations(() => {
+                document.getElementById('completeInstalls').textContent = installations.length;
+                if (clusterMode) {
+                    filterToInstallations();
+                    updateMapMarkers();
+                    updateAlertBox();
+                }
+            }), 50);
         }
 
         function displayResults(totalNetworks) {
             document.getElementById('results').classList.remove('hidden');
+            updateResultStats(totalNetworks);
+
+            // Installations are found in the cluster worker; counts fill in when it replies
+            installations = [];
+            document.getElementById('completeInstalls').textContent = 0;
+            document.getElementById('installToggleContainer').style.display = 'none';
+            refreshInstallations(true);
+
+            filteredResults = [...allResults];
+            document.getElementById('resultsScroll').scrollTop = 0;
+            renderTable();
+            initMap();
+        }
+
+        function updateResultStats(totalNetworks) {
             document.getElementById('totalNetworks').textContent = totalNetworks.toLocaleString();
             document.getElementById('flockDevices').textContent = allResults.length;
 
@@ -1017,33 +2182,45 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             document.getElementById('batteryDevices').textContent = batteryCount;
             document.getElementById('cameraDevices').textContent = cameraCount;
 
-            // Find complete installations
-            findInstallations();
-            document.getElementById('completeInstalls').textContent = installations.length;
-
-            // Show installation toggle button if installations found
-            const installToggleContainer = document.getElementById('installToggleContainer');
-            if (installations.length > 0) {
-                installToggleContainer.style.display = 'block';
-            } else {
-                installToggleContainer.style.display = 'none';
-            }
-
             // Alert box
             const alertBox = document.getElementById('alertBox');
             if (allResults.length > 0) {
-                let alertMsg = 'FLOCK SAFETY DEVICES DETECTED: ' + allResults.length + ' surveillance device(s) found in your scan data.';
-                if (installations.length > 0) {
-                    alertMsg += ' <strong>' + installations.length + ' complete installation(s)</strong> identified (multiple device types within ' + clusterRadius + 'm).';
-                }
-                alertBox.innerHTML = '<div class="alert">' + alertMsg + '</div>';
+                alertBox.innerHTML = '<div class="alert">FLOCK SAFETY DEVICES DETECTED: ' + allResults.length + ' surveillance device(s) found in your scan data (' + resultStore.sightings.toLocaleString() + ' sightings).</div>';
             } else {
                 alertBox.innerHTML = '<div class="alert success">No Flock Safety devices detected in the uploaded data.</div>';
             }
+        }
 
-            filteredResults = [...allResults];
-            renderTable();
-            initMap();
+        function refreshInstallations(fit) {
+            prepareClusterData();
+            requestInstallations(() => {
+                document.getElementById('completeInstalls').textContent = installations.length;
+                // Show installation toggle button if installations found
+                document.getElementById('installToggleContainer').style.display = installations.length > 0 ? 'block' : 'none';
+                updateAlertBox();
+                if (clusterMode) {
+                    filterToInstallations();
+                    updateMapMarkers(fit);
+                }
+            });
+        }
+
+        // Append mode: refresh only the rows the new files created or updated. Existing row objects
+        // are updated in place, so filteredResults and installations keep pointing at them, and the
+        // search index is patched rather than rebuilt. Table and map keep their current view.
+        function mergeAppendedRows(changedRows) {
+            const rows = [...changedRows].sort((a, b) => a - b);
+            for (const row of rows) {
+                const r = getResultRow(resultStore, row);
+                if (row < allResults.length) Object.assign(allResults[row], r);
+                else allResults.push(r);
+            }
+            if (searchIndex) updateSearchIndex(searchIndex, rows);
+            sortIndex = null;
+
+            updateResultStats(totalNetworksCount);
+            refreshInstallations(false);
+            if (!clusterMode) filterResults(true);
         }
 
         function initMap() {
@@ -1091,14 +2268,17 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             L.control.layers(layers).addTo(map);
 
             markersLayer = L.layerGroup().addTo(map);
+            map.createPane('devicePane').style.zIndex = 450;
+            deviceLayer = new (L.Layer.extend(deviceLayerMethods))({ pane: 'devicePane' }).addTo(map);
             updateMapMarkers();
         }
 
-        function updateMapMarkers() {
+        function updateMapMarkers(fit = true) {
             if (!markersLayer) return;
             markersLayer.clearLayers();
 
-            const bounds = [];
+            const devices = [];
+            const groups = [];
 
             // If cluster mode, show installations with highlight circles
             if (clusterMode && installations.length > 0) {
@@ -1122,106 +2302,750 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                         opacity: 0.8,
                         fillOpacity: 0.15
                     });
-
-                    let popupContent = '<strong style="color: #ff0000;">COMPLETE INSTALLATION #' + (idx + 1) + '</strong><br>';
-                    popupContent += '<strong>Types:</strong> ' + install.types.join(', ') + '<br>';
-                    popupContent += '<strong>Devices:</strong> ' + install.devices.length + '<br><hr>';
-
-                    install.devices.forEach(d => {
-                        popupContent += '<strong>MAC:</strong> ' + d.mac + '<br>';
-                        popupContent += '<strong>Type:</strong> ' + d.deviceType + '<br>';
-                        popupContent += '<strong>SSID:</strong> ' + d.ssid + '<br><br>';
-                    });
-
-                    circle.bindPopup(popupContent);
+                    circle.bindPopup(() => installationPopup(install, idx));
                     markersLayer.addLayer(circle);
 
-                    // Add individual device markers within installation
+                    // Individual device markers within installation
                     install.devices.forEach(r => {
-                        const lat = parseFloat(r.lat);
-                        const lon = parseFloat(r.lon);
-                        bounds.push([lat, lon]);
-                        let color;
-                        if (r.deviceType.includes('Battery')) color = '#32cd32';
-                        else if (r.deviceType.includes('Camera')) color = '#58a6ff';
-                        else color = '#8b949e';
-                        const marker = L.circleMarker([lat, lon], {
-                            radius: 10,
-                            fillColor: color,
-                            color: '#ff0000',
-                            weight: 3,
-                            opacity: 1,
-                            fillOpacity: 0.9
-                        });
-                        marker.bindPopup(
-                            '<strong style="color: #ff0000;">PART OF INSTALLATION #' + (idx + 1) + '</strong><br>' +
-                            '<strong>MAC:</strong> ' + r.mac + '<br>' +
-                            '<strong>SSID:</strong> ' + r.ssid + '<br>' +
-                            '<strong>Type:</strong> ' + r.deviceType + '<br>' +
-                            '<strong>Signal:</strong> ' + r.rssi + ' dBm<br>' +
-                            '<strong>First Seen:</strong> ' + r.firstSeen
-                        );
-                        markersLayer.addLayer(marker);
+                        devices.push(r);
+                        groups.push(idx);
                     });
                 });
             } else {
                 // Normal mode - show all devices
                 filteredResults.forEach(r => {
-                    if (r.lat !== 'N/A' && r.lon !== 'N/A' && r.lat && r.lon) {
-                        const lat = parseFloat(r.lat);
-                        const lon = parseFloat(r.lon);
-                        if (!isNaN(lat) && !isNaN(lon)) {
-                            bounds.push([lat, lon]);
-                            let color;
-                            if (r.deviceType.includes('Battery')) color = '#32cd32';
-                            else if (r.deviceType.includes('Camera')) color = '#58a6ff';
-                            else color = '#8b949e';
-                            const marker = L.circleMarker([lat, lon], {
-                                radius: 10,
-                                fillColor: color,
-                                color: '#fff',
-                                weight: 2,
-                                opacity: 1,
-                                fillOpacity: 0.8
-                            });
-                            marker.bindPopup(
-                                '<strong>MAC:</strong> ' + r.mac + '<br>' +
-                                '<strong>SSID:</strong> ' + r.ssid + '<br>' +
-                                '<strong>Type:</strong> ' + r.deviceType + '<br>' +
-                                '<strong>Signal:</strong> ' + r.rssi + ' dBm<br>' +
-                                '<strong>First Seen:</strong> ' + r.firstSeen
-                            );
-                            markersLayer.addLayer(marker);
-                        }
+                    devices.push(r);
+                    groups.push(-1);
+                });
+            }
+
+            const points = packMapPoints(devices, groups);
+            deviceLayer.setPoints(points);
+            requestMapClusters(points);
+
+            if (fit && points.devices.length > 0) {
+                map.fitBounds(points.bounds, { padding: [20, 20] });
+            }
+        }
+
+        function installationPopup(install, idx) {
+            let popupContent = '<strong style="color: #ff0000;">COMPLETE INSTALLATION #' + (idx + 1) + '</strong><br>';
+            popupContent += '<strong>Types:</strong> ' + install.types.join(', ') + '<br>';
+            popupContent += '<strong>Devices:</strong> ' + install.devices.length + '<br><hr>';
+
+            install.devices.forEach(d => {
+                popupContent += '<strong>MAC:</strong> ' + escapeHtml(d.mac) + '<br>';
+                popupContent += '<strong>Type:</strong> ' + escapeHtml(d.deviceType) + '<br>';
+                popupContent += '<strong>SSID:</strong> ' + escapeHtml(d.ssid) + '<br><br>';
+            });
+            return popupContent;
+        }
+
+        function devicePopup(r, installIdx) {
+            let popupContent = '';
+            if (installIdx >= 0) {
+                popupContent += '<strong style="color: #ff0000;">PART OF INSTALLATION #' + (installIdx + 1) + '</strong><br>';
+            }
+            return popupContent +
+                '<strong>MAC:</strong> ' + escapeHtml(r.mac) + '<br>' +
+                '<strong>SSID:</strong> ' + escapeHtml(r.ssid) + '<br>' +
+                '<strong>Type:</strong> ' + escapeHtml(r.deviceType) + '<br>' +
+                '<strong>Signal:</strong> ' + escapeHtml(r.rssi) + ' dBm<br>' +
+                '<strong>First Seen:</strong> ' + escapeHtml(r.firstSeen) + '<br>' +
+                '<strong>Last Seen:</strong> ' + escapeHtml(r.lastSeen) + '<br>' +
+                '<strong>Sightings:</strong> ' + r.count;
+        }
+
+        // Map devices are packed into typed arrays of normalized Web Mercator coordinates and
+        // drawn onto a single canvas; clicks are resolved through a pixel grid of the last frame
+        const MARKER_COLORS = ['#32cd32', '#58a6ff', '#8b949e'];
+        const MARKER_RADIUS = 10;
+        const MARKER_HIT_CELL = 32;
+        const MARKER_PADDING = 0.25;
+
+        function mercatorX(lon) {
+            return (lon + 180) / 360;
+        }
+
+        function mercatorY(lat) {
+            const s = Math.sin(Math.max(-85.0511287798, Math.min(85.0511287798, lat)) * Math.PI / 180);
+            return 0.5 - Math.log((1 + s) / (1 - s)) / (4 * Math.PI);
+        }
+
+        function packMapPoints(candidates, candidateGroups) {
+            const n = candidates.length;
+            const devices = [];
+            const lats = new Float64Array(n);
+            const lons = new Float64Array(n);
+            const x = new Float64Array(n);
+            const y = new Float64Array(n);
+            const categories = new Uint8Array(n);
+            const groups = new Int32Array(n);
+            let minLat = Infinity, minLon = Infinity, maxLat = -Infinity, maxLon = -Infinity;
+
+            for (let i = 0; i < n; i++) {
+                const r = candidates[i];
+                const lat = parseFloat(r.lat);
+                const lon = parseFloat(r.lon);
+                if (isNaN(lat) || isNaN(lon)) continue;
+                const k = devices.length;
+                devices.push(r);
+                lats[k] = lat;
+                lons[k] = lon;
+                x[k] = mercatorX(lon);
+                y[k] = mercatorY(lat);
+                categories[k] = getTypeCategory(r.deviceType);
+                groups[k] = candidateGroups[i];
+                if (lat < minLat) minLat = lat;
+                if (lat > maxLat) maxLat = lat;
+                if (lon < minLon) minLon = lon;
+                if (lon > maxLon) maxLon = lon;
+            }
+
+            const k = devices.length;
+            return {
+                devices,
+                lats: lats.subarray(0, k),
+                lons: lons.subarray(0, k),
+                x: x.subarray(0, k),
+                y: y.subarray(0, k),
+                categories: categories.subarray(0, k),
+                groups: groups.subarray(0, k),
+                bounds: [[minLat, minLon], [maxLat, maxLon]]
+            };
+        }
+
+        // Zoom-aware clustering of map points, supercluster style: whenever the displayed point
+        // set changes a worker builds one level of clusters per zoom, each with its own KD-tree,
+        // so pans and zooms only run a range query against the level for the current zoom
+        const MAP_CLUSTER_MAX_ZOOM = 16;
+        const MAP_CLUSTER_RADIUS = 40;
+        const KD_NODE_SIZE = 64;
+
+        // Static KD-tree over packed coordinates (kdbush layout: ids and x,y pairs sorted in place)
+        function buildKDTree(x, y) {
+            const n = x.length;
+            const ids = new Uint32Array(n);
+            const coords = new Float64Array(2 * n);
+            for (let i = 0; i < n; i++) {
+                ids[i] = i;
+                coords[2 * i] = x[i];
+                coords[2 * i + 1] = y[i];
+            }
+            sortKD(ids, coords, 0, n - 1, 0);
+            return { ids, coords };
+        }
+
+        function sortKD(ids, coords, left, right, axis) {
+            if (right - left <= KD_NODE_SIZE) return;
+            const m = (left + right) >> 1;
+            selectKD(ids, coords, m, left, right, axis);
+            sortKD(ids, coords, left, m - 1, 1 - axis);
+            sortKD(ids, coords, m + 1, right, 1 - axis);
+        }
+
+        // Floyd-Rivest selection: partially order [left, right] so the k-th item is in place
+        function selectKD(ids, coords, k, left, right, axis) {
+            while (right > left) {
+                if (right - left > 600) {
+                    const n = right - left + 1;
+                    const m = k - left + 1;
+                    const z = Math.log(n);
+                    const s = 0.5 * Math.exp(2 * z / 3);
+                    const sd = 0.5 * Math.sqrt(z * s * (n - s) / n) * (m - n / 2 < 0 ? -1 : 1);
+                    const newLeft = Math.max(left, Math.floor(k - m * s / n + sd));
+                    const newRight = Math.min(right, Math.floor(k + (n - m) * s / n + sd));
+                    selectKD(ids, coords, k, newLeft, newRight, axis);
+                }
+
+                const t = coords[2 * k + axis];
+                let i = left;
+                let j = right;
+                swapKD(ids, coords, left, k);
+                if (coords[2 * right + axis] > t) swapKD(ids, coords, left, right);
+
+                while (i < j) {
+                    swapKD(ids, coords, i, j);
+                    i++;
+                    j--;
+                    while (coords[2 * i + axis] < t) i++;
+                    while (coords[2 * j + axis] > t) j--;
+                }
+
+                if (coords[2 * left + axis] === t) swapKD(ids, coords, left, j);
+                else {
+                    j++;
+                    swapKD(ids, coords, j, right);
+                }
+
+                if (j <= k) left = j + 1;
+                if (k <= j) right = j - 1;
+            }
+        }
+
+        function swapKD(ids, coords, i, j) {
+            const id = ids[i];
+            ids[i] = ids[j];
+            ids[j] = id;
+            const x = coords[2 * i];
+            const y = coords[2 * i + 1];
+            coords[2 * i] = coords[2 * j];
+            coords[2 * i + 1] = coords[2 * j + 1];
+            coords[2 * j] = x;
+            coords[2 * j + 1] = y;
+        }
+
+        function rangeKD(tree, minX, minY, maxX, maxY) {
+            const { ids, coords } = tree;
+            const stack = [0, ids.length - 1, 0];
+            const result = [];
+            while (stack.length) {
+                const axis = stack.pop();
+                const right = stack.pop();
+                const left = stack.pop();
+                if (right - left <= KD_NODE_SIZE) {
+                    for (let i = left; i <= right; i++) {
+                        const x = coords[2 * i];
+                        const y = coords[2 * i + 1];
+                        if (x >= minX && x <= maxX && y >= minY && y <= maxY) result.push(ids[i]);
+                    }
+                    continue;
+                }
+                const m = (left + right) >> 1;
+                const x = coords[2 * m];
+                const y = coords[2 * m + 1];
+                if (x >= minX && x <= maxX && y >= minY && y <= maxY) result.push(ids[m]);
+                if (axis === 0 ? minX <= x : minY <= y) stack.push(left, m - 1, 1 - axis);
+                if (axis === 0 ? maxX >= x : maxY >= y) stack.push(m + 1, right, 1 - axis);
+            }
+            return result;
+        }
+
+        function withinKD(tree, qx, qy, r) {
+            const { ids, coords } = tree;
+            const stack = [0, ids.length - 1, 0];
+            const result = [];
+            const r2 = r * r;
+            while (stack.length) {
+                const axis = stack.pop();
+                const right = stack.pop();
+                const left = stack.pop();
+                if (right - left <= KD_NODE_SIZE) {
+                    for (let i = left; i <= right; i++) {
+                        const dx = coords[2 * i] - qx;
+                        const dy = coords[2 * i + 1] - qy;
+                        if (dx * dx + dy * dy <= r2) result.push(ids[i]);
+                    }
+                    continue;
+                }
+                const m = (left + right) >> 1;
+                const x = coords[2 * m];
+                const y = coords[2 * m + 1];
+                if ((x - qx) * (x - qx) + (y - qy) * (y - qy) <= r2) result.push(ids[m]);
+                if (axis === 0 ? qx - r <= x : qy - r <= y) stack.push(left, m - 1, 1 - axis);
+                if (axis === 0 ? qx + r >= x : qy + r >= y) stack.push(m + 1, right, 1 - axis);
+            }
+            return result;
+        }
+
+        // Levels 0..MAP_CLUSTER_MAX_ZOOM hold clusters, the level above holds the points themselves.
+        // Per item: weighted center, count, point index (-1 for a cluster) and the zoom it splits at.
+        function buildMapClusters(x, y) {
+            const n = x.length;
+            const ids = new Int32Array(n);
+            for (let i = 0; i < n; i++) ids[i] = i;
+            let level = {
+                x,
+                y,
+                counts: new Uint32Array(n).fill(1),
+                ids,
+                expansion: new Uint8Array(n).fill(MAP_CLUSTER_MAX_ZOOM + 1),
+                tree: buildKDTree(x, y)
+            };
+            const levels = new Array(MAP_CLUSTER_MAX_ZOOM + 2);
+            levels[MAP_CLUSTER_MAX_ZOOM + 1] = level;
+            for (let z = MAP_CLUSTER_MAX_ZOOM; z >= 0; z--) {
+                level = clusterMapLevel(level, MAP_CLUSTER_RADIUS / (256 * Math.pow(2, z)), z + 1);
+                levels[z] = level;
+            }
+            return levels;
+        }
+
+        function clusterMapLevel(prev, radius, splitZoom) {
+            const n = prev.x.length;
+            const visited = new Uint8Array(n);
+            const x = new Float64Array(n);
+            const y = new Float64Array(n);
+            const counts = new Uint32Array(n);
+            const ids = new Int32Array(n);
+            const expansion = new Uint8Array(n);
+            let k = 0;
+
+            for (let i = 0; i < n; i++) {
+                if (visited[i]) continue;
+                visited[i] = 1;
+                let count = prev.counts[i];
+                let wx = prev.x[i] * count;
+                let wy = prev.y[i] * count;
+                let merged = false;
+
+                for (const j of withinKD(prev.tree, prev.x[i], prev.y[i], radius)) {
+                    if (visited[j]) continue;
+                    visited[j] = 1;
+                    merged = true;
+                    wx += prev.x[j] * prev.counts[j];
+                    wy += prev.y[j] * prev.counts[j];
+                    count += prev.counts[j];
+                }
+
+                if (merged) {
+                    x[k] = wx / count;
+                    y[k] = wy / count;
+                    ids[k] = -1;
+                    expansion[k] = splitZoom;
+                } else {
+                    x[k] = prev.x[i];
+                    y[k] = prev.y[i];
+                    ids[k] = prev.ids[i];
+                    expansion[k] = prev.expansion[i];
+                }
+                counts[k] = count;
+                k++;
+            }
+
+            const level = {
+                x: x.slice(0, k),
+                y: y.slice(0, k),
+                counts: counts.slice(0, k),
+                ids: ids.slice(0, k),
+                expansion: expansion.slice(0, k)
+            };
+            level.tree = buildKDTree(level.x, level.y);
+            return level;
+        }
+
+        let mapClusterWorker = null;
+        let mapClusterWorkerUrl = null;
+        let mapClusterJobId = 0;
+        let mapClusterJobBusy = false;
+
+        function createMapClusterWorkerCode() {
+            return [
+                'const MAP_CLUSTER_MAX_ZOOM = ' + MAP_CLUSTER_MAX_ZOOM + ';',
+                'const MAP_CLUSTER_RADIUS = ' + MAP_CLUSTER_RADIUS + ';',
+                'const KD_NODE_SIZE = ' + KD_NODE_SIZE + ';',
+                buildKDTree.toString(),
+                sortKD.toString(),
+                selectKD.toString(),
+                swapKD.toString(),
+                withinKD.toString(),
+                buildMapClusters.toString(),
+                clusterMapLevel.toString(),
+                'self.onmessage = function(e) {',
+                '    const levels = buildMapClusters(e.data.x, e.data.y);',
+                '    const transfer = [];',
+                '    for (const l of levels) transfer.push(l.x.buffer, l.y.buffer, l.counts.buffer, l.ids.buffer, l.expansion.buffer, l.tree.ids.buffer, l.tree.coords.buffer);',
+                '    self.postMessage({ jobId: e.data.jobId, levels }, transfer);',
+                '};'
+            ].join(String.fromCharCode(10));
+        }
+
+        function startMapClusterWorker() {
+            if (mapClusterWorker) mapClusterWorker.terminate();
+            if (!mapClusterWorkerUrl) {
+                mapClusterWorkerUrl = URL.createObjectURL(new Blob([createMapClusterWorkerCode()], { type: 'application/javascript' }));
+            }
+            mapClusterWorker = new Worker(mapClusterWorkerUrl);
+            mapClusterWorker.onmessage = onMapClusterResult;
+        }
+
+        // Build the cluster hierarchy for a packed point set; a newer set supersedes a build in progress
+        function requestMapClusters(points) {
+            const jobId = ++mapClusterJobId;
+            if (!mapClusterWorker || mapClusterJobBusy) startMapClusterWorker();
+            mapClusterJobBusy = true;
+            const x = points.x.slice();
+            const y = points.y.slice();
+            mapClusterWorker.postMessage({ jobId, x, y }, [x.buffer, y.buffer]);
+        }
+
+        function onMapClusterResult(e) {
+            if (e.data.jobId !== mapClusterJobId) return;
+            mapClusterJobBusy = false;
+            if (deviceLayer) deviceLayer.setClusters(e.data.levels);
+        }
+
+        function clusterMarkerRadius(count) {
+            return Math.min(MARKER_RADIUS + 4 + 2 * Math.log2(count), 28);
+        }
+
+        function clusterLabel(count) {
+            return count >= 1000 ? (Math.round(count / 100) / 10) + 'k' : String(count);
+        }
+
+        // Leaflet layer methods; the layer class is built in initMap so a failed Leaflet load
+        // does not take the rest of the page down with it
+        const deviceLayerMethods = {
+            initialize(options) {
+                L.setOptions(this, options);
+                this._points = packMapPoints([], []);
+                this._levels = null;
+                this._drawn = null;
+            },
+
+            onAdd(map) {
+                this._canvas = L.DomUtil.create('canvas', 'leaflet-zoom-hide');
+                this._canvas.style.pointerEvents = 'none';
+                this.getPane().appendChild(this._canvas);
+                map.on('moveend resize', this._draw, this);
+                map.on('click', this._onClick, this);
+                map.on('mousemove', this._onMouseMove, this);
+                this._draw();
+            },
+
+            onRemove(map) {
+                L.DomUtil.remove(this._canvas);
+                map.off('moveend resize', this._draw, this);
+                map.off('click', this._onClick, this);
+                map.off('mousemove', this._onMouseMove, this);
+            },
+
+            // Points are drawn individually until their cluster hierarchy arrives
+            setPoints(points) {
+                this._points = points;
+                this._levels = null;
+                if (this._map) this._draw();
+            },
+
+            setClusters(levels) {
+                this._levels = levels;
+                if (this._map) this._draw();
+            },
+
+            _draw() {
+                const map = this._map;
+                const size = map.getSize();
+                const pad = size.multiplyBy(MARKER_PADDING).round();
+                const width = size.x + 2 * pad.x;
+                const height = size.y + 2 * pad.y;
+                const ratio = window.devicePixelRatio || 1;
+                const canvas = this._canvas;
+
+                // Canvas covers the view plus padding so short pans do not expose blank edges
+                L.DomUtil.setPosition(canvas, map.containerPointToLayerPoint(pad.multiplyBy(-1)));
+                canvas.width = width * ratio;
+                canvas.height = height * ratio;
+                canvas.style.width = width + 'px';
+                canvas.style.height = height + 'px';
+                const ctx = canvas.getContext('2d');
+                ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+
+                const p = this._points;
+                const zoom = map.getZoom();
+                const scale = 256 * Math.pow(2, zoom);
+                const origin = map.getPixelBounds().min.subtract(pad);
+                const levelZoom = Math.max(0, Math.floor(zoom));
+                const level = this._levels && levelZoom <= MAP_CLUSTER_MAX_ZOOM ? this._levels[levelZoom] : null;
+                // Drawn entries: screen position, hit radius and a point index (or -1 - cluster index)
+                const drawn = { x: [], y: [], radius: [], ref: [], level, hits: new Map(), pad };
+                // One batch per (type category, installation member) style
+                const batches = [[], [], [], [], [], []];
+                const clusters = [];
+
+                const add = (sx, sy, radius, ref) => {
+                    const e = drawn.x.length;
+                    drawn.x.push(sx);
+                    drawn.y.push(sy);
+                    drawn.radius.push(radius);
+                    drawn.ref.push(ref);
+                    const key = Math.floor(sy / MARKER_HIT_CELL) * 65536 + Math.floor(sx / MARKER_HIT_CELL);
+                    const cell = drawn.hits.get(key);
+                    if (cell) cell.push(e);
+                    else drawn.hits.set(key, [e]);
+                    return e;
+                };
+                const addPoint = (i, sx, sy) => {
+                    batches[p.categories[i] * 2 + (p.groups[i] >= 0 ? 1 : 0)].push(add(sx, sy, MARKER_RADIUS, i));
+                };
+
+                if (level) {
+                    const margin = 28 / scale;
+                    const found = rangeKD(level.tree,
+                        origin.x / scale - margin, origin.y / scale - margin,
+                        (origin.x + width) / scale + margin, (origin.y + height) / scale + margin);
+                    for (const k of found) {
+                        const sx = level.x[k] * scale - origin.x;
+                        const sy = level.y[k] * scale - origin.y;
+                        if (level.counts[k] === 1) addPoint(level.ids[k], sx, sy);
+                        else clusters.push(add(sx, sy, clusterMarkerRadius(level.counts[k]), -1 - k));
+                    }
+                } else {
+                    for (let i = 0; i < p.devices.length; i++) {
+                        const sx = p.x[i] * scale - origin.x;
+                        const sy = p.y[i] * scale - origin.y;
+                        if (sx < -MARKER_RADIUS || sy < -MARKER_RADIUS || sx > width + MARKER_RADIUS || sy > height + MARKER_RADIUS) continue;
+                        addPoint(i, sx, sy);
+                    }
+                }
+
+                batches.forEach((batch, b) => {
+                    if (batch.length === 0) return;
+                    const member = b % 2 === 1;
+                    ctx.beginPath();
+                    for (const e of batch) {
+                        ctx.moveTo(drawn.x[e] + MARKER_RADIUS, drawn.y[e]);
+                        ctx.arc(drawn.x[e], drawn.y[e], MARKER_RADIUS, 0, 2 * Math.PI);
                     }
+                    ctx.fillStyle = MARKER_COLORS[b >> 1];
+                    ctx.globalAlpha = member ? 0.9 : 0.8;
+                    ctx.fill();
+                    ctx.strokeStyle = member ? '#ff0000' : '#fff';
+                    ctx.lineWidth = member ? 3 : 2;
+                    ctx.globalAlpha = 1;
+                    ctx.stroke();
                 });
+
+                if (clusters.length > 0) {
+                    ctx.beginPath();
+                    for (const e of clusters) {
+                        ctx.moveTo(drawn.x[e] + drawn.radius[e], drawn.y[e]);
+                        ctx.arc(drawn.x[e], drawn.y[e], drawn.radius[e], 0, 2 * Math.PI);
+                    }
+                    ctx.fillStyle = '#ff6600';
+                    ctx.globalAlpha = 0.85;
+                    ctx.fill();
+                    ctx.strokeStyle = '#fff';
+                    ctx.lineWidth = 2;
+                    ctx.globalAlpha = 1;
+                    ctx.stroke();
+
+                    ctx.fillStyle = '#fff';
+                    ctx.font = 'bold 12px sans-serif';
+                    ctx.textAlign = 'center';
+                    ctx.textBaseline = 'middle';
+                    for (const e of clusters) {
+                        ctx.fillText(clusterLabel(level.counts[-1 - drawn.ref[e]]), drawn.x[e], drawn.y[e]);
+                    }
+                }
+
+                this._drawn = drawn;
+            },
+
+            // Index of the drawn entry nearest to a container point, or -1
+            _hitTest(point) {
+                const drawn = this._drawn;
+                if (!drawn) return -1;
+                const sx = point.x + drawn.pad.x;
+                const sy = point.y + drawn.pad.y;
+                const col = Math.floor(sx / MARKER_HIT_CELL);
+                const row = Math.floor(sy / MARKER_HIT_CELL);
+                let best = -1;
+                let bestDist = Infinity;
+                for (let dr = -1; dr <= 1; dr++) {
+                    for (let dc = -1; dc <= 1; dc++) {
+                        const cell = drawn.hits.get((row + dr) * 65536 + col + dc);
+                        if (!cell) continue;
+                        for (const e of cell) {
+                            const dx = drawn.x[e] - sx;
+                            const dy = drawn.y[e] - sy;
+                            const dist = dx * dx + dy * dy;
+                            const reach = drawn.radius[e] + 2;
+                            if (dist <= reach * reach && dist <= bestDist) {
+                                best = e;
+                                bestDist = dist;
+                            }
+                        }
+                    }
+                }
+                return best;
+            },
+
+            _onClick(e) {
+                const hit = this._hitTest(e.containerPoint);
+                if (hit < 0) return;
+                const ref = this._drawn.ref[hit];
+                if (ref < 0) {
+                    // Zoom in to where the cluster breaks apart
+                    const level = this._drawn.level;
+                    const k = -1 - ref;
+                    const center = this._map.unproject([level.x[k] * 256, level.y[k] * 256], 0);
+                    this._map.setView(center, level.expansion[k]);
+                    return;
+                }
+                const p = this._points;
+                L.popup()
+                    .setLatLng([p.lats[ref], p.lons[ref]])
+                    .setContent(devicePopup(p.devices[ref], p.groups[ref]))
+                    .openOn(this._map);
+            },
+
+            _onMouseMove(e) {
+                this._map.getContainer().style.cursor = this._hitTest(e.containerPoint) >= 0 ? 'pointer' : '';
             }
+        };
 
-            if (bounds.length > 0) {
-                map.fitBounds(bounds, { padding: [20, 20] });
+        // Search index over allResults, built on first use: lowercase "mac\\nssid" keys and type
+        // flags per row, plus trigram posting lists (ascending row indices) once a query needs them
+        let searchIndex = null;
+        let searchDebounce = null;
+
+        function buildSearchIndex(results) {
+            const keys = new Array(results.length);
+            const flags = new Uint8Array(results.length);
+            results.forEach((r, i) => {
+                keys[i] = searchKey(r);
+                flags[i] = typeFlags(r);
+            });
+            return { keys, flags, trigrams: null, last: null };
+        }
+
+        function searchKey(r) {
+            return r.mac.toLowerCase() + '\\n' + r.ssid.toLowerCase();
+        }
+
+        function typeFlags(r) {
+            return (r.deviceType.includes('Battery') ? 1 : 0) | (r.deviceType.includes('Camera') ? 2 : 0);
+        }
+
+        function buildTrigrams(keys) {
+            const trigrams = new Map();
+            keys.forEach((key, i) => addTrigrams(trigrams, key, i));
+            return trigrams;
+        }
+
+        function addTrigrams(trigrams, key, i) {
+            for (let j = 0; j + 3 <= key.length; j++) {
+                const gram = key.slice(j, j + 3);
+                const list = trigrams.get(gram);
+                if (!list) {
+                    trigrams.set(gram, [i]);
+                } else if (list[list.length - 1] < i) {
+                    list.push(i);
+                } else {
+                    // Rows updated by an append can land mid-list
+                    let lo = 0;
+                    let hi = list.length;
+                    while (lo < hi) {
+                        const mid = (lo + hi) >> 1;
+                        if (list[mid] < i) lo = mid + 1;
+                        else hi = mid;
+                    }
+                    if (list[lo] !== i) list.splice(lo, 0, i);
+                }
             }
         }
 
-        function filterResults() {
+        // Refresh keys and flags of appended or updated rows. Trigrams of text a row no longer
+        // has are left in place; posting lists only need to be supersets of the matches.
+        function updateSearchIndex(index, rows) {
+            if (index.flags.length < allResults.length) {
+                const flags = new Uint8Array(allResults.length * 2);
+                flags.set(index.flags);
+                index.flags = flags;
+            }
+            for (const i of rows) {
+                index.keys[i] = searchKey(allResults[i]);
+                index.flags[i] = typeFlags(allResults[i]);
+                if (index.trigrams) addTrigrams(index.trigrams, index.keys[i], i);
+            }
+            index.last = null;
+        }
+
+        // Smallest posting list among the query's trigrams (a superset of the matches),
+        // or null for queries too short to have one
+        function searchCandidates(index, query) {
+            if (query.length < 3) return null;
+            if (!index.trigrams) index.trigrams = buildTrigrams(index.keys);
+            let best = null;
+            for (let j = 0; j + 3 <= query.length; j++) {
+                const list = index.trigrams.get(query.slice(j, j + 3));
+                if (!list) return [];
+                if (!best || list.length < best.length) best = list;
+            }
+            return best;
+        }
+
+        function scheduleFilter() {
+            clearTimeout(searchDebounce);
+            searchDebounce = setTimeout(filterResults, 150);
+        }
+
+        function filterResults(keepView) {
+            clearTimeout(searchDebounce);
             const typeFilter = document.getElementById('typeFilter').value;
             const searchFilter = document.getElementById('searchFilter').value.toLowerCase();
+            const typeFlag = typeFilter === 'battery' ? 1 : (typeFilter === 'camera' ? 2 : 0);
 
-            filteredResults = allResults.filter(r => {
-                let typeMatch = true;
-                if (typeFilter === 'battery') typeMatch = r.deviceType.includes('Battery');
-                if (typeFilter === 'camera') typeMatch = r.deviceType.includes('Camera');
+            if (!searchIndex) searchIndex = buildSearchIndex(allResults);
+            const index = searchIndex;
 
-                let searchMatch = true;
-                if (searchFilter) {
-                    searchMatch = r.mac.toLowerCase().includes(searchFilter) ||
-                                  r.ssid.toLowerCase().includes(searchFilter);
-                }
+            // A query containing the previous one can only match a subset of the previous rows
+            let candidates = searchCandidates(index, searchFilter);
+            const last = index.last;
+            if (last && last.typeFlag === typeFlag && searchFilter.includes(last.query) &&
+                (!candidates || last.rows.length < candidates.length)) {
+                candidates = last.rows;
+            }
 
-                return typeMatch && searchMatch;
-            });
+            const rows = [];
+            const n = candidates ? candidates.length : index.keys.length;
+            for (let c = 0; c < n; c++) {
+                const i = candidates ? candidates[c] : c;
+                if (typeFlag && !(index.flags[i] & typeFlag)) continue;
+                if (searchFilter && !index.keys[i].includes(searchFilter)) continue;
+                rows.push(i);
+            }
+            index.last = { query: searchFilter, typeFlag, rows };
+            filteredResults = rows.map(i => allResults[i]);
 
+            if (!keepView) document.getElementById('resultsScroll').scrollTop = 0;
             renderTable();
-            updateMapMarkers();
+            updateMapMarkers(!keepView);
+        }
+
+        // Sorting permutes allResults indices: each column's keys are computed once into a typed
+        // array and each column/direction permutation is cached until allResults changes
+        const NUMERIC_SORT_COLUMNS = ['rssi', 'channel', 'lat', 'lon', 'count'];
+        let sortIndex = null;
+
+        function sortKeys(column) {
+            const n = allResults.length;
+            if (NUMERIC_SORT_COLUMNS.includes(column)) {
+                return Float64Array.from(allResults, r => parseFloat(r[column]) || 0);
+            }
+
+            // Strings are ranked once so permutations compare integers
+            const lower = allResults.map(r => String(r[column]).toLowerCase());
+            const order = new Uint32Array(n);
+            for (let i = 0; i < n; i++) order[i] = i;
+            order.sort((a, b) => (lower[a] < lower[b] ? -1 : (lower[a] > lower[b] ? 1 : a - b)));
+            const ranks = new Uint32Array(n);
+            let rank = 0;
+            for (let k = 0; k < n; k++) {
+                if (k > 0 && lower[order[k]] !== lower[order[k - 1]]) rank++;
+                ranks[order[k]] = rank;
+            }
+            return ranks;
+        }
+
+        function sortPermutation(column, ascending) {
+            if (!sortIndex) sortIndex = { keys: new Map(), perms: new Map(), positions: null };
+            const cacheKey = column + (ascending ? ':asc' : ':desc');
+            let perm = sortIndex.perms.get(cacheKey);
+            if (perm) return perm;
+
+            let keys = sortIndex.keys.get(column);
+            if (!keys) {
+                keys = sortKeys(column);
+                sortIndex.keys.set(column, keys);
+            }
+            perm = new Uint32Array(allResults.length);
+            for (let i = 0; i < perm.length; i++) perm[i] = i;
+            // Ties keep allResults order in both directions
+            if (ascending) perm.sort((a, b) => keys[a] - keys[b] || a - b);
+            else perm.sort((a, b) => keys[b] - keys[a] || a - b);
+            sortIndex.perms.set(cacheKey, perm);
+            return perm;
         }
 
         function sortResults(column) {
@@ -1232,74 +3056,107 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 sortAsc = true;
             }
 
-            filteredResults.sort((a, b) => {
-                let aVal = a[column];
-                let bVal = b[column];
-
-                // Handle numeric sorting
-                if (column === 'rssi' || column === 'channel' || column === 'lat' || column === 'lon') {
-                    aVal = parseFloat(aVal) || 0;
-                    bVal = parseFloat(bVal) || 0;
-                    return sortAsc ? aVal - bVal : bVal - aVal;
+            const perm = sortPermutation(column, sortAsc);
+            if (filteredResults.length === allResults.length) {
+                filteredResults = Array.from(perm, i => allResults[i]);
+            } else {
+                if (!sortIndex.positions) sortIndex.positions = new Map(allResults.map((r, i) => [r, i]));
+                const shown = new Uint8Array(allResults.length);
+                for (const r of filteredResults) shown[sortIndex.positions.get(r)] = 1;
+                filteredResults = [];
+                for (const i of perm) {
+                    if (shown[i]) filteredResults.push(allResults[i]);
                 }
-
-                // String sorting
-                aVal = String(aVal).toLowerCase();
-                bVal = String(bVal).toLowerCase();
-                if (aVal < bVal) return sortAsc ? -1 : 1;
-                if (aVal > bVal) return sortAsc ? 1 : -1;
-                return 0;
-            });
+            }
 
             renderTable();
         }
 
-        function renderTable() {
+        // Virtualized results table: only the rows scrolled into view (plus an overscan
+        // margin) exist in the DOM; spacer rows stand in for the rest
+        const TABLE_OVERSCAN = 10;
+        let tableRowHeight = 45;
+        let tableRenderQueued = false;
+
+        function renderTable(calibrated) {
+            const scroller = document.getElementById('resultsScroll');
             const tbody = document.getElementById('resultsBody');
-            tbody.innerHTML = '';
+            const total = filteredResults.length;
+            const visible = Math.ceil((scroller.clientHeight || 600) / tableRowHeight);
+            const first = Math.min(total, Math.max(0, Math.floor(scroller.scrollTop / tableRowHeight) - TABLE_OVERSCAN));
+            const last = Math.min(total, first + visible + 2 * TABLE_OVERSCAN);
+
+            let html = spacerRow(first * tableRowHeight);
+            for (let i = first; i < last; i++) {
+                html += tableRow(filteredResults[i]);
+            }
+            html += spacerRow((total - last) * tableRowHeight);
+            tbody.innerHTML = html;
+
+            // Rows are single-line, so one rendered row gives the height for all of them
+            const sample = tbody.children[1];
+            const height = sample && sample.offsetHeight;
+            if (!calibrated && last > first && height > 0 && Math.abs(height - tableRowHeight) > 0.5) {
+                tableRowHeight = height;
+                renderTable(true);
+            }
+        }
 
-            for (let r of filteredResults) {
-                const tr = document.createElement('tr');
-                let typeClass, typeName;
-                if (r.deviceType.includes('Battery')) {
-                    typeClass = 'type-battery';
-                    typeName = 'Extended Battery';
-                } else if (r.deviceType.includes('Camera')) {
-                    typeClass = 'type-camera';
-                    typeName = 'WiFi Camera';
-                } else {
-                    typeClass = 'type-custom';
-                    typeName = r.deviceType.includes('(') ? r.deviceType.split('(')[0].trim() : r.deviceType;
-                }
+        function scheduleTableRender() {
+            if (tableRenderQueued) return;
+            tableRenderQueued = true;
+            requestAnimationFrame(() => {
+                tableRenderQueued = false;
+                renderTable();
+            });
+        }
 
-                let mapLink = 'N/A';
-                if (r.lat !== 'N/A' && r.lon !== 'N/A' && r.lat && r.lon) {
-                    const lat = parseFloat(r.lat);
-                    const lon = parseFloat(r.lon);
-                    if (!isNaN(lat) && !isNaN(lon) && lat !== 0 && lon !== 0) {
-                        // Use search query to drop a pin at exact coordinates
-                        mapLink = '<a class="map-link" href="https://www.google.com/maps/search/?api=1&query=' + lat + ',' + lon + '" target="_blank">View</a>';
-                    }
-                }
+        function spacerRow(height) {
+            return '<tr class="spacer"><td colspan="10" style="height: ' + height + 'px"></td></tr>';
+        }
 
-                tr.innerHTML =
-                    '<td><code>' + escapeHtml(r.mac) + '</code></td>' +
-                    '<td>' + escapeHtml(r.ssid) + '</td>' +
-                    '<td><span class="device-type ' + typeClass + '">' + typeName + '</span></td>' +
-                    '<td>' + escapeHtml(r.rssi) + '</td>' +
-                    '<td>' + escapeHtml(r.channel) + '</td>' +
-                    '<td>' + escapeHtml(r.lat) + '</td>' +
-                    '<td>' + escapeHtml(r.lon) + '</td>' +
-                    '<td>' + escapeHtml(r.firstSeen) + '</td>' +
-                    '<td>' + mapLink + '</td>';
-                tbody.appendChild(tr);
+        function tableRow(r) {
+            let typeClass, typeName;
+            if (r.deviceType.includes('Battery')) {
+                typeClass = 'type-battery';
+                typeName = 'Extended Battery';
+            } else if (r.deviceType.includes('Camera')) {
+                typeClass = 'type-camera';
+                typeName = 'WiFi Camera';
+            } else {
+                typeClass = 'type-custom';
+                typeName = r.deviceType.includes('(') ? r.deviceType.split('(')[0].trim() : r.deviceType;
             }
+
+            let mapLink = 'N/A';
+            if (r.lat !== 'N/A' && r.lon !== 'N/A' && r.lat && r.lon) {
+                const lat = parseFloat(r.lat);
+                const lon = parseFloat(r.lon);
+                if (!isNaN(lat) && !isNaN(lon) && lat !== 0 && lon !== 0) {
+                    // Use search query to drop a pin at exact coordinates
+                    mapLink = '<a class="map-link" href="https://www.google.com/maps/search/?api=1&query=' + lat + ',' + lon + '" target="_blank">View</a>';
+                }
+            }
+
+            const ssid = escapeHtml(r.ssid);
+            return '<tr>' +
+                '<td><code>' + escapeHtml(r.mac) + '</code></td>' +
+                '<td title="' + ssid + '">' + ssid + '</td>' +
+                '<td><span class="device-type ' + typeClass + '">' + escapeHtml(typeName) + '</span></td>' +
+                '<td>' + escapeHtml(r.rssi) + '</td>' +
+                '<td>' + escapeHtml(r.channel) + '</td>' +
+                '<td>' + escapeHtml(r.lat) + '</td>' +
+                '<td>' + escapeHtml(r.lon) + '</td>' +
+                '<td>' + escapeHtml(r.firstSeen) + '</td>' +
+                '<td>' + r.count + '</td>' +
+                '<td>' + mapLink + '</td>' +
+                '</tr>';
         }
 
+        const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+
         function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = String(text);
-            return div.innerHTML;
+            return String(text).replace(/[&<>"']/g, c => HTML_ESCAPES[c]);
         }
 
         function exportCSV() {
@@ -1308,11 +3165,11 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 return;
             }
 
-            let csv = 'MAC,SSID,DeviceType,RSSI,Channel,Latitude,Longitude,FirstSeen\\n';
+            let csv = 'MAC,SSID,DeviceType,RSSI,Channel,Latitude,Longitude,FirstSeen,LastSeen,Sightings\\n';
             for (let r of filteredResults) {
                 csv += '"' + r.mac + '","' + r.ssid.replace(/"/g, '""') + '","' +
-                       r.deviceType + '",' + r.rssi + ',' + r.channel + ',' +
-                       r.lat + ',' + r.lon + ',"' + r.firstSeen + '"\\n';
+                       r.deviceType + '",' + r.rssi + ',"' + r.channel + '",' +
+                       r.lat + ',' + r.lon + ',"' + r.firstSeen + '","' + r.lastSeen + '",' + r.count + '\\n';
             }
 
             downloadFile(csv, 'flock_devices.csv', 'text/csv');
@@ -1338,7 +3195,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                         deviceType: r.deviceType,
                         rssi: r.rssi,
                         channel: r.channel,
-                        firstSeen: r.firstSeen
+                        firstSeen: r.firstSeen,
+                        lastSeen: r.lastSeen,
+                        sightings: r.count
                     }
                 }));
 
@@ -1380,7 +3239,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                     kml += 'Type: ' + escapeHtml(r.deviceType) + '<br>';
                     kml += 'Signal: ' + escapeHtml(r.rssi) + ' dBm<br>';
                     kml += 'Channel: ' + escapeHtml(r.channel) + '<br>';
-                    kml += 'First Seen: ' + escapeHtml(r.firstSeen);
+                    kml += 'First Seen: ' + escapeHtml(r.firstSeen) + '<br>';
+                    kml += 'Last Seen: ' + escapeHtml(r.lastSeen) + '<br>';
+                    kml += 'Sightings: ' + r.count;
                     kml += ']]></description>\\n';
                     kml += '    <styleUrl>#' + styleId + '</styleUrl>\\n';
                     kml += '    <Point><coordinates>' + r.lon + ',' + r.lat + ',0</coordinates></Point>\\n';
@@ -1491,7 +3352,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         // OUI Management Functions
         function saveOUIs() {
             localStorage.setItem('flock_ouis', JSON.stringify(FLOCK_OUIS));
-            initWorkers(); // Recreate workers with updated OUIs
+            ouiVersion = ouiTableVersion(); // Workers pick up the new table before their next task
         }
 
         function renderOUITable() {
@@ -1621,67 +3482,906 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
         function resetDropZone() {
             allResults = [];
+            resultStore = null;
+            searchIndex = null;
+            sortIndex = null;
             filteredResults = [];
             totalNetworksCount = 0;
+            installations = [];
+            clusterData = null;
+            clusterJobId++;
             document.getElementById('results').classList.add('hidden');
             document.getElementById('dropZone').innerHTML =
                 '<h3>Drop Wardriving Files or Folders Here</h3>' +
-                '<p style="color: #8b949e; margin: 10px 0;">CSV, KML, Kismet, NetStumbler, inSSIDer, WiFiFoFum, and more</p>';
+                '<p style="color: #8b949e; margin: 10px 0;">CSV exports from WiGLE, Kismet, NetStumbler, inSSIDer, WiFiFoFum, and more</p>';
             if (map) {
                 map.remove();
                 map = null;
                 markersLayer = null;
+                deviceLayer = null;
+                mapClusterJobId++;
             }
         }
 
         // Initialize OUI table on load
         renderOUITable();
+        document.getElementById('resultsScroll').addEventListener('scroll', scheduleTableRender, { passive: true });
     </script>
 </body>
 </html>
 """
 
+class CachedBody:
+    """
+    A response body encoded once at startup: identity and gzip, plus br when
+    brotli is installed. Each encoding gets its own strong ETag.
+    """
+
+    def __init__(self, body, content_type):
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.variants = {'identity': body, 'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body)
+        self.etags = {encoding: f'"{digest}"' if encoding == 'identity' else
+                      f'"{digest}-{encoding}"' for encoding in self.variants}
+
+    def negotiate(self, accept_encoding):
+        """(encoding, body, etag) for the smallest variant the client accepts."""
+        accepted = set()
+        for item in accept_encoding.split(','):
+            coding, _, params = item.partition(';')
+            params = params.replace(' ', '')
+            if params.startswith('q=') and _quality(params[2:]) == 0:
+                continue
+            accepted.add(coding.strip().lower())
+        choices = [e for e in self.variants if e == 'identity' or e in accepted or '*' in accepted]
+        encoding = min(choices, key=lambda e: len(self.variants[e]))
+        return encoding, self.variants[encoding], self.etags[encoding]
+
+def _quality(text):
+    try:
+        return float(text)
+    except ValueError:
+        return 1.0
+
+# Upload scanning: request bodies are read incrementally and fed straight to the engine's readers
+
+UPLOAD_CHUNK = 1 << 16
+MAX_HEADER_LINE = 1 << 16
+
+class BodyReader(io.RawIOBase):
+    """
+    A request body as a readable stream: stops at Content-Length (or end of
+    file when no length is given) or decodes Transfer-Encoding: chunked,
+    returning data as it arrives instead of waiting for the whole upload.
+    bytes_read counts body bytes delivered so far.
+    """
+
+    def __init__(self, rfile, length=None, chunked=False):
+        self.rfile = rfile
+        self.remaining = length
+        self.chunked = chunked
+        self.chunk_left = 0
+        self.done = False
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.done:
+            return 0
+        if self.chunked:
+            if self.chunk_left == 0:
+                size = self.rfile.readline(MAX_HEADER_LINE).split(b';', 1)[0].strip()
+                self.chunk_left = int(size, 16)
+                if self.chunk_left == 0:
+                    # Skip any trailer fields up to the blank line
+                    while self.rfile.readline(MAX_HEADER_LINE) not in (b'\r\n', b'\n', b''):
+                        pass
+                    self.done = True
+                    return 0
+            wanted = self.chunk_left
+        else:
+            wanted = len(buffer) if self.remaining is None else self.remaining
+            if wanted == 0:
+                self.done = True
+                return 0
+        data = self.rfile.read1(min(len(buffer), wanted))
+        if not data:
+            if self.remaining is None and not self.chunked:
+                self.done = True
+                return 0
+            raise ValueError('upload ended before the end of the body')
+        self.bytes_read += len(data)
+        buffer[:len(data)] = data
+        if self.chunked:
+            self.chunk_left -= len(data)
+            if self.chunk_left == 0:
+                self.rfile.readline(MAX_HEADER_LINE)
+        elif self.remaining is not None:
+            self.remaining -= len(data)
+        return len(data)
+
+class MultipartReader:
+    """
+    Streaming multipart/form-data parser. parts() yields (name, filename,
+    stream) in body order; each stream ends at the next boundary, and whatever
+    a consumer leaves unread is skipped when the next part is requested.
+    """
+
+    def __init__(self, stream, boundary):
+        self.stream = stream
+        self.delimiter = b'\r\n--' + boundary
+        # The first boundary has no leading CRLF; prefixing one lets a single delimiter
+        # match all of them
+        self.buffer = bytearray(b'\r\n')
+
+    def fill(self):
+        data = self.stream.read(UPLOAD_CHUNK)
+        if not data:
+            raise ValueError('multipart body ended before its closing boundary')
+        self.buffer += data
+
+    def parts(self):
+        MultipartPart(self).drain()
+        while True:
+            while len(self.buffer) < 2:
+                self.fill()
+            if self.buffer.startswith(b'--'):
+                return
+            while (end := self.buffer.find(b'\r\n\r\n')) == -1:
+                if len(self.buffer) > MAX_HEADER_LINE:
+                    raise ValueError('multipart part headers too long')
+                self.fill()
+            head = bytes(self.buffer[:end]).lstrip(b'\r\n')
+            headers = email.parser.BytesHeaderParser().parsebytes(head)
+            del self.buffer[:end + 4]
+            part = MultipartPart(self)
+            field = headers.get_param('name', header='content-disposition')
+            yield field, headers.get_filename(), part
+            part.drain()
+
+class MultipartPart(io.RawIOBase):
+    """One part's body, read out of the shared MultipartReader buffer."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.ended = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        reader = self.reader
+        delimiter = reader.delimiter
+        while not self.ended:
+            found = reader.buffer.find(delimiter)
+            # Without a delimiter in view, hold back a tail that could be the start of one
+            available = found if found != -1 else len(reader.buffer) - len(delimiter) + 1
+            if available > 0:
+                n = min(len(buffer), available)
+                buffer[:n] = reader.buffer[:n]
+                del reader.buffer[:n]
+                return n
+            if found == 0:
+                del reader.buffer[:len(delimiter)]
+                self.ended = True
+                break
+            reader.fill()
+        return 0
+
+    def drain(self):
+        while self.read(UPLOAD_CHUNK):
+            pass
+
+def scan_upload(stream, name, ouis, stats):
+    """Yield Flock matches from one uploaded capture. Formats that need random access
+    (.zip, .kismet) are spooled to a temporary file first; everything else is streamed.
+    A corrupt archive is recorded in stats['failed'] as scan_file does."""
+    if not name.lower().endswith(('.zip', '.kismet')):
+        try:
+            yield from flock_engine.scan_stream(stream, name, ouis, stats)
+        except flock_engine.ARCHIVE_ERRORS as e:
+            flock_engine.record_failure(stats, name, e)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, os.path.basename(name))
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(stream, f, UPLOAD_CHUNK)
+        failed = len(stats.get('failed', ()))
+        yield from flock_engine.scan_file(path, ouis, stats)
+        # Report the upload's name rather than its temporary path
+        for failure in stats.get('failed', [])[failed:]:
+            failure['file'] = name
+
+def iter_uploads(reader):
+    """
+    (stream, filename, ouis) for each file part; an "ouis" field sets the OUI
+    table for the files after it.
+    """
+    ouis = None
+    for name, filename, part in reader.parts():
+        if filename:
+            yield part, filename, ouis
+        elif name == 'ouis':
+            ouis = json.loads(part.read())
+            if not isinstance(ouis, dict):
+                raise ValueError('"ouis" must be a JSON object of OUI prefix to device type')
+
+def scan_request(body, boundary, name, emit, progress=None):
+    """
+    Scan a BodyReader, passing emit one NDJSON record at a time: each match
+    as it is found, an error if the body turns out malformed, then a summary
+    of merged devices and of files that could not be read. The body is
+    multipart/form-data when boundary is given, otherwise a single capture
+    called name. A ScanProgress, if given, is kept current for /api/progress.
+    """
+    start = time.perf_counter()
+    progress = progress or ScanProgress(name)
+    progress.body = body
+    stats = progress.stats
+    devices = flock_engine.SightingAggregator()
+    files = 0
+    try:
+        if boundary:
+            uploads = iter_uploads(MultipartReader(body, boundary.encode('latin-1')))
+        else:
+            uploads = [(body, name, None)]
+        for stream, name, ouis in uploads:
+            files += 1
+            progress.name = name
+            progress.files = files
+            for r in scan_upload(stream, name, ouis, stats):
+                devices.add(r, name)
+                progress.matches += 1
+                emit(dict(r, type='match', file=name))
+        # Read to the end so closing the socket doesn't reset it under the response
+        while body.read(UPLOAD_CHUNK):
+            pass
+    except (ValueError, EOFError, zipfile.BadZipFile) as e:
+        emit({'type': 'error', 'message': str(e)})
+    emit({
+        'type': 'summary',
+        'files': files,
+        'failed': stats.get('failed', []),
+        'networks': stats.get('networks', 0),
+        'sightings': devices.sightings,
+        'elapsed': round(time.perf_counter() - start, 3),
+        'devices': devices.results(),
+    })
+
+# Live progress of server-side scans, streamed as Server-Sent Events from /api/progress
+
+PROGRESS_INTERVAL = 1.0
+STALL_SECONDS = 10
+
+class ScanProgress:
+    """Counters for one upload scan. Scans run by a scanner process are mirrored from the
+    snapshots it reports, which replace the local counters."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.body = None
+        self.stats = {}
+        self.files = 0
+        self.matches = 0
+        self.remote = None
+
+    def snapshot(self):
+        if self.remote is not None:
+            return dict(self.remote)
+        return {
+            'name': self.name,
+            'bytes': self.body.bytes_read if self.body else 0,
+            'rows': self.stats.get('networks', 0),
+            'matches': self.matches,
+            'files': self.files,
+            'elapsed': round(time.time() - self.started, 3),
+        }
+
+_scan_ids = itertools.count(1)
+active_scans = {}
+
+@contextlib.contextmanager
+def tracked_scan(name):
+    """Register a ScanProgress in active_scans for the duration of a scan."""
+    scan_id = next(_scan_ids)
+    progress = ScanProgress(name)
+    active_scans[scan_id] = progress
+    try:
+        yield progress
+    finally:
+        del active_scans[scan_id]
+
+def progress_event(previous):
+    """
+    One SSE "progress" event covering every active scan, with bytes/sec and
+    rows/sec since the previous event and a stalled flag for scans that have
+    neither read nor parsed anything for STALL_SECONDS. previous carries state
+    between calls.
+    """
+    now = time.time()
+    scans = []
+    for scan_id, progress in list(active_scans.items()):
+        snap = progress.snapshot()
+        last = previous.get(scan_id)
+        moved = now
+        if last is not None and (snap['bytes'], snap['rows']) == (last['snap']['bytes'],
+                                                                  last['snap']['rows']):
+            moved = last['moved']
+        if last is not None:
+            seconds = max(now - last['time'], 1e-3)
+            snap['bytesPerSec'] = round((snap['bytes'] - last['snap']['bytes']) / seconds)
+            snap['rowsPerSec'] = round((snap['rows'] - last['snap']['rows']) / seconds)
+        snap['id'] = scan_id
+        snap['stalled'] = now - moved >= STALL_SECONDS
+        previous[scan_id] = {'snap': snap, 'time': now, 'moved': moved}
+        scans.append(snap)
+    for scan_id in set(previous) - {snap['id'] for snap in scans}:
+        del previous[scan_id]
+    data = json.dumps({'time': round(now, 3), 'scans': scans})
+    return f'event: progress\ndata: {data}\n\n'.encode()
+
+SSE_HEADERS = {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'}
+
+def upload_target(headers, target):
+    """(multipart boundary or None, raw upload name) for a POST /api/scan request."""
+    boundary = None
+    if headers.get_content_type() == 'multipart/form-data':
+        boundary = headers.get_param('boundary')
+        if not boundary:
+            raise ValueError('multipart/form-data without a boundary')
+    return boundary, parse_qs(urlparse(target).query).get('name', ['upload.csv'])[0]
+
+# Cacheable responses, shared by both server backends
+
+GIF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gifs')
+_index_page = None
+
+def index_page():
+    """The page as a CachedBody, encoded on first use and shared by every connection."""
+    global _index_page
+    if _index_page is None:
+        _index_page = CachedBody(HTML_TEMPLATE.encode(), 'text/html; charset=utf-8')
+    return _index_page
+
+def gif_path(url_path):
+    """Filesystem path for a /gifs/ URL, or None if it is missing or escapes the gifs directory."""
+    path = os.path.realpath(os.path.join(GIF_DIR, unquote(url_path[len('/gifs/'):])))
+    if os.path.dirname(path) != os.path.realpath(GIF_DIR) or not os.path.isfile(path):
+        return None
+    return path
+
+def not_modified(headers, etag):
+    header = headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+def byte_range(headers, size, etag):
+    """(offset, length) for a single satisfiable Range, None to send the whole body
+    (no, multiple or malformed ranges, or a stale If-Range), False if unsatisfiable."""
+    header = headers.get('Range')
+    if not header or headers.get('If-Range', etag) != etag:
+        return None
+    unit, _, spec = header.partition('=')
+    first, dash, last = spec.strip().partition('-')
+    if unit.strip().lower() != 'bytes' or ',' in spec or not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        else:
+            suffix = int(last)
+            if suffix == 0:
+                return False
+            start = max(size - suffix, 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return False
+    return start, end - start + 1
+
+def cached_response(headers, size, etag, content_type, cache_control, extra=None):
+    """
+    (status, response headers, offset, length) for a cacheable body: 304 when
+    If-None-Match holds the current ETag, 206 for a satisfiable single Range,
+    416 for an unsatisfiable one, else 200.
+    """
+    if not_modified(headers, etag):
+        return 304, {'ETag': etag, 'Cache-Control': cache_control}, 0, 0
+    requested = byte_range(headers, size, etag)
+    if requested is False:
+        return 416, {'Content-Range': f'bytes */{size}', 'Content-Length': '0'}, 0, 0
+    offset, length = requested or (0, size)
+    response = {
+        'Content-Type': content_type,
+        'Content-Length': str(length),
+        'ETag': etag,
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    if requested:
+        response['Content-Range'] = f'bytes {offset}-{offset + length - 1}/{size}'
+    response.update(extra or {})
+    return (206 if requested else 200), response, offset, length
+
+def page_response(headers):
+    """cached_response for the page in the smallest encoding the client accepts, plus its body."""
+    page = index_page()
+    encoding, body, etag = page.negotiate(headers.get('Accept-Encoding', ''))
+    extra = {'Vary': 'Accept-Encoding'}
+    if encoding != 'identity':
+        extra['Content-Encoding'] = encoding
+    return cached_response(headers, len(body), etag, page.content_type, 'no-cache', extra), body
+
+def gif_response(headers, path):
+    st = os.stat(path)
+    return cached_response(headers, st.st_size, f'"{st.st_size:x}-{st.st_mtime_ns:x}"', 'image/gif',
+                           'public, max-age=86400')
+
 class WiGLEAnalyzerHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
-        if self.path == '/' or self.path == '/index.html':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
+        self.route(head=False)
+
+    def do_HEAD(self):
+        self.route(head=True)
+
+    def do_POST(self):
+        if urlparse(self.path).path == '/api/scan':
+            self.scan_api()
+        else:
+            self.send_error(404)
+
+    def scan_api(self):
+        """
+        POST /api/scan: scan uploaded captures here and stream the matches back as
+        NDJSON while the body is still arriving, ending with a summary line of
+        merged devices. Takes multipart/form-data (file fields, plus an optional
+        "ouis" JSON field) or a raw body named by ?name=, sent with
+        Content-Length or chunked.
+        """
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        length = self.headers.get('Content-Length')
+        if not chunked and not (length or '').isdigit():
+            self.send_error(411, 'Send Content-Length or a chunked body')
+            return
+        try:
+            boundary, name = upload_target(self.headers, self.path)
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        if self.headers.get('Expect', '').lower() == '100-continue':
+            # curl -T waits a second for this before sending the body
+            self.send_response_only(100)
             self.end_headers()
-            self.wfile.write(HTML_TEMPLATE.encode())
-        elif self.path.startswith('/gifs/'):
-            from urllib.parse import unquote
-            gif_name = unquote(self.path[6:])
-            gif_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gifs', gif_name)
-            if os.path.exists(gif_path):
-                self.send_response(200)
-                self.send_header('Content-type', 'image/gif')
-                self.end_headers()
-                with open(gif_path, 'rb') as f:
-                    self.wfile.write(f.read())
-            else:
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.close_connection = True
+        body = BodyReader(self.rfile, None if chunked else int(length), chunked)
+        with tracked_scan(name) as progress:
+            emit = lambda record: self.wfile.write((json.dumps(record) + '\n').encode())
+            scan_request(body, boundary, name, emit, progress)
+
+    def progress_stream(self):
+        """GET /api/progress: a progress event every PROGRESS_INTERVAL until the client leaves."""
+        self.send_response(200)
+        for name, value in SSE_HEADERS.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+        previous = {}
+        try:
+            while True:
+                self.wfile.write(progress_event(previous))
+                time.sleep(PROGRESS_INTERVAL)
+        except ConnectionError:
+            pass
+
+    def route(self, head):
+        path = urlparse(self.path).path
+        if path == '/api/progress' and not head:
+            self.progress_stream()
+        elif path == '/' or path == '/index.html':
+            response, body = page_response(self.headers)
+            view = memoryview(body)
+            self.send_cached(response, head,
+                             lambda offset, length: self.wfile.write(view[offset:offset + length]))
+        elif path.startswith('/gifs/'):
+            gif = gif_path(path)
+            if gif is None:
                 self.send_error(404)
+                return
+            self.send_cached(gif_response(self.headers, gif), head,
+                             lambda offset, length: self.sendfile(gif, offset, length))
+        elif head:
+            super().do_HEAD()
         else:
             super().do_GET()
 
+    def send_cached(self, response, head, send):
+        """Send a cached_response; send(offset, length) writes that slice of the body."""
+        status, headers, offset, length = response
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head and length:
+            send(offset, length)
+
+    def sendfile(self, path, offset, length):
+        # socket.sendfile uses os.sendfile where available, so the GIF never passes through
+        # Python buffers
+        with open(path, 'rb') as f:
+            self.connection.sendfile(f, offset, length)
+
     def log_message(self, format, *args):
         print(f"[{self.log_date_time_string()}] {format % args}")
 
-def main():
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+def print_banner(port):
+    print(f"\n{'='*60}")
+    print(f"  RINGMAST4R FLOCK HUNTER")
+    print(f"  Server running on http://localhost:{port}")
+    print(f"{'='*60}")
+    print(f"\nDetects {len(FLOCK_OUIS)} IEEE-verified Flock Safety OUI prefixes")
+    print(f"Drop wardriving CSV exports to scan for surveillance devices\n")
+    print("Press Ctrl+C to stop the server\n")
 
-    with socketserver.TCPServer(("", PORT), WiGLEAnalyzerHandler) as httpd:
-        print(f"\n{'='*60}")
-        print(f"  RINGMAST4R FLOCK HUNTER")
-        print(f"  Server running on http://localhost:{PORT}")
-        print(f"{'='*60}")
-        print(f"\nDetects {len(FLOCK_OUIS)} IEEE-verified Flock Safety OUI prefixes")
-        print(f"Drop wardriving CSV exports to scan for surveillance devices\n")
-        print("Press Ctrl+C to stop the server\n")
+def run_server(port=PORT):
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    index_page()
 
+    # One thread per connection, so a slow GIF download never blocks another analyst's page load
+    with http.server.ThreadingHTTPServer(("", port), WiGLEAnalyzerHandler) as httpd:
+        print_banner(port)
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\nServer stopped.")
 
+# asyncio backend: one event loop multiplexes every connection while uploads are parsed by a
+# bounded set of scanner processes. Each upload only reads from its client as fast as its
+# scanner consumes the bytes, so one giant upload cannot crowd out other requests.
+
+MAX_HEADERS = 100
+
+async def read_request(reader):
+    """(method, target, version, headers) for the next request, or None once the client is done."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError('malformed request line')
+    lines = []
+    while (header := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        lines.append(header)
+        if len(lines) > MAX_HEADERS:
+            raise ValueError('too many headers')
+    return (*parts, email.parser.BytesHeaderParser().parsebytes(b''.join(lines)))
+
+def response_head(status, headers, keep_alive):
+    lines = [f'HTTP/1.1 {status} {http.HTTPStatus(status).phrase}',
+             f'Date: {email.utils.formatdate(usegmt=True)}']
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+def error_head(status, message=None):
+    body = (message or http.HTTPStatus(status).phrase).encode()
+    headers = {'Content-Type': 'text/plain; charset=utf-8', 'Content-Length': str(len(body))}
+    return response_head(status, headers, False) + body
+
+async def read_exactly(reader, size):
+    while size > 0:
+        data = await reader.read(min(size, UPLOAD_CHUNK))
+        if not data:
+            raise ValueError('upload ended before the end of the body')
+        size -= len(data)
+        yield data
+
+async def body_chunks(reader, headers):
+    """Yield a request body as it arrives, following Content-Length or chunked transfer encoding."""
+    if 'chunked' not in headers.get('Transfer-Encoding', '').lower():
+        async for data in read_exactly(reader, int(headers['Content-Length'])):
+            yield data
+        return
+    while size := int((await reader.readline()).split(b';', 1)[0].strip(), 16):
+        async for data in read_exactly(reader, size):
+            yield data
+        await reader.readline()
+    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+        pass
+
+class AsyncServer:
+    def __init__(self, jobs):
+        self.scanners = asyncio.Semaphore(jobs)
+
+    async def handle(self, reader, writer):
+        try:
+            while (request := await read_request(reader)) is not None:
+                method, target, version, headers = request
+                closing = headers.get('Connection', '').lower() == 'close'
+                keep_alive = version == 'HTTP/1.1' and not closing
+                path = urlparse(target).path
+                if method == 'POST' and path == '/api/scan':
+                    keep_alive = False
+                    status = await self.scan(reader, writer, target, headers)
+                elif method == 'GET' and path == '/api/progress':
+                    keep_alive = False
+                    status = await self.progress_stream(writer)
+                elif method in ('GET', 'HEAD'):
+                    status = await self.static(writer, path, headers, method == 'HEAD', keep_alive)
+                else:
+                    keep_alive = False
+                    status = 404 if method == 'POST' else 405
+                    writer.write(error_head(status))
+                    await writer.drain()
+                stamp = time.strftime('%d/%b/%Y %H:%M:%S')
+                print(f'[{stamp}] "{method} {target} {version}" {status} -')
+                if not keep_alive:
+                    break
+        except ValueError as e:
+            writer.write(error_head(400, str(e)))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def progress_stream(self, writer):
+        writer.write(response_head(200, SSE_HEADERS, False))
+        previous = {}
+        while True:
+            writer.write(progress_event(previous))
+            await writer.drain()
+            await asyncio.sleep(PROGRESS_INTERVAL)
+
+    async def static(self, writer, path, headers, head, keep_alive):
+        if path == '/' or path == '/index.html':
+            (status, response, offset, length), body = page_response(headers)
+            writer.write(response_head(status, response, keep_alive))
+            if not head and length:
+                writer.write(memoryview(body)[offset:offset + length])
+            await writer.drain()
+            return status
+
+        gif = gif_path(path) if path.startswith('/gifs/') else None
+        if gif is None:
+            writer.write(error_head(404))
+            await writer.drain()
+            return 404
+        status, response, offset, length = gif_response(headers, gif)
+        writer.write(response_head(status, response, keep_alive))
+        await writer.drain()
+        if not head and length:
+            with open(gif, 'rb') as f:
+                # os.sendfile under the hood where the transport allows it
+                await asyncio.get_running_loop().sendfile(writer.transport, f, offset, length)
+        return status
+
+    async def scan(self, reader, writer, target, headers):
+        """POST /api/scan, piping the body through a scanner process and its NDJSON back."""
+        if 'chunked' not in headers.get('Transfer-Encoding', '').lower() and \
+                not headers.get('Content-Length', '').isdigit():
+            writer.write(error_head(411, 'Send Content-Length or a chunked body'))
+            return 411
+        try:
+            boundary, name = upload_target(headers, target)
+        except ValueError as e:
+            writer.write(error_head(400, str(e)))
+            return 400
+        if headers.get('Expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+        async with self.scanners:
+            # name=value keeps argparse from reading values starting with '-' (as browser
+            # boundaries do) as options
+            command = [sys.executable, os.path.abspath(__file__), 'scan-stdin', f'--name={name}']
+            if boundary:
+                command.append(f'--boundary={boundary}')
+            proc = await asyncio.create_subprocess_exec(*command, stdin=asyncio.subprocess.PIPE,
+                                                        stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.PIPE)
+            writer.write(response_head(200, {'Content-Type': 'application/x-ndjson',
+                                             'Cache-Control': 'no-store'}, False))
+
+            async def upload():
+                chunks = body_chunks(reader, headers)
+                try:
+                    async for data in chunks:
+                        proc.stdin.write(data)
+                        # Blocks while the scanner is behind, which stops reading this
+                        # client's socket
+                        await proc.stdin.drain()
+                except ValueError:
+                    pass  # the scanner sees the body end early and reports it
+                except ConnectionError:
+                    # The scanner exited early (its status is reported below); read the rest of the
+                    # body so closing the socket doesn't reset it under the response
+                    with contextlib.suppress(ValueError):
+                        async for _ in chunks:
+                            pass
+                finally:
+                    proc.stdin.close()
+
+            output = {'last': b'\n'}
+            errors = []
+
+            async def results():
+                while data := await proc.stdout.read(UPLOAD_CHUNK):
+                    output['last'] = data
+                    writer.write(data)
+                    await writer.drain()
+
+            async def reports(progress):
+                # The scanner reports a progress snapshot per line on stderr; anything else
+                # is passed through
+                while line := await proc.stderr.readline():
+                    try:
+                        progress.remote = json.loads(line)
+                    except ValueError:
+                        text = line.decode(errors='replace')
+                        errors.append(text.strip())
+                        sys.stderr.write(text)
+
+            with tracked_scan(name) as progress:
+                tasks = [asyncio.ensure_future(task)
+                         for task in (upload(), results(), reports(progress))]
+                try:
+                    await asyncio.gather(*tasks)
+                    if await proc.wait() != 0:
+                        # A scanner that died mid-scan is reported the way scan_request
+                        # reports a bad body
+                        message = next((line for line in reversed(errors) if line), None) or \
+                            f'scanner exited with status {proc.returncode}'
+                        record = json.dumps({'type': 'error', 'message': message}) + '\n'
+                        separator = b'' if output['last'].endswith(b'\n') else b'\n'
+                        writer.write(separator + record.encode())
+                        await writer.drain()
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    with contextlib.suppress(ProcessLookupError):
+                        proc.kill()
+                    await proc.wait()
+                    raise
+        return 200
+
+def run_async_server(port=PORT, jobs=None):
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    index_page()
+    server = AsyncServer(jobs or os.cpu_count() or 1)
+
+    async def serve():
+        listener = await asyncio.start_server(server.handle, port=port)
+        print_banner(port)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+def run_scan_stdin(args):
+    """
+    Scan one upload body from stdin as NDJSON on stdout; the asyncio backend's
+    scanner processes. A progress snapshot is written to stderr as a JSON line
+    every PROGRESS_INTERVAL.
+    """
+    out = sys.stdout.buffer
+    progress = ScanProgress(args.name)
+    finished = threading.Event()
+
+    def emit(record):
+        out.write((json.dumps(record) + '\n').encode())
+        out.flush()
+
+    def report():
+        while not finished.wait(PROGRESS_INTERVAL):
+            print(json.dumps(progress.snapshot()), file=sys.stderr, flush=True)
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        scan_request(BodyReader(sys.stdin.buffer), args.boundary, args.name, emit, progress)
+    finally:
+        finished.set()
+
+def run_scan(args):
+    if args.out:
+        ext = os.path.splitext(args.out)[1].lower()
+        writer = flock_engine.EXPORT_WRITERS.get(ext)
+        if writer is None:
+            formats = ', '.join(flock_engine.EXPORT_WRITERS)
+            sys.exit(f"Unsupported output format '{ext}' (use {formats})")
+
+    stats = {}
+    start = time.perf_counter()
+    if args.sightings:
+        results = list(flock_engine.scan_parallel(args.paths, jobs=args.jobs, stats=stats))
+        sightings = len(results)
+    else:
+        with contextlib.ExitStack() as stack:
+            cache = stack.enter_context(flock_engine.ScanCache(args.cache)) if args.cache else None
+            devices = flock_engine.scan_devices(args.paths, jobs=args.jobs, stats=stats,
+                                                cache=cache)
+        results = devices.results()
+        sightings = devices.sightings
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8', newline='') as f:
+            writer(results, f)
+
+    elapsed = time.perf_counter() - start
+    battery = sum('Battery' in r['deviceType'] for r in results)
+    camera = sum('Camera' in r['deviceType'] for r in results)
+    cached = f", {stats['cached']} unchanged from cache" if stats.get('cached') else ''
+    print(f"Scanned {stats.get('files', 0)} files ({stats.get('networks', 0):,} networks{cached}) "
+          f"with {args.jobs} job(s) in {elapsed:.2f}s", file=sys.stderr)
+    for failure in stats.get('failed', []):
+        print(f"Skipped unreadable file {failure['file']}: {failure['error']}", file=sys.stderr)
+    print(f"Flock devices: {len(results)} ({battery} battery, {camera} camera) "
+          f"from {sightings:,} sightings", file=sys.stderr)
+    installations = flock_engine.find_installations(results, args.radius)
+    print(f"Complete installations: {len(installations)} (within {args.radius:g}m)",
+          file=sys.stderr)
+    if args.out:
+        print(f"Wrote {args.out}", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ringmast4r Flock Hunter")
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve = subparsers.add_parser('serve', help='run the web UI (default)')
+    serve.add_argument('--port', type=int, default=PORT)
+    serve.add_argument('--backend', choices=('threads', 'asyncio'), default='threads',
+                       help='threads: one thread per connection; asyncio: one event loop with '
+                            'uploads scanned in worker processes (default: %(default)s)')
+    serve.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                       help='concurrent upload scanner processes for the asyncio backend '
+                            '(default: all cores)')
+
+    scan = subparsers.add_parser('scan', help='scan capture files or directories without a browser')
+    scan.add_argument('paths', nargs='+', help='files or directories (searched recursively)')
+    scan.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                      help='worker processes (default: all cores)')
+    scan.add_argument('--out', '-o', help='output file (.geojson, .json, .csv or .kml)')
+    scan.add_argument('--sightings', action='store_true',
+                      help='output every sighting instead of one merged record per device')
+    scan.add_argument('--cache', metavar='FILE',
+                      help='SQLite file of per-file results; unchanged files are not parsed again')
+    scan.add_argument('--radius', type=float, default=flock_engine.CLUSTER_RADIUS,
+                      help='installation cluster radius in meters (default: %(default)s)')
+
+    scan_stdin = subparsers.add_parser(
+        'scan-stdin', help='scan an /api/scan request body from stdin, writing NDJSON to stdout')
+    scan_stdin.add_argument('--name', default='upload.csv',
+                            help='capture file name, used to pick the format')
+    scan_stdin.add_argument('--boundary',
+                            help='multipart/form-data boundary, if the body is multipart')
+
+    args = parser.parse_args(argv)
+    if args.command == 'scan':
+        run_scan(args)
+    elif args.command == 'scan-stdin':
+        run_scan_stdin(args)
+    elif getattr(args, 'backend', 'threads') == 'asyncio':
+        run_async_server(args.port, args.jobs)
+    else:
+        run_server(getattr(args, 'port', PORT))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,295 @@
+import gzip
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+
+import flock_engine
+from benchmarks import bench_formats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INDEX_HTML = os.path.join(os.path.dirname(HERE), 'index.html')
+
+CAPTURE = (
+    'WigleWifi-1.4,appRelease=2.64\n'
+    'MAC,SSID,AuthMode,FirstSeen,Channel,RSSI,CurrentLatitude,CurrentLongitude\n'
+    '04:0D:84:11:22:33,"Flock, Safety",[WPA2],2024-01-01 10:00:00,6,-60,37.1,-122.1\n'
+    '"aa:bb:cc:dd:ee:ff",home,[WPA2],2024-01-01 10:00:01,1,-70,37.2,-122.2\n'
+    '70:C9:4E:44:55:66,"cam ""1""",[WPA2],2024-01-01 10:00:02,11,-55,37.3,-122.3\n'
+    '\n'
+    '# comment\n'
+    '3C:91:80:77:88:99,,[OPEN],2024-01-01 10:00:03,36,-80,37.4,-122.4\n'
+)
+
+# MAC in the second column, with quoted fields and short rows around it
+FAST_REJECT = (
+    'SSID,MAC,RSSI\n'
+    '"a,b",04:0D:84:00:00:01,-50\n'
+    'plain,"70:C9:4E:00:00:02",-51\n'
+    'x,aa:bb:cc:00:00:03,-52\n'
+    '"4,0",aa:bb:cc:00:00:04,-53\n'
+    'short\n'
+    'y,3C:91:80:00:00:05\n'
+)
+
+
+def scan_text(text, name='capture.csv'):
+    stats = {}
+    results = list(flock_engine.scan_stream(io.BytesIO(text.encode()), name, stats=stats))
+    return results, stats
+
+
+def browser_parse(text):
+    """Run the browser worker's CSV parser from index.html under Node."""
+    with open(INDEX_HTML, encoding='utf-8') as f:
+        page = f.read()
+    start = page.index('// Read the first six hex nibbles')
+    end = page.index('// Byte-range shards of large files')
+    script = page[start:end] + (
+        'const input = require("fs").readFileSync(0, "utf8");\n'
+        f'setOUIs({json.dumps(flock_engine.FLOCK_OUIS)}, "test");\n'
+        'const text = new TextDecoder().decode(new TextEncoder().encode(input));\n'
+        'console.log(JSON.stringify(parseCSV(text)));\n'
+    )
+    out = subprocess.run(['node', '-e', script], input=text, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_quoted_fields():
+    results, stats = scan_text(CAPTURE)
+    assert [r['mac'] for r in results] == ['04:0D:84:11:22:33', '70:C9:4E:44:55:66', '3C:91:80:77:88:99']
+    assert results[0]['ssid'] == 'Flock, Safety'
+    assert results[0]['rssi'] == '-60'
+    assert results[1]['ssid'] == 'cam 1'
+    assert results[2]['ssid'] == 'N/A'
+    assert stats['networks'] == 4
+
+
+def test_utf8_bom_header():
+    plain, _ = scan_text(CAPTURE)
+    bom, _ = scan_text('\ufeff' + CAPTURE.split('\n', 1)[1])
+    assert bom == plain
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+@pytest.mark.parametrize('text', [CAPTURE, '\ufeff' + CAPTURE.split('\n', 1)[1], FAST_REJECT],
+                         ids=['quoted', 'bom', 'fast-reject'])
+def test_browser_parser_parity(text):
+    results, stats = scan_text(text)
+    browser = browser_parse(text)
+    assert browser['networkCount'] == stats['networks']
+    assert browser['results'] == [{k: r[k] for k in browser['results'][0]} for r in results]
+
+
+def test_compiled_matcher_agrees_with_prefix_lookup():
+    rng = random.Random(4)
+    matcher = flock_engine.compile_ouis()
+    macs = ['04-0d-84-11-22-33', '040D84112233', ' 70:c9:4e:00:00:01 ', '04:0D', '', 'zz:zz:zz:zz:zz:zz']
+    macs += [oui.lower() + ':01:02:03' for oui in flock_engine.FLOCK_OUIS]
+    macs += [':'.join(f'{rng.randrange(256):02X}' for _ in range(6)) for _ in range(2000)]
+    for mac in macs:
+        expected = flock_engine.FLOCK_OUIS.get(flock_engine.get_oui_prefix(mac))
+        assert matcher.get(flock_engine.oui_key(mac)) == expected, mac
+
+
+def test_fast_reject_keeps_quoted_rows(monkeypatch):
+    tokenized = []
+    split = flock_engine.split_csv_line
+    monkeypatch.setattr(flock_engine, 'split_csv_line', lambda line: tokenized.append(line) or split(line))
+    results, stats = scan_text(FAST_REJECT)
+    assert [(r['mac'], r['ssid'], r['rssi']) for r in results] == [
+        ('04:0D:84:00:00:01', 'a,b', '-50'),
+        ('70:C9:4E:00:00:02', 'plain', '-51'),
+        ('3C:91:80:00:00:05', 'y', 'N/A'),
+    ]
+    assert stats['networks'] == 6
+    # Unquoted non-Flock rows never reach the tokenizer; quoted ones fall back to it
+    assert 'x,aa:bb:cc:00:00:03,-52' not in tokenized
+    assert '"4,0",aa:bb:cc:00:00:04,-53' in tokenized
+
+
+def all_pairs_installations(results, radius=flock_engine.CLUSTER_RADIUS):
+    """The O(n^2) loop find_installations replaced, kept as a reference."""
+    devices = [r for r in results if float(r['lat']) and float(r['lon'])]
+    used = set()
+    installations = []
+    for i, device in enumerate(devices):
+        if i in used:
+            continue
+        used.add(i)
+        cluster = [device]
+        types = [flock_engine.type_category(device['deviceType'])]
+        for j in range(i + 1, len(devices)):
+            other = devices[j]
+            category = flock_engine.type_category(other['deviceType'])
+            if j in used or category in types:
+                continue
+            if flock_engine.distance_meters(float(device['lat']), float(device['lon']),
+                                            float(other['lat']), float(other['lon'])) <= radius:
+                cluster.append(other)
+                types.append(category)
+                used.add(j)
+        if len(types) >= 2:
+            installations.append({'devices': cluster, 'types': types,
+                                  'centerLat': float(device['lat']), 'centerLon': float(device['lon'])})
+    return installations
+
+
+@pytest.mark.parametrize('lat0', [37.7, -62.0, 88.9])
+def test_grid_clustering_matches_all_pairs(lat0):
+    rng = random.Random(lat0)
+    kinds = ['Extended Battery (Silicon Labs)', 'Camera', 'Custom']
+    results = [{'mac': f'{i:012X}', 'deviceType': rng.choice(kinds),
+                'lat': str(lat0 + rng.uniform(0, 0.004)), 'lon': str(-122.4 + rng.uniform(0, 0.02))}
+               for i in range(400)]
+    expected = all_pairs_installations(results)
+    assert len(expected) > 10
+    assert flock_engine.find_installations(results) == expected
+
+
+def test_clustering_skips_non_finite_coordinates():
+    device = {'deviceType': 'Camera', 'lat': '37.1', 'lon': '-122.1'}
+    battery = {'deviceType': 'Battery', 'lat': '37.1', 'lon': '-122.1'}
+    bad = [{'deviceType': 'Battery', 'lat': lat, 'lon': lon}
+           for lat, lon in (('inf', '-122.1'), ('37.1', '-inf'), ('nan', '1'), ('N/A', '1'), ('0', '5'))]
+    [installation] = flock_engine.find_installations(bad + [device, battery])
+    assert installation['devices'] == [device, battery]
+
+
+def test_extreme_rssi_weights():
+    devices = flock_engine.SightingAggregator()
+    for rssi, lat in ((32767, '37.1'), (-32768, '37.2'), (-5000, '37.3')):
+        devices.add({'mac': '04:0D:84:11:22:33', 'ssid': 'x', 'deviceType': 'Battery', 'rssi': str(rssi),
+                     'channel': '1', 'lat': lat, 'lon': '-122.0', 'firstSeen': 'N/A'}, 'a.csv')
+    [device] = devices.results()
+    assert device['lat'] == '37.1'
+
+
+def cached_scan(folder, cache_path, ouis=None):
+    stats = {}
+    with flock_engine.ScanCache(str(cache_path)) as cache:
+        devices = flock_engine.scan_devices([str(folder)], ouis=ouis, jobs=1, stats=stats, cache=cache)
+    return {d['mac'] for d in devices.results()}, stats
+
+
+def test_scan_cache_reuses_only_unchanged_files(tmp_path):
+    folder = tmp_path / 'captures'
+    folder.mkdir()
+    (folder / 'a.csv').write_text(CAPTURE)
+    (folder / 'b.csv').write_text(CAPTURE.replace('04:0D:84', '58:8E:81'))
+    cache_path = tmp_path / 'cache.sqlite'
+
+    first, stats = cached_scan(folder, cache_path)
+    assert stats['cached'] == 0
+    again, stats = cached_scan(folder, cache_path)
+    assert (again, stats['cached'], stats['files']) == (first, 2, 2)
+
+    (folder / 'b.csv').write_text(CAPTURE.replace('04:0D:84', '58:8E:81').replace('-60', '-61'))
+    os.utime(folder / 'b.csv', ns=(0, 0))
+    _, stats = cached_scan(folder, cache_path)
+    assert stats['cached'] == 1
+
+    cameras = {'70:C9:4E': 'Camera'}
+    devices, stats = cached_scan(folder, cache_path, ouis=cameras)
+    assert stats['cached'] == 0
+    assert devices == {'70:C9:4E:44:55:66'}
+
+
+@pytest.fixture
+def captures(tmp_path):
+    data = CAPTURE.encode()
+    compressed = gzip.compress(data)
+    (tmp_path / 'good.csv').write_bytes(data)
+    (tmp_path / 'truncated.csv.gz').write_bytes(compressed[:len(compressed) // 2])
+    (tmp_path / 'corrupt.csv.gz').write_bytes(compressed[:20] + b'\xff' * 40 + compressed[60:])
+    (tmp_path / 'junk.zip').write_bytes(b'PK\x03\x04 not really a zip')
+    with zipfile.ZipFile(tmp_path / 'good.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('inner.csv.gz', compressed)
+    return tmp_path
+
+
+def test_compressed_and_zipped_match_plain(captures):
+    plain = list(flock_engine.scan_file(str(captures / 'good.csv')))
+    assert list(flock_engine.scan_file(str(captures / 'good.zip'))) == plain
+
+
+@pytest.mark.parametrize('name', ['truncated.csv.gz', 'corrupt.csv.gz', 'junk.zip'])
+def test_bad_archive_is_recorded_not_raised(captures, name):
+    stats = {}
+    list(flock_engine.scan_file(str(captures / name), stats=stats))
+    assert stats.get('files', 0) == 0
+    assert [f['file'] for f in stats['failed']] == [str(captures / name)]
+    assert stats['failed'][0]['error']
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_bad_archives_do_not_stop_the_scan(captures, jobs):
+    stats = {}
+    devices = flock_engine.scan_devices([str(captures)], jobs=jobs, stats=stats)
+    assert stats['files'] == 2
+    assert sorted(os.path.basename(f['file']) for f in stats['failed']) == \
+        ['corrupt.csv.gz', 'junk.zip', 'truncated.csv.gz']
+    assert {d['mac'] for d in devices.results()} == {'04:0D:84:11:22:33', '70:C9:4E:44:55:66', '3C:91:80:77:88:99'}
+
+
+@pytest.mark.parametrize('name', ['gone.csv', 'gone.csv.gz', 'gone.kismet'])
+def test_unreadable_file_is_recorded_not_raised(tmp_path, name):
+    (tmp_path / name).symlink_to(tmp_path / 'missing')
+    stats = {}
+    assert list(flock_engine.scan_file(str(tmp_path / name), stats=stats)) == []
+    assert stats.get('files', 0) == 0
+    assert [f['file'] for f in stats['failed']] == [str(tmp_path / name)]
+
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+@pytest.mark.parametrize('cached', [False, True])
+def test_dangling_symlink_does_not_stop_the_scan(tmp_path, jobs, cached):
+    folder = tmp_path / 'captures'
+    folder.mkdir()
+    (folder / 'good.csv').write_text(CAPTURE)
+    (folder / 'big.csv').write_text(CAPTURE * 50)
+    (folder / 'gone.csv').symlink_to(tmp_path / 'missing')
+    stats = {}
+    with flock_engine.ScanCache(str(tmp_path / 'cache.sqlite')) as cache:
+        devices = flock_engine.scan_devices([str(folder)], jobs=jobs, stats=stats, cache=cache if cached else None)
+    assert stats['files'] == 2
+    assert [f['file'] for f in stats['failed']] == [str(folder / 'gone.csv')]
+    assert len(devices.results()) == 3
+
+
+@pytest.mark.parametrize('ext', ['.netxml', '.kml', '.kismet', '.ns1'])
+def test_capture_formats_match_csv(tmp_path, ext):
+    networks = bench_formats.make_networks(3000)
+    bench_formats.write_csv(networks, tmp_path / 'capture.csv')
+    bench_formats.WRITERS[ext](networks, str(tmp_path / f'capture{ext}'))
+    expected = list(flock_engine.scan_file(str(tmp_path / 'capture.csv')))
+    stats = {}
+    results = list(flock_engine.scan_file(str(tmp_path / f'capture{ext}'), stats=stats))
+    assert (stats['networks'], stats['files']) == (3000, 1)
+    assert len(results) == 3
+
+    def comparable(r):
+        # Binary formats keep full coordinate precision; KML has no channel
+        return {**r, 'lat': round(float(r['lat']), 6), 'lon': round(float(r['lon']), 6),
+                'channel': 'N/A' if ext == '.kml' else r['channel']}
+
+    assert [comparable(r) for r in results] == [comparable(r) for r in expected]
+
+
+@pytest.mark.parametrize('ext', ['.netxml', '.ns1'])
+def test_truncated_capture_keeps_earlier_matches(tmp_path, ext):
+    networks = bench_formats.make_networks(3000)
+    path = str(tmp_path / f'capture{ext}')
+    bench_formats.WRITERS[ext](networks, path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    results = list(flock_engine.scan_file(path))
+    assert [r['mac'] for r in results] == [n['mac'] for n in networks if flock_engine.is_flock_device(n['mac'])][:2]
@@ -0,0 +1,252 @@
+import gzip
+import http.client
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import server
+
+SERVER_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server.py')
+
+CAPTURE = (
+    b'MAC,SSID,RSSI,CurrentLatitude,CurrentLongitude\n'
+    b'04:0D:84:11:22:33,battery,-60,37.1,-122.1\n'
+    b'aa:bb:cc:dd:ee:ff,home,-70,37.2,-122.2\n'
+    b'70:C9:4E:44:55:66,camera,-55,37.3,-122.3\n'
+)
+
+# Boundaries as curl and browsers generate them, starting with "--"
+BOUNDARY = '------------------------d74496d66958873e'
+
+
+def multipart(fields, boundary=BOUNDARY):
+    body = b''
+    for name, filename, data in fields:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else '')
+        body += f'--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n'.encode() + data + b'\r\n'
+    return body + f'--{boundary}--\r\n'.encode()
+
+
+def scan(body, boundary=None, name='upload.csv'):
+    records = []
+    reader = server.BodyReader(io.BufferedReader(io.BytesIO(body)), len(body))
+    server.scan_request(reader, boundary, name, records.append)
+    return records
+
+
+def matches(records):
+    return [(r['file'], r['mac']) for r in records if r['type'] == 'match']
+
+
+def test_raw_upload():
+    records = scan(gzip.compress(CAPTURE), name='run.csv.gz')
+    assert matches(records) == [('run.csv.gz', '04:0D:84:11:22:33'), ('run.csv.gz', '70:C9:4E:44:55:66')]
+    assert records[-1]['type'] == 'summary'
+    assert records[-1]['networks'] == 3
+
+
+def test_multipart_upload():
+    body = multipart([
+        ('f', 'a.csv', CAPTURE),
+        ('ouis', None, json.dumps({'70:C9:4E': 'Camera only'}).encode()),
+        ('f', 'b.csv', CAPTURE),
+    ])
+    records = scan(body, BOUNDARY)
+    assert matches(records) == [('a.csv', '04:0D:84:11:22:33'), ('a.csv', '70:C9:4E:44:55:66'),
+                                ('b.csv', '70:C9:4E:44:55:66')]
+    assert records[-1]['files'] == 2
+    assert records[-1]['failed'] == []
+
+
+def test_truncated_multipart_reports_error():
+    body = multipart([('f', 'a.csv', CAPTURE)])
+    records = scan(body[:-20], BOUNDARY)
+    assert [r['type'] for r in records if r['type'] != 'match'] == ['error', 'summary']
+
+
+def test_corrupt_archives_are_listed_in_summary():
+    compressed = gzip.compress(CAPTURE)
+    body = multipart([
+        ('f', 'bad.csv.gz', compressed[:20] + b'\xff' * 20 + compressed[40:]),
+        ('f', 'bad.zip', b'PK\x03\x04 not a zip'),
+        ('f', 'good.csv', CAPTURE),
+    ])
+    records = scan(body, BOUNDARY)
+    assert [f['file'] for f in records[-1]['failed']] == ['bad.csv.gz', 'bad.zip']
+    assert [m[0] for m in matches(records)] == ['good.csv', 'good.csv']
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-9', (0, 10)),
+    ('bytes=90-', (90, 10)),
+    ('bytes=-5', (95, 5)),
+    ('bytes=50-500', (50, 50)),
+    ('bytes=100-', False),
+    ('bytes=0-1,5-6', None),
+    ('items=0-1', None),
+])
+def test_byte_range(header, expected):
+    assert server.byte_range({'Range': header}, 100, '"tag"') == expected
+
+
+def test_byte_range_stale_if_range():
+    assert server.byte_range({'Range': 'bytes=0-9', 'If-Range': '"old"'}, 100, '"tag"') is None
+
+
+PAGE = b'<html>' + b'<p>Flock</p>' * 2000 + b'</html>'
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('', 'identity'),
+    ('gzip, deflate', 'gzip'),
+    ('GZIP;q=0.5', 'gzip'),
+    ('gzip;q=0', 'identity'),
+    ('gzip; q=0.0, identity', 'identity'),
+    ('*', 'br' if server.brotli is not None else 'gzip'),
+    pytest.param('br, gzip', 'br', marks=pytest.mark.skipif(server.brotli is None, reason='brotli is not installed')),
+])
+def test_negotiate_encoding(accept, expected):
+    body = server.CachedBody(PAGE, 'text/html')
+    encoding, data, etag = body.negotiate(accept)
+    assert encoding == expected
+    assert data == body.variants[expected]
+    if expected == 'gzip':
+        assert gzip.decompress(data) == PAGE
+    assert etag == body.etags[expected]
+
+
+def test_etags_differ_per_encoding_and_body():
+    body = server.CachedBody(PAGE, 'text/html')
+    assert len(set(body.etags.values())) == len(body.variants)
+    assert server.CachedBody(PAGE + b' ', 'text/html').etags['identity'] != body.etags['identity']
+    assert server.CachedBody(PAGE, 'text/html').etags == body.etags
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({}, 200),
+    ({'If-None-Match': '"tag"'}, 304),
+    ({'If-None-Match': 'W/"tag"'}, 304),
+    ({'If-None-Match': '"old", "tag"'}, 304),
+    ({'If-None-Match': '*'}, 304),
+    ({'If-None-Match': '"old"'}, 200),
+    ({'Range': 'bytes=10-19'}, 206),
+    ({'Range': 'bytes=500-'}, 416),
+])
+def test_cached_response_status(headers, status):
+    response = server.cached_response(headers, 100, '"tag"', 'text/html', 'no-cache')
+    assert response[0] == status
+    if status == 304:
+        assert response[1]['ETag'] == '"tag"'
+    if status == 206:
+        assert response[1]['Content-Range'] == 'bytes 10-19/100'
+        assert response[2:] == (10, 10)
+
+
+@pytest.fixture(params=['threads', 'asyncio'])
+def running_server(request):
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, SERVER_PY, 'serve', '--backend', request.param, '--port', str(port),
+                             '--jobs', '2'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(('localhost', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                proc.kill()
+                pytest.fail('server did not start')
+            time.sleep(0.05)
+    yield port
+    proc.terminate()
+    proc.wait(10)
+
+
+def post(port, path, body, content_type):
+    conn = http.client.HTTPConnection('localhost', port, timeout=30)
+    conn.request('POST', path, body=body, headers={'Content-Type': content_type})
+    response = conn.getresponse()
+    records = [json.loads(line) for line in response.read().splitlines()]
+    conn.close()
+    return response.status, records
+
+
+def test_multipart_upload_over_http(running_server):
+    body = multipart([('f', 'a.csv', CAPTURE), ('f', 'b.csv.gz', gzip.compress(CAPTURE))])
+    status, records = post(running_server, '/api/scan', body, f'multipart/form-data; boundary={BOUNDARY}')
+    assert status == 200
+    assert [m[0] for m in matches(records)] == ['a.csv', 'a.csv', 'b.csv.gz', 'b.csv.gz']
+    assert records[-1]['type'] == 'summary'
+    assert records[-1]['files'] == 2
+
+
+def test_dash_name_over_http(running_server):
+    status, records = post(running_server, '/api/scan?name=-x.csv', CAPTURE, 'text/csv')
+    assert status == 200
+    assert [m[0] for m in matches(records)] == ['-x.csv', '-x.csv']
+    assert records[-1]['type'] == 'summary'
+
+
+def test_page_revalidates_over_http(running_server):
+    conn = http.client.HTTPConnection('localhost', running_server, timeout=30)
+    conn.request('GET', '/', headers={'Accept-Encoding': 'gzip'})
+    response = conn.getresponse()
+    page = gzip.decompress(response.read())
+    assert (response.status, response.getheader('Content-Encoding')) == (200, 'gzip')
+    assert page.startswith(b'<!DOCTYPE html>')
+    conn.request('GET', '/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.getheader('ETag')})
+    response = conn.getresponse()
+    assert (response.status, response.read()) == (304, b'')
+    conn.close()
+
+
+def progress_scans(previous):
+    event = server.progress_event(previous)
+    assert event.startswith(b'event: progress\ndata: ') and event.endswith(b'\n\n')
+    return json.loads(event[len(b'event: progress\ndata: '):])['scans']
+
+
+def test_progress_events(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(server.time, 'time', lambda: clock[0])
+    previous = {}
+    body = CAPTURE * 100
+    with server.tracked_scan('big.csv') as progress:
+        progress.body = server.BodyReader(io.BufferedReader(io.BytesIO(body)), len(body))
+        [scan] = progress_scans(previous)
+        assert (scan['name'], scan['bytes'], scan['rows'], scan['stalled']) == ('big.csv', 0, 0, False)
+        assert 'bytesPerSec' not in scan
+
+        progress.body.read(1000)
+        progress.stats['networks'] = 40
+        clock[0] += 2
+        [scan] = progress_scans(previous)
+        assert (scan['bytes'], scan['bytesPerSec'], scan['rowsPerSec'], scan['stalled']) == (1000, 500, 20, False)
+
+        clock[0] += server.STALL_SECONDS
+        [scan] = progress_scans(previous)
+        assert (scan['bytesPerSec'], scan['stalled']) == (0, True)
+
+        progress.stats['networks'] = 41
+        clock[0] += 1
+        assert progress_scans(previous)[0]['stalled'] is False
+    assert progress_scans(previous) == []
+    assert previous == {}
+
+
+def test_scan_progress_counts_files_and_matches():
+    records = []
+    body = multipart([('f', 'a.csv', CAPTURE), ('f', 'b.csv', CAPTURE)])
+    with server.tracked_scan('upload') as progress:
+        server.scan_request(server.BodyReader(io.BufferedReader(io.BytesIO(body)), len(body)), BOUNDARY,
+                            'upload', records.append, progress)
+        snap = progress.snapshot()
+    assert (snap['bytes'], snap['rows'], snap['files'], snap['matches']) == (len(body), 6, 2, 4)